@@ -0,0 +1,109 @@
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+from knowledge_base import KnowledgeBase
+
+# ============================================================================
+# TIERED ANSWERS
+# ============================================================================
+
+@dataclass
+class TierStats:
+    """Per-tier counters"""
+    answered: int = 0
+    total_latency: float = 0.0
+
+class AnswerRouter:
+    """Local knowledge base first, the LLM only when the match is weak.
+
+    A block scoring at least `confidence` percent is answered immediately
+    without touching the network. Otherwise the question goes to
+    `llm_fn(text, on_sentence) -> (success, reply)`; if that fails, a
+    block scoring at least `fallback_confidence` and sharing a topic word
+    with the question is still better than an apology, so it is used
+    instead. While the circuit `breaker` is open (online model
+    unreachable) and `local_llm()` says no local model can answer either,
+    such a block scoring at least `offline_confidence` is used right away
+    instead of waiting for the call to fail.
+
+    prepare() does the same lookups ahead of time (on a partial
+    transcript); answer() takes its result and skips what it already did.
+    """
+
+    def __init__(self, kb: Optional[KnowledgeBase], llm_fn: Callable,
+                 confidence: float = 90.0, fallback_confidence: float = 50.0,
+                 offline_confidence: float = 70.0, breaker=None,
+                 local_llm: Optional[Callable[[], bool]] = None):
+        self.kb = kb
+        self.llm_fn = llm_fn
+        self.confidence = confidence
+        self.fallback_confidence = fallback_confidence
+        self.offline_confidence = offline_confidence
+        self.breaker = breaker
+        self.local_llm = local_llm or (lambda: False)
+        self.tiers: Dict[str, TierStats] = {
+            "kb": TierStats(), "llm": TierStats(), "kb_fallback": TierStats(),
+            "offline": TierStats(),
+        }
+
+    def prepare(self, text: str, llm_fn: Optional[Callable] = None) -> dict:
+        """Knowledge-base match and, given `llm_fn(text)` and a weak match, the model's reply"""
+        block, score = self.kb.match(text) if self.kb else (None, 0.0)
+        prepared = {"match": (block, score)}
+        if llm_fn is not None and (block is None or score < self.confidence):
+            success, reply = llm_fn(text)
+            if success:
+                prepared["llm"] = (success, reply)
+        return prepared
+
+    def answer(self, text: str, on_sentence=None, prepared: Optional[dict] = None
+               ) -> Tuple[str, bool, str]:
+        """Returns (tier, success, reply)"""
+        start = time.perf_counter()
+        prepared = prepared or {}
+        if "match" in prepared:
+            block, score = prepared["match"]
+        else:
+            block, score = self.kb.match(text) if self.kb else (None, 0.0)
+        if block is not None and score >= self.confidence:
+            print(f"📚 Knowledge base match {score:.0f}%: {block['q']}")
+            return self._done("kb", start, True, self.kb.answer(block))
+
+        weak_match = (block is not None and score >= self.fallback_confidence
+                      and self.kb.related(text, block))
+        if weak_match and score >= self.offline_confidence and self._offline():
+            print(f"📚 Offline, using closest answer ({score:.0f}%): {block['q']}")
+            return self._done("offline", start, True, self.kb.answer(block))
+
+        if "llm" in prepared:
+            print("⚡ Answer was prepared while you were speaking")
+            success, reply = prepared["llm"]
+        else:
+            success, reply = self.llm_fn(text, on_sentence)
+        if not success and weak_match:
+            print(f"📚 Model unavailable, using closest answer ({score:.0f}%): {block['q']}")
+            return self._done("kb_fallback", start, True, self.kb.answer(block))
+        return self._done("llm", start, success, reply)
+
+    def _offline(self) -> bool:
+        """No model can answer: the online one is down and no local one is ready"""
+        return self.breaker is not None and self.breaker.is_open and not self.local_llm()
+
+    def _done(self, tier: str, start: float, success: bool, reply: str):
+        stats = self.tiers[tier]
+        stats.answered += 1
+        stats.total_latency += time.perf_counter() - start
+        return tier, success, reply
+
+    def stats(self) -> dict:
+        """Hit ratio and mean latency (ms) per tier"""
+        total = sum(t.answered for t in self.tiers.values())
+        return {
+            name: {
+                "answered": t.answered,
+                "ratio": round(t.answered / total, 2) if total else 0.0,
+                "latency_ms": round(t.total_latency / t.answered * 1000) if t.answered else None,
+            }
+            for name, t in self.tiers.items()
+        }
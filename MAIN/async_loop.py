@@ -0,0 +1,70 @@
+import asyncio
+import concurrent.futures
+import threading
+from typing import Any, Coroutine, Optional
+
+# ============================================================================
+# BACKGROUND EVENT LOOP
+# ============================================================================
+
+class BackgroundLoop:
+    """One asyncio event loop that lives on a daemon thread for the whole session.
+
+    Blocking code hands coroutines over with submit() and gets a
+    concurrent.futures.Future back, so loop creation and any connection
+    state held by the loop are paid for once instead of per call.
+    """
+
+    def __init__(self, name: str = "saira-async"):
+        self.name = name
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+
+    def start(self):
+        """Start the loop thread (no-op if already running)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def _run(self):
+        """Thread body"""
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            pending = asyncio.all_tasks(self.loop)
+            for task in pending:
+                task.cancel()
+            if pending:
+                self.loop.run_until_complete(
+                    asyncio.gather(*pending, return_exceptions=True))
+            self.loop.close()
+
+    def submit(self, coro: Coroutine) -> concurrent.futures.Future:
+        """Schedule a coroutine from any thread"""
+        if not self._thread or not self._thread.is_alive():
+            self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """Submit and wait for the result"""
+        return self.submit(coro).result(timeout)
+
+    def call_soon(self, callback, *args):
+        """Run a plain callback on the loop thread"""
+        if not self._thread or not self._thread.is_alive():
+            self.start()
+        self.loop.call_soon_threadsafe(callback, *args)
+
+    def stop(self):
+        """Stop the loop and join its thread"""
+        if self.loop and self._thread and self._thread.is_alive():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(timeout=2)
+        self._thread = None
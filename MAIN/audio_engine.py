@@ -0,0 +1,252 @@
+import io
+import queue
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+import pygame
+
+# ============================================================================
+# AUDIO CLIPS
+# ============================================================================
+
+@dataclass
+class AudioClip:
+    """Audio waiting to be played: encoded bytes (mp3/wav) or raw mixer PCM"""
+    data: bytes = b""
+    text: str = ""
+    on_start: Optional[Callable[["AudioClip"], None]] = None
+    on_done: Optional[Callable[["AudioClip"], None]] = None
+    done: threading.Event = field(default_factory=threading.Event)
+    completed: bool = False  # False if flushed or stopped before the end
+    pcm: Optional[bytes] = None  # already decoded, in the mixer's format
+    generation: int = 0
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the clip finished, was flushed or was stopped"""
+        return self.done.wait(timeout)
+
+# ============================================================================
+# AUDIO ENGINE
+# ============================================================================
+
+class AudioEngine:
+    """Owns the pygame mixer and plays queued clips on one worker thread"""
+
+    def __init__(self, frequency: int = 0, size: int = 0, channels: int = 0,
+                 buffer: int = 0, tail: float = 0.05):
+        self.mixer_args = (frequency, size, channels, buffer)
+        self.tail = tail  # extra wait so the device buffer drains fully
+        self._queue: "queue.Queue[Optional[AudioClip]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._interrupt = threading.Event()
+        self._generation = 0
+        self._current: Optional[AudioClip] = None
+        self._thread: Optional[threading.Thread] = None
+        self.idle = threading.Event()
+        self.idle.set()
+
+    def start(self):
+        """Initialise the mixer once and start the playback thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        if not pygame.mixer.get_init():
+            pygame.mixer.init(*self.mixer_args)
+        self._thread = threading.Thread(target=self._worker, daemon=True)
+        self._thread.start()
+
+    def enqueue(self, clip: AudioClip) -> AudioClip:
+        """Queue a clip for playback and return it"""
+        if not self._thread:
+            self.start()
+        with self._lock:
+            clip.generation = self._generation
+            self.idle.clear()
+            self._queue.put(clip)
+        return clip
+
+    def play(self, data: bytes = b"", text: str = "",
+             on_done: Optional[Callable[[AudioClip], None]] = None,
+             pcm: Optional[bytes] = None) -> AudioClip:
+        """Shortcut for enqueueing encoded audio or decoded PCM"""
+        return self.enqueue(AudioClip(data=data, text=text, on_done=on_done, pcm=pcm))
+
+    def decode(self, data: bytes) -> bytes:
+        """Decode mp3/wav once into raw PCM in the mixer's format"""
+        if not pygame.mixer.get_init():
+            pygame.mixer.init(*self.mixer_args)
+        return pygame.mixer.Sound(file=io.BytesIO(data)).get_raw()
+
+    def flush(self):
+        """Drop every clip that has not started playing yet"""
+        with self._lock:
+            self._generation += 1
+            dropped = self._drain()
+            if self._current is None:
+                self.idle.set()
+        for clip in dropped:
+            self._finish(clip, completed=False)
+
+    def stop(self):
+        """Flush the queue and cut off the clip that is playing now"""
+        with self._lock:
+            self._generation += 1
+            dropped = self._drain()
+            if self._current is not None:
+                self._interrupt.set()
+            else:
+                self.idle.set()
+        for clip in dropped:
+            self._finish(clip, completed=False)
+
+    def is_busy(self) -> bool:
+        """True while a clip is playing or waiting to play"""
+        return not self.idle.is_set()
+
+    def pending(self) -> int:
+        """Number of clips queued behind the current one"""
+        return self._queue.qsize()
+
+    def shutdown(self):
+        """Stop playback, end the worker and release the mixer"""
+        self.stop()
+        if self._thread:
+            self._queue.put(None)
+            self._thread.join(timeout=2)
+            self._thread = None
+        try:
+            pygame.mixer.quit()
+        except Exception:
+            pass
+
+    def _drain(self) -> list:
+        """Empty the queue (caller holds the lock)"""
+        dropped = []
+        while True:
+            try:
+                clip = self._queue.get_nowait()
+            except queue.Empty:
+                return dropped
+            if clip is None:
+                # Keep the shutdown sentinel for the worker
+                self._queue.put(None)
+                return dropped
+            dropped.append(clip)
+
+    def _finish(self, clip: AudioClip, completed: bool):
+        """Mark clip done and fire its callback"""
+        clip.completed = completed
+        if clip.on_done:
+            try:
+                clip.on_done(clip)
+            except Exception as e:
+                print(f"⚠️ Audio callback error: {e}")
+        clip.done.set()
+
+    def _worker(self):
+        """Playback loop"""
+        while True:
+            clip = self._queue.get()
+            if clip is None:
+                break
+
+            with self._lock:
+                if clip.generation != self._generation:
+                    stale = True
+                else:
+                    stale = False
+                    self._interrupt.clear()
+                    self._current = clip
+            if stale:
+                self._finish(clip, completed=False)
+                continue
+
+            completed = False
+            try:
+                if clip.pcm is not None:
+                    # Decoded PCM goes straight into a Sound buffer
+                    sound = pygame.mixer.Sound(buffer=clip.pcm)
+                else:
+                    sound = pygame.mixer.Sound(file=io.BytesIO(clip.data))
+                if clip.on_start:
+                    clip.on_start(clip)
+                channel = sound.play()
+                # Sleeps on the event: wakes at the end of the clip or on stop()
+                interrupted = self._interrupt.wait(sound.get_length() + self.tail)
+                if interrupted and channel is not None:
+                    channel.stop()
+                completed = not interrupted
+            except Exception as e:
+                print(f"❌ Playback error: {e}")
+
+            with self._lock:
+                self._current = None
+                if self._queue.empty():
+                    self.idle.set()
+            self._finish(clip, completed)
+
+# ============================================================================
+# DECODED SPEECH CACHE
+# ============================================================================
+
+class PCMCache:
+    """LRU of decoded speech, bounded by total PCM size.
+
+    Audio is decoded once when it is inserted, so repeated phrases
+    (greetings, fallback lines, knowledge-base answers) skip both
+    synthesis and MP3 decoding on later turns.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._items: "OrderedDict[tuple, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._format = None
+
+    def _check_format(self):
+        """Drop everything if the mixer format changed (caller holds the lock)"""
+        fmt = pygame.mixer.get_init()
+        if fmt != self._format:
+            self._items.clear()
+            self.size = 0
+            self._format = fmt
+
+    def get(self, key: tuple) -> Optional[bytes]:
+        """Cached PCM or None"""
+        with self._lock:
+            self._check_format()
+            pcm = self._items.get(key)
+            if pcm is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return pcm
+
+    def put(self, key: tuple, pcm: bytes):
+        """Insert decoded PCM, evicting the least recently used entries"""
+        if len(pcm) > self.max_bytes:
+            return
+        with self._lock:
+            self._check_format()
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._items[key] = pcm
+            self.size += len(pcm)
+            while self.size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.size -= len(evicted)
+
+    def stats(self) -> dict:
+        """Hit rate and memory use"""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._items),
+            "mb": round(self.size / (1024 * 1024), 1),
+            "hit_rate": round(self.hits / total, 2) if total else None,
+        }
@@ -0,0 +1,187 @@
+import concurrent.futures
+import threading
+import time
+from typing import List, Optional
+
+import speech_recognition as sr
+
+from audio_engine import AudioEngine
+from mic_stream import MicStream
+from vad import EnergyVAD
+
+# ============================================================================
+# BARGE-IN MONITOR
+# ============================================================================
+
+class BargeInMonitor:
+    """Listens on the mic while Saira talks and cuts her off when the user speaks.
+
+    On detection the monitor stops playback, cancels tracked synthesis
+    futures and keeps recording until the user pauses, so the new
+    utterance (including the words that triggered it) can go straight to
+    the recognizer.
+
+    With continuous capture running, the capture thread feeds frames in
+    through playback_started()/playback_frame() and records the utterance
+    itself; otherwise start() runs a monitor thread that reads the mic.
+    """
+
+    def __init__(self, audio_engine: AudioEngine, vad: Optional[EnergyVAD] = None,
+                 mic: Optional[MicStream] = None,
+                 sample_rate: int = 16000, frame_ms: int = 30,
+                 calibration_ms: int = 300, end_silence: float = 0.8,
+                 max_utterance: float = 15.0):
+        self.audio_engine = audio_engine
+        self.vad = vad or EnergyVAD()
+        self.mic = mic  # shared stream; the monitor opens its own mic without one
+        self.sample_rate = sample_rate
+        self.frame_size = sample_rate * frame_ms // 1000
+        self.frame_seconds = frame_ms / 1000
+        self.calibration_frames = max(1, calibration_ms // frame_ms)
+        self.end_silence = end_silence
+        self.max_utterance = max_utterance
+
+        self._watch = threading.Event()
+        self._pending: List[concurrent.futures.Future] = []
+        self._pending_lock = threading.Lock()
+        self._utterance: Optional[sr.AudioData] = None
+        self._thread: Optional[threading.Thread] = None
+        self.running = False
+        self._calibrating = 0
+        self.interrupted = threading.Event()
+        self._utterance_ready = threading.Event()
+
+        # Interruption latency samples in seconds
+        self.detect_latencies: List[float] = []
+        self.stop_latencies: List[float] = []
+
+    def start(self):
+        """Start the monitor thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self.running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop monitoring"""
+        self.running = False
+        self._watch.set()
+
+    def watch(self):
+        """Arm the monitor for the playback that was just queued"""
+        self.interrupted.clear()
+        self._utterance_ready.clear()
+        self._watch.set()
+
+    def track(self, future: concurrent.futures.Future):
+        """Register pending synthesis so a barge-in can cancel it"""
+        with self._pending_lock:
+            self._pending = [f for f in self._pending if not f.done()]
+            self._pending.append(future)
+
+    def consume(self) -> Optional[sr.AudioData]:
+        """Take the utterance captured by the last barge-in, if any.
+
+        Waits for the user to finish the interrupting sentence.
+        """
+        if not self.interrupted.is_set():
+            return None
+        self._utterance_ready.wait(self.max_utterance + 1)
+        self.interrupted.clear()
+        self._utterance_ready.clear()
+        audio, self._utterance = self._utterance, None
+        return audio
+
+    def stats(self) -> dict:
+        """Interruption latency summary in milliseconds"""
+        def mean_ms(samples):
+            return round(sum(samples) / len(samples) * 1000, 1) if samples else None
+        return {
+            "interruptions": len(self.stop_latencies),
+            "detect_ms": mean_ms(self.detect_latencies),
+            "stop_ms": mean_ms(self.stop_latencies),
+        }
+
+    def playback_started(self):
+        """Reset detection for a new stretch of playback"""
+        self.vad.reset()
+        self._calibrating = self.calibration_frames
+
+    def playback_frame(self, frame: bytes, frame_seconds: float) -> bool:
+        """Feed one frame captured during playback; True if it triggered a barge-in"""
+        if self._calibrating > 0:
+            # Floor starts at the loudest echo frame, however loud the speaker is
+            self._calibrating -= 1
+            self.vad.calibrate(frame)
+            return False
+        if not self.vad.process(frame):
+            return False
+        self._interrupt(time.perf_counter() - self.vad.trigger_frames * frame_seconds)
+        return True
+
+    def _interrupt(self, onset: float):
+        """Stop playback and pending synthesis"""
+        detected = time.perf_counter()
+        with self._pending_lock:
+            for future in self._pending:
+                future.cancel()
+            self._pending = []
+        self.interrupted.set()
+        self.audio_engine.stop()
+        stopped = time.perf_counter()
+
+        self.detect_latencies.append(detected - onset)
+        self.stop_latencies.append(stopped - onset)
+        print(f"✋ Barge-in: detected in {(detected - onset) * 1000:.0f}ms, "
+              f"playback stopped {(stopped - onset) * 1000:.0f}ms after speech onset")
+
+    def _loop(self):
+        """Monitor thread"""
+        while self.running:
+            self._watch.wait()
+            self._watch.clear()
+            if not self.running:
+                break
+            try:
+                self._monitor_playback()
+            except Exception as e:
+                print(f"⚠️ Barge-in monitor error: {e}")
+
+    def _monitor_playback(self):
+        """Read mic frames until playback ends or the user barges in"""
+        if self.mic is not None:
+            with self.mic.session() as source:
+                self.mic.drain()
+                self._watch_stream(source)
+        else:
+            with sr.Microphone(sample_rate=self.sample_rate, chunk_size=self.frame_size) as source:
+                self._watch_stream(source)
+
+    def _watch_stream(self, source: sr.Microphone):
+        """VAD over the open source while playback lasts"""
+        stream = source.stream
+        self.playback_started()
+
+        frames: List[bytes] = []
+        while self.audio_engine.is_busy():
+            frame = stream.read(self.frame_size)
+            frames.append(frame)
+            frames = frames[-self.vad.trigger_frames:]
+            if self.playback_frame(frame, self.frame_seconds):
+                try:
+                    self._utterance = self._record_rest(stream, frames, source.SAMPLE_WIDTH)
+                finally:
+                    self._utterance_ready.set()
+                return
+
+    def _record_rest(self, stream, frames: List[bytes], width: int) -> sr.AudioData:
+        """Keep recording after the trigger until the user pauses"""
+        silence = 0.0
+        elapsed = len(frames) * self.frame_seconds
+        while silence < self.end_silence and elapsed < self.max_utterance:
+            frame = stream.read(self.frame_size)
+            frames.append(frame)
+            elapsed += self.frame_seconds
+            silence = 0.0 if self.vad.is_speech(frame) else silence + self.frame_seconds
+        return sr.AudioData(b"".join(frames), self.sample_rate, width)
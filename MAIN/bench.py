@@ -0,0 +1,135 @@
+"""Latency benchmarks for Saira's voice pipeline.
+
+Run from the MAIN folder, for example:
+    python bench.py tts-loop --count 100
+    python bench.py decode --repeat 20
+"""
+import argparse
+import asyncio
+import io
+import os
+import statistics
+import time
+import wave
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+
+def summarize(label: str, samples: list):
+    """Print mean / p50 / p95 / max in milliseconds"""
+    if not samples:
+        print(f"{label:<28} no samples")
+        return
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"{label:<28} n={len(samples):<4} "
+          f"mean={statistics.mean(samples) * 1000:7.1f}ms "
+          f"p50={statistics.median(samples) * 1000:7.1f}ms "
+          f"p95={p95 * 1000:7.1f}ms "
+          f"max={ordered[-1] * 1000:7.1f}ms")
+
+def utterances(count: int) -> list:
+    """Short sentences in the style of Saira's replies"""
+    base = [
+        "Hi! I'm Saira. How can I help you today?",
+        "My name is Saira.",
+        "I'm not sure about that.",
+        "Photosynthesis is how plants make food from sunlight.",
+        "Jaipur is known as the Pink City of India.",
+    ]
+    return [f"{base[i % len(base)]} {i}" for i in range(count)]
+
+# ============================================================================
+# BENCHMARKS
+# ============================================================================
+
+def bench_tts_loop(args):
+    """asyncio.run per utterance vs. the persistent TTS event loop"""
+    from tts import EdgeTTS
+
+    texts = utterances(args.count)
+    engine = EdgeTTS(voice=args.voice)
+
+    before = []
+    for text in texts:
+        start = time.perf_counter()
+        asyncio.run(engine._synthesize(text, args.voice))
+        before.append(time.perf_counter() - start)
+
+    engine.start()
+    after = []
+    for text in texts:
+        start = time.perf_counter()
+        engine.synthesize(text).result(60)
+        after.append(time.perf_counter() - start)
+    engine.stop()
+
+    summarize("asyncio.run per utterance", before)
+    summarize("persistent event loop", after)
+
+def bench_decode(args):
+    """CPU time per second of speech for each playback format"""
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import pygame
+    from tts import EdgeTTS
+
+    pygame.mixer.init()
+    if args.mp3:
+        with open(args.mp3, "rb") as f:
+            mp3 = f.read()
+    else:
+        text = " ".join(utterances(8))
+        mp3 = asyncio.run(EdgeTTS(voice=args.voice)._synthesize(text, args.voice))
+
+    sound = pygame.mixer.Sound(file=io.BytesIO(mp3))
+    seconds = sound.get_length()
+    pcm = sound.get_raw()
+    frequency, size, channels = pygame.mixer.get_init()
+
+    wav_buffer = io.BytesIO()
+    with wave.open(wav_buffer, "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(abs(size) // 8)
+        w.setframerate(frequency)
+        w.writeframes(pcm)
+    wav = wav_buffer.getvalue()
+
+    formats = [
+        ("mp3 (decode on play)", lambda: pygame.mixer.Sound(file=io.BytesIO(mp3))),
+        ("wav", lambda: pygame.mixer.Sound(file=io.BytesIO(wav))),
+        ("pcm buffer", lambda: pygame.mixer.Sound(buffer=pcm)),
+    ]
+    print(f"Clip: {seconds:.1f}s of speech, mixer {frequency}Hz x{channels}")
+    for label, make in formats:
+        start = time.process_time()
+        for _ in range(args.repeat):
+            make()
+        cpu = (time.process_time() - start) / args.repeat
+        print(f"{label:<28} {cpu / seconds * 1000:8.2f}ms CPU per second of speech")
+    pygame.mixer.quit()
+
+# ============================================================================
+# ENTRY POINT
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Saira latency benchmarks")
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    p = sub.add_parser("tts-loop", help="edge-tts loop creation overhead")
+    p.add_argument("--count", type=int, default=100)
+    p.add_argument("--voice", default="en-IN-NeerjaNeural")
+    p.set_defaults(func=bench_tts_loop)
+
+    p = sub.add_parser("decode", help="CPU cost of mp3 vs wav vs decoded PCM playback")
+    p.add_argument("--repeat", type=int, default=20)
+    p.add_argument("--mp3", help="use this mp3 instead of synthesizing one")
+    p.add_argument("--voice", default="en-IN-NeerjaNeural")
+    p.set_defaults(func=bench_decode)
+
+    args = parser.parse_args()
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+import queue
+import statistics
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+import speech_recognition as sr
+
+from endpointing import AdaptiveEndpointer
+from mic_stream import MicStream
+from vad import EnergyVAD, frame_rms
+
+# ============================================================================
+# UTTERANCES
+# ============================================================================
+
+@dataclass
+class Utterance:
+    """One segmented stretch of user speech"""
+    audio: sr.AudioData
+    started: float  # time.monotonic() of speech onset
+    ended: float    # time.monotonic() when the segment was closed
+    barge_in: bool = False
+    text: Optional[str] = None  # final transcript from a streaming recognizer
+    transcribed_at: float = 0.0
+    tail_saved: float = 0.0  # seconds of end silence the endpointer skipped
+    wake_word: bool = False  # set by a wake-word gate listener
+
+    @property
+    def duration(self) -> float:
+        return self.ended - self.started
+
+# ============================================================================
+# CONTINUOUS CAPTURE
+# ============================================================================
+
+class ContinuousCapture:
+    """Reads the microphone all the time and hands complete utterances to a queue.
+
+    Every frame goes into a ring buffer. When the VAD fires, the segment
+    starts `pre_roll` seconds earlier so first syllables are kept, and it
+    is closed after `end_silence` of quiet (or when the adaptive
+    endpointer decides the user is done). While Saira is playing audio,
+    frames are not segmented (that would only capture her own voice)
+    unless a barge-in monitor is attached, which then decides whether the
+    user is talking over her.
+
+    Sound that stays above the threshold (a fan switched on after
+    calibration) would otherwise fill one `max_utterance` segment after
+    another: after `max_capped` capped segments in a row the noise floor
+    is reset to the level of that sound.
+
+    Listeners (e.g. a streaming recognizer, a wake-word spotter) see every
+    segment as it grows through speech_start(frames), speech_frame(frame)
+    and speech_end(utterance or None).
+    """
+
+    def __init__(self, mic: MicStream, vad: Optional[EnergyVAD] = None,
+                 frame_ms: int = 30, pre_roll: float = 0.3, end_silence: float = 0.8,
+                 min_utterance: float = 0.25, max_utterance: float = 15.0,
+                 ring_seconds: float = 10.0, max_age: float = 10.0, echo_tail: float = 0.2,
+                 is_playing: Optional[Callable[[], bool]] = None, barge_in=None,
+                 listener=None, endpointer: Optional[AdaptiveEndpointer] = None,
+                 max_capped: int = 2):
+        self.mic = mic
+        self.vad = vad or EnergyVAD()
+        self.sample_rate = mic.sample_rate
+        self.frame_size = self.sample_rate * frame_ms // 1000
+        self.frame_seconds = frame_ms / 1000
+        self.pre_roll_frames = int(pre_roll / self.frame_seconds)
+        self.end_silence = end_silence
+        self.min_utterance = min_utterance
+        self.max_utterance = max_utterance
+        self.max_age = max_age
+        self.echo_tail = echo_tail
+        self.is_playing = is_playing or (lambda: False)
+        self.barge_in = barge_in
+        self.listeners = [listener] if listener is not None else []
+        self.endpointer = endpointer
+        self.max_capped = max_capped
+
+        self.ring: deque = deque(maxlen=int(ring_seconds / self.frame_seconds))
+        self.utterances: "queue.Queue[Utterance]" = queue.Queue()
+        self.in_speech = threading.Event()
+        self.running = False
+        self._thread: Optional[threading.Thread] = None
+        self._width = 2
+
+        # Segment state (capture thread only)
+        self._frames: List[bytes] = []
+        self._started = 0.0
+        self._silence = 0.0
+        self._from_barge_in = False
+        self._was_playing = False
+        self._quiet_after = 0.0
+        self._ambient_at = time.monotonic()
+        self._capped = 0  # segments in a row that hit max_utterance
+
+        self.dropped_stale = 0
+        self.recalibrated = 0
+
+    def start(self):
+        """Start the capture thread on the already-open mic"""
+        if self._thread and self._thread.is_alive():
+            return
+        # Seed the noise floor from the persisted calibration
+        ratio = getattr(self.mic.recognizer, "dynamic_energy_ratio", 1.5)
+        self.vad.reset(floor=self.mic.recognizer.energy_threshold / ratio)
+        self.running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop capturing and release the stream lock"""
+        self.running = False
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Utterance]:
+        """Next fresh utterance; waits for one in progress to finish.
+
+        Returns None if nobody started speaking within `timeout`.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                if not self.in_speech.is_set():
+                    return None
+                remaining = self.max_utterance
+            try:
+                utterance = self.utterances.get(timeout=remaining)
+            except queue.Empty:
+                if self.in_speech.is_set():
+                    continue
+                return None
+            if time.monotonic() - utterance.ended > self.max_age:
+                self.dropped_stale += 1
+                continue
+            return utterance
+
+    def clear(self):
+        """Drop queued utterances"""
+        while True:
+            try:
+                self.utterances.get_nowait()
+            except queue.Empty:
+                return
+
+    def add_listener(self, listener):
+        """Attach a segment listener (call before start)"""
+        self.listeners.append(listener)
+
+    def _run(self):
+        """Capture thread: owns the stream for the whole session"""
+        try:
+            with self.mic.session() as source:
+                self._width = source.SAMPLE_WIDTH
+                self.mic.drain()
+                while self.running:
+                    frame = source.stream.read(self.frame_size)
+                    self.ring.append(frame)
+                    self._process(frame, time.monotonic())
+        except Exception as e:
+            print(f"❌ Capture error: {e}")
+            self.running = False
+
+    def _process(self, frame: bytes, now: float):
+        """Segmentation state machine for one frame"""
+        if self.in_speech.is_set():
+            self._continue_segment(frame, now)
+            return
+
+        playing = self.is_playing()
+        if playing != self._was_playing:
+            self._was_playing = playing
+            if playing and self.barge_in is not None:
+                self.barge_in.playback_started()
+            if not playing:
+                self._quiet_after = now + self.echo_tail
+
+        if playing:
+            if self.barge_in is not None and self.barge_in.playback_frame(frame, self.frame_seconds):
+                self._start_segment(now, self.barge_in.vad.trigger_frames, barge_in=True)
+            return
+        if now < self._quiet_after:
+            return  # speaker echo still ringing
+
+        if self.vad.process(frame):
+            self._start_segment(now, self.vad.trigger_frames)
+        elif self.vad.run == 0 and now - self._ambient_at > self.mic.recalibrate_every:
+            # Quiet frames keep the persisted calibration up to date
+            self._ambient_at = now
+            self.mic.update_ambient(self.vad.floor)
+
+    def _start_segment(self, now: float, trigger_frames: int, barge_in: bool = False):
+        """Open a segment including pre-roll from the ring buffer"""
+        keep = min(len(self.ring), trigger_frames + self.pre_roll_frames)
+        self._frames = list(self.ring)[-keep:]
+        self._started = now - trigger_frames * self.frame_seconds
+        self._silence = 0.0
+        self._from_barge_in = barge_in
+        if self.endpointer is not None:
+            self.endpointer.start()
+            self.endpointer.speech_time = trigger_frames * self.frame_seconds
+        self.in_speech.set()
+        self._notify("speech_start", list(self._frames))
+
+    def _continue_segment(self, frame: bytes, now: float):
+        """Extend the open segment and close it after enough silence"""
+        self._frames.append(frame)
+        self._notify("speech_frame", frame)
+        speech = self.vad.is_speech(frame)
+        if speech:
+            self._silence = 0.0
+        else:
+            self._silence += self.frame_seconds
+
+        if self.endpointer is not None:
+            self.endpointer.update(speech, self.frame_seconds)
+            ended = self.endpointer.should_end()
+        else:
+            ended = self._silence >= self.end_silence
+        too_long = now - self._started >= self.max_utterance
+        if ended or too_long:
+            self._close_segment(now, capped=not ended)
+
+    def _notify(self, event: str, arg):
+        """Forward a segment event to the listeners without killing capture"""
+        for listener in list(self.listeners):
+            try:
+                getattr(listener, event)(arg)
+            except Exception as e:
+                print(f"⚠️ Capture listener error: {e}")
+                self.listeners.remove(listener)
+
+    def _close_segment(self, now: float, capped: bool = False):
+        """Queue the finished utterance"""
+        speech = now - self._started - self._silence
+        utterance = None
+        if speech >= self.min_utterance:
+            audio = sr.AudioData(b"".join(self._frames), self.sample_rate, self._width)
+            utterance = Utterance(audio, self._started, now, self._from_barge_in)
+            if self.endpointer is not None:
+                utterance.tail_saved = self.endpointer.finish()
+        self._notify("speech_end", utterance)
+        if utterance is not None:
+            self.utterances.put(utterance)
+        self._capped = self._capped + 1 if capped else 0
+        if self._capped >= self.max_capped:
+            self._recalibrate()
+        self._frames = []
+        self.vad.run = 0
+        self.in_speech.clear()
+
+    def _recalibrate(self):
+        """Steady sound kept the segments open: take its level as the new floor"""
+        floor = statistics.median(frame_rms(f, self._width) for f in self._frames)
+        print(f"🔇 Constant background sound, noise floor {self.vad.floor:.0f} -> {floor:.0f}")
+        self.vad.reset(floor=floor)
+        self._capped = 0
+        self.recalibrated += 1
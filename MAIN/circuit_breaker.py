@@ -0,0 +1,134 @@
+import threading
+import time
+from typing import Callable, Optional
+
+# ============================================================================
+# CIRCUIT BREAKER
+# ============================================================================
+
+class CircuitBreaker:
+    """Stops calling a failing service and notices in the background when it is back.
+
+    While closed every call goes through; `failure_threshold` failures or
+    slow calls (over `slow_call` seconds) in a row open it. While open,
+    allow() is False so callers use their fallback at once instead of
+    waiting for timeouts, and `probe()` runs every `probe_every` seconds
+    on a background thread until it succeeds, which closes the breaker.
+    Without a probe, one trial call is let through every `probe_every`
+    seconds instead (half-open).
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, probe: Optional[Callable[[], bool]] = None, failure_threshold: int = 3,
+                 slow_call: float = 6.0, probe_every: float = 10.0, name: str = "service"):
+        self.probe = probe
+        self.failure_threshold = failure_threshold
+        self.slow_call = slow_call
+        self.probe_every = probe_every
+        self.name = name
+        self.state = self.CLOSED
+        self.strikes = 0  # failures or slow calls in a row
+        self._lock = threading.Lock()
+        self._opened_at = 0.0
+        self._next_trial = 0.0
+        self._wake = threading.Event()
+        self._prober: Optional[threading.Thread] = None
+        self._running = True
+
+        self.trips = 0
+        self.rejected = 0
+        self.probes = 0
+        self.open_time = 0.0
+
+    @property
+    def is_open(self) -> bool:
+        """Service considered down (half-open counts as down too)"""
+        return self.state != self.CLOSED
+
+    def allow(self) -> bool:
+        """Whether a call should be made now"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            now = time.monotonic()
+            if self.probe is None and now >= self._next_trial:
+                self.state = self.HALF_OPEN
+                self._next_trial = now + self.probe_every
+                return True
+            self.rejected += 1
+            return False
+
+    def success(self, latency: float = 0.0):
+        """Record a completed call; a slow one counts as a strike"""
+        if latency > self.slow_call:
+            self.failure(f"slow call ({latency:.1f}s)")
+            return
+        with self._lock:
+            self.strikes = 0
+            if self.state != self.CLOSED:
+                self._close()
+
+    def failure(self, reason: str = "failed call"):
+        """Record a failed call"""
+        with self._lock:
+            self.strikes += 1
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+            elif self.state == self.CLOSED and self.strikes >= self.failure_threshold:
+                self._open(reason)
+
+    def _open(self, reason: str):
+        """Trip (caller holds the lock)"""
+        self.state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._next_trial = self._opened_at + self.probe_every
+        self.trips += 1
+        print(f"🔌 {self.name} unreachable ({reason}), answering offline")
+        if self.probe is not None:
+            self._wake.clear()
+            if self._prober is None or not self._prober.is_alive():
+                self._prober = threading.Thread(target=self._probe_loop, daemon=True)
+                self._prober.start()
+
+    def _close(self):
+        """Back to normal (caller holds the lock)"""
+        self.open_time += time.monotonic() - self._opened_at
+        self.state = self.CLOSED
+        self.strikes = 0
+        self._wake.set()
+        print(f"✅ {self.name} reachable again")
+
+    def _probe_loop(self):
+        """Background probing while open"""
+        while self._running and not self._wake.wait(self.probe_every):
+            self.probes += 1
+            start = time.perf_counter()
+            try:
+                ok = self.probe()
+            except Exception:
+                ok = False
+            if ok and time.perf_counter() - start <= self.slow_call:
+                with self._lock:
+                    if self.state != self.CLOSED:
+                        self._close()
+                return
+
+    def stop(self):
+        """End background probing"""
+        self._running = False
+        self._wake.set()
+
+    def stats(self) -> dict:
+        open_time = self.open_time
+        if self.state != self.CLOSED:
+            open_time += time.monotonic() - self._opened_at
+        return {
+            "state": self.state,
+            "trips": self.trips,
+            "rejected": self.rejected,
+            "probes": self.probes,
+            "open_s": round(open_time, 1),
+        }
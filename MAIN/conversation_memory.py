@@ -0,0 +1,159 @@
+import threading
+from typing import Callable, List, Optional
+
+# ============================================================================
+# CONVERSATION MEMORY
+# ============================================================================
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token for English)"""
+    return len(text) // 4 + 1
+
+class ConversationMemory:
+    """Recent turns verbatim plus a running summary of older ones.
+
+    The verbatim part is kept within `budget` tokens. Once an exchange
+    pushes it over, the oldest messages (never the last `keep_recent`)
+    are folded into the summary on a background thread with
+    `summarize(previous_summary, messages) -> str`, so requests stay small
+    without the conversation forgetting what it was about. Until a fold
+    finishes, messages that don't fit the budget are left out of
+    requests rather than sent in full.
+    """
+
+    def __init__(self, budget: int = 400, keep_recent: int = 2, summary_budget: int = 120,
+                 summarize: Optional[Callable[[str, List[dict]], str]] = None):
+        self.budget = budget
+        self.keep_recent = keep_recent
+        self.summary_budget = summary_budget
+        self.summarize = summarize
+        self.messages: List[dict] = []
+        self.summary = ""
+        self._lock = threading.Lock()
+        self._folding = False
+        self._folded_tokens = 0  # verbatim tokens already folded into the summary
+
+        self.folds = 0
+        self.failed_folds = 0
+        self.sent_tokens: List[int] = []  # history tokens per request
+        self.raw_tokens: List[int] = []   # what the full history would have cost
+
+    def add_exchange(self, user_text: str, reply: str):
+        """Record a finished turn and fold old ones if over budget"""
+        with self._lock:
+            self.messages.append({"role": "user", "content": user_text})
+            self.messages.append({"role": "assistant", "content": reply})
+        self._maybe_fold()
+
+    def recent(self, count: int) -> List[dict]:
+        """Last `count` verbatim messages"""
+        with self._lock:
+            return list(self.messages[-count:]) if count else []
+
+    def context(self) -> List[dict]:
+        """History for the next request: summary first, then the newest
+        messages that fit the budget (oldest dropped first)"""
+        with self._lock:
+            summary = self.summary
+            messages = list(self.messages)
+            folded = self._folded_tokens
+        kept, used = [], 0
+        for msg in reversed(messages):
+            cost = estimate_tokens(msg["content"])
+            if kept and used + cost > self.budget:
+                break
+            kept.append(msg)
+            used += cost
+        kept.reverse()
+        # Start with a user turn so the summary pair stays well-formed
+        while kept and kept[0]["role"] != "user":
+            used -= estimate_tokens(kept.pop(0)["content"])
+
+        context = []
+        if summary:
+            context.append({"role": "user", "content": f"(Summary of our earlier conversation: {summary})"})
+            context.append({"role": "assistant", "content": "Okay."})
+            used += estimate_tokens(summary) + 6
+        context.extend(kept)
+        self.sent_tokens.append(used)
+        self.raw_tokens.append(folded + sum(estimate_tokens(m["content"]) for m in messages))
+        return context
+
+    def _tokens(self) -> int:
+        """Verbatim history size (caller holds the lock)"""
+        return sum(estimate_tokens(m["content"]) for m in self.messages)
+
+    def _maybe_fold(self):
+        """Start a background fold when the verbatim part is over budget"""
+        with self._lock:
+            if self._folding or self._tokens() <= self.budget:
+                return
+            # Fold down to half the budget so this doesn't run every turn
+            count, remaining = 0, self._tokens()
+            limit = len(self.messages) - self.keep_recent
+            while count < limit and remaining > self.budget // 2:
+                remaining -= estimate_tokens(self.messages[count]["content"])
+                count += 1
+            if count % 2:
+                count += 1 if count < limit else -1  # keep user/reply pairs together
+            if count <= 0:
+                return
+            old = list(self.messages[:count])
+            previous = self.summary
+            self._folding = True
+        threading.Thread(target=self._fold, args=(previous, old, count), daemon=True).start()
+
+    def _fold(self, previous: str, old: List[dict], count: int):
+        """Background: merge `old` into the summary and drop them"""
+        summary = None
+        if self.summarize is not None:
+            try:
+                summary = self.summarize(previous, old)
+            except Exception as e:
+                print(f"⚠️ Conversation summary failed: {e}")
+        if not summary:
+            self.failed_folds += 1
+            summary = self._fallback_summary(previous, old)
+        summary = self._trim(summary)
+        with self._lock:
+            self.summary = summary
+            self._folded_tokens += sum(estimate_tokens(m["content"]) for m in old)
+            del self.messages[:count]
+            self._folding = False
+            self.folds += 1
+        # More turns may have arrived while this was running
+        self._maybe_fold()
+
+    def _fallback_summary(self, previous: str, old: List[dict]) -> str:
+        """Local summary when the model can't be asked: the user's questions"""
+        asked = [m["content"] for m in old if m["role"] == "user"]
+        parts = ([previous] if previous else []) + [f"User asked: {q}" for q in asked]
+        return " ".join(parts)
+
+    def _trim(self, summary: str) -> str:
+        """Keep the summary within its own budget (newest part wins)"""
+        summary = " ".join(summary.split())
+        max_chars = self.summary_budget * 4
+        if len(summary) > max_chars:
+            summary = "..." + summary[-max_chars:]
+        return summary
+
+    def clear(self):
+        with self._lock:
+            self.messages.clear()
+            self.summary = ""
+            self._folded_tokens = 0
+
+    def stats(self) -> dict:
+        """Summaries made and average history tokens per request"""
+        if not self.sent_tokens:
+            return {"folds": self.folds}
+        sent = sum(self.sent_tokens) / len(self.sent_tokens)
+        raw = sum(self.raw_tokens) / len(self.raw_tokens)
+        return {
+            "folds": self.folds,
+            "fallback_summaries": self.failed_folds,
+            "summary_tokens": estimate_tokens(self.summary) if self.summary else 0,
+            "avg_history_tokens": round(sent),
+            "avg_full_history_tokens": round(raw),
+        }
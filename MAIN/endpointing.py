@@ -0,0 +1,126 @@
+from typing import List
+
+# ============================================================================
+# ADAPTIVE END-OF-UTTERANCE DETECTION
+# ============================================================================
+
+# A hypothesis ending in one of these words is very likely unfinished
+CONTINUATION_WORDS = {
+    "a", "an", "the", "and", "or", "but", "so", "because", "of", "to", "in",
+    "on", "for", "with", "about", "is", "are", "was", "what", "who", "how",
+    "why", "when", "where", "which", "my", "your", "me", "i", "can", "could",
+    "please", "tell", "um", "uh",
+}
+
+class AdaptiveEndpointer:
+    """Silence timeout that adapts to utterance length and speaking rhythm.
+
+    Instead of waiting a fixed `max_silence` (recognizer.pause_threshold)
+    after every phrase:
+    - short commands end after close to `min_silence`, and the timeout
+      grows towards `max_silence` as the utterance gets longer;
+    - speaking rate is estimated from speech bursts per second; a user
+      talking faster than their usual pace gets a shorter window, a slower
+      one a longer window;
+    - pauses the user makes inside their sentences are tracked across
+      turns, and the timeout never drops below `pause_margin` times the
+      typical pause, so slow speakers are not cut off;
+    - with a streaming transcript, a hypothesis that ends in a
+      continuation word ("what is the ...") waits the full timeout, and a
+      complete-looking one may end at the minimum.
+    """
+
+    def __init__(self, min_silence: float = 0.35, max_silence: float = 1.0,
+                 long_utterance: float = 3.0, pause_margin: float = 1.5,
+                 alpha: float = 0.2):
+        self.min_silence = min_silence
+        self.max_silence = max_silence
+        self.long_utterance = long_utterance
+        self.pause_margin = pause_margin
+        self.alpha = alpha
+        self.typical_pause = 0.0  # moving average of pauses inside utterances
+        self.typical_rate = 0.0   # moving average of bursts per second of speech
+
+        self.speech_time = 0.0
+        self.silence = 0.0
+        self.bursts = 0
+        self.hypothesis = ""
+        self.saved: List[float] = []
+
+    def start(self):
+        """New utterance"""
+        self.speech_time = 0.0
+        self.silence = 0.0
+        self.bursts = 1
+        self.hypothesis = ""
+
+    def set_hypothesis(self, text: str):
+        """Latest partial transcript, if a streaming recognizer is running"""
+        self.hypothesis = text
+
+    def update(self, is_speech: bool, frame_seconds: float):
+        """Account one frame of the open segment"""
+        if is_speech:
+            if self.silence > 0.0:
+                self.bursts += 1
+                # The user paused and carried on: learn their pause length
+                if self.typical_pause == 0.0:
+                    self.typical_pause = self.silence
+                else:
+                    self.typical_pause += (self.silence - self.typical_pause) * self.alpha
+            self.silence = 0.0
+            self.speech_time += frame_seconds
+        else:
+            self.silence += frame_seconds
+
+    def timeout(self) -> float:
+        """Silence that ends the current utterance"""
+        words = self.hypothesis.split()
+        if words and words[-1].lower() in CONTINUATION_WORDS:
+            return self.max_silence
+
+        progress = min(1.0, self.speech_time / self.long_utterance)
+        timeout = self.min_silence + (self.max_silence - self.min_silence) * progress
+        if words:
+            # Complete-looking transcript: lean towards the short end
+            timeout = self.min_silence + (timeout - self.min_silence) * 0.5
+        rate = self.rate()
+        if rate and self.typical_rate:
+            timeout *= min(1.25, max(0.75, self.typical_rate / rate))
+        timeout = max(timeout, self.typical_pause * self.pause_margin)
+        return min(self.max_silence, max(self.min_silence, timeout))
+
+    def rate(self) -> float:
+        """Speech bursts per second in the current utterance"""
+        if self.speech_time < 0.5:
+            return 0.0  # too little speech to tell
+        return self.bursts / self.speech_time
+
+    def should_end(self) -> bool:
+        """True once the trailing silence reached the timeout"""
+        return self.silence >= self.timeout()
+
+    def finish(self) -> float:
+        """Close the utterance; returns tail latency saved vs. the fixed window"""
+        rate = self.rate()
+        if rate:
+            if self.typical_rate == 0.0:
+                self.typical_rate = rate
+            else:
+                self.typical_rate += (rate - self.typical_rate) * self.alpha
+        if self.silence < self.min_silence:
+            saved = 0.0  # cut by the length limit, not by silence
+        else:
+            saved = max(0.0, self.max_silence - self.silence)
+        self.saved.append(saved)
+        return saved
+
+    def stats(self) -> dict:
+        """Tail latency saved per turn"""
+        if not self.saved:
+            return {"turns": 0}
+        return {
+            "turns": len(self.saved),
+            "mean_saved_ms": round(sum(self.saved) / len(self.saved) * 1000),
+            "total_saved_s": round(sum(self.saved), 2),
+        }
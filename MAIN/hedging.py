@@ -0,0 +1,143 @@
+import concurrent.futures
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, List, Optional, Tuple
+
+# ============================================================================
+# HEDGED REQUESTS
+# ============================================================================
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+class Hedger:
+    """Sends a backup request when the first one is slower than usual.
+
+    The hedge delay is the `pct` percentile of recent response times
+    (clamped to min/max, `default_delay` until `min_samples` are known),
+    so only the slow tail gets a second request. Whichever answers first
+    with a usable result wins. The other request is left to finish in
+    the background: its result is discarded, but its real latency is
+    recorded (so the saving is measured, not guessed) and handed to
+    `on_loser` so the caller can account for it.
+    """
+
+    def __init__(self, pct: float = 95.0, min_delay: float = 0.3, max_delay: float = 4.0,
+                 default_delay: float = 1.5, window: int = 100, min_samples: int = 10):
+        self.pct = pct
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.default_delay = default_delay
+        self.min_samples = min_samples
+        self.samples: deque = deque(maxlen=window)  # latency of the first request
+        self._lock = threading.Lock()
+
+        self.requests = 0
+        self.hedged = 0
+        self.backup_won = 0
+        self.latencies: List[float] = []  # what the caller waited
+        self.unhedged: List[float] = []   # what the first request took
+
+    def delay(self) -> float:
+        """Seconds to wait for the first request before hedging"""
+        if len(self.samples) < self.min_samples:
+            return self.default_delay
+        return min(self.max_delay, max(self.min_delay, percentile(list(self.samples), self.pct)))
+
+    def run(self, primary: Callable[[], concurrent.futures.Future],
+            backup: Callable[[], Optional[concurrent.futures.Future]],
+            ok: Callable[[Any], bool] = lambda result: True,
+            discard: Callable[[Any], None] = lambda result: None,
+            on_loser: Optional[Callable[[bool, float, Any], None]] = None) -> Tuple[Any, bool]:
+        """(result, came_from_backup) of whichever request answers usefully first.
+
+        `primary`/`backup` start a request and return its future (backup
+        may return None when there is nothing to hedge with); `discard`
+        releases a result nobody uses. `on_loser(was_backup, latency,
+        result)` is called once the other request has finished (result
+        None if it raised). Exceptions of the primary are re-raised if no
+        request succeeds.
+        """
+        self.requests += 1
+        start = time.monotonic()
+        first = primary()
+        try:
+            result = first.result(timeout=self.delay())
+            elapsed = time.monotonic() - start
+            self._record(elapsed, elapsed, elapsed)
+            return result, False
+        except concurrent.futures.TimeoutError:
+            pass
+
+        second = backup()
+        if second is None:
+            result = first.result()
+            elapsed = time.monotonic() - start
+            self._record(elapsed, elapsed, elapsed)
+            return result, False
+        self.hedged += 1
+        backup_start = time.monotonic()
+        finished = {}
+        for future in (first, second):
+            future.add_done_callback(lambda f: finished.setdefault(f, time.monotonic()))
+
+        winner = None
+        pending = {first, second}
+        while pending and winner is None:
+            done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None and ok(future.result()):
+                    winner = future
+                    break
+        elapsed = time.monotonic() - start
+        chosen = winner or first  # neither usable: the primary's outcome
+        if chosen is second:
+            self.backup_won += 1
+            # Updated with the primary's real latency once it finishes
+            index = self._record(None, elapsed, elapsed)
+        else:
+            index = self._record(elapsed if winner is not None else None, elapsed, elapsed)
+        loser = second if chosen is first else first
+
+        def settle(f: concurrent.futures.Future):
+            latency = finished.get(f, time.monotonic()) - (backup_start if f is second else start)
+            result = None if f.cancelled() or f.exception() is not None else f.result()
+            if f is first:
+                with self._lock:
+                    self.unhedged[index] = latency
+                if result is not None and ok(result):
+                    self.samples.append(latency)
+            if on_loser is not None:
+                on_loser(f is second, latency, result)
+            if result is not None:
+                discard(result)
+        loser.add_done_callback(settle)
+        return chosen.result(), chosen is second  # raises if it failed
+
+    def _record(self, sample: Optional[float], waited: float, primary: float) -> int:
+        """Store one request's latencies; returns its index in `unhedged`"""
+        with self._lock:
+            if sample is not None:
+                self.samples.append(sample)
+            self.latencies.append(waited)
+            self.unhedged.append(primary)
+            return len(self.unhedged) - 1
+
+    def stats(self) -> dict:
+        """Hedge rate and p99 latency with and without hedging"""
+        if not self.latencies:
+            return {"requests": 0}
+        return {
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "hedge_rate": round(self.hedged / self.requests, 2),
+            "backup_won": self.backup_won,
+            "delay_ms": round(self.delay() * 1000),
+            "p99_ms": round(percentile(self.latencies, 99) * 1000),
+            "p99_saved_ms": round((percentile(self.unhedged, 99) - percentile(self.latencies, 99)) * 1000),
+        }
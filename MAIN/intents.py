@@ -0,0 +1,117 @@
+import random
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+# ============================================================================
+# INTENT PATTERNS
+# ============================================================================
+
+# (name, pattern). Each pattern has to cover the whole utterance
+# once politeness and addressing are stripped, so "what is the time
+# complexity of quick sort" and "where is the bus stop" go to the LLM.
+# Earlier entries win on overlaps.
+INTENT_PATTERNS = [
+    ("switch_model", r"(?:use|switch to|change to)\s+(?:the\s+|your\s+)?"
+                     r"(?P<target>local|offline|ollama|online|gemini)(?:\s+(?:model|brain|mode))?"),
+    ("exit", r"exit|quit|good ?bye|bye(?: bye)?|stop|shut ?down|see you(?: later)?"
+             r"|that'?s all(?: for today)?"),
+    ("creator", r"who (?:made|created|built|designed|programmed|developed|invented) you"
+                r"|who (?:are|is) your (?:creators?|makers?|developers?)|where are you from"
+                r"|(?:tumhe|tujhe|aapko|apko) kisne banaya(?: hai)?"),
+    ("name", r"what(?:'?s| is) your name|(?:can you )?tell me your name|who are you"
+             r"|introduce yourself|(?:tumhara|aapka|apka|tera) naam(?: kya)?(?: hai)?"),
+    ("time", r"(?:what(?:'?s| is) the (?:current )?time|what time is it|(?:can you )?tell me the time"
+             r"|(?:kitne|kya) baje(?: hain| hai)?|time kya (?:hua|hai))(?: (?:right now|today))?"),
+    ("date", r"(?:what(?:'?s| is) (?:the date|today'?s date)|what day is (?:it|today)"
+             r"|which day is (?:it|today)|(?:can you )?tell me the date)(?: today)?"),
+]
+
+DEFAULT_TEMPLATES = {
+    "exit": ["Goodbye! Take care!"],
+    "name": ["My name is Saira."],
+    "creator": ["I was created by four students of Rawat Senior Secondary School in Jaipur: "
+                "Aryan, Umang, Arvin, and Monu."],
+    "time": ["It's {time}.", "Right now it's {time}."],
+    "date": ["Today is {date}."],
+}
+
+# Politeness and addressing around a request ("okay Saira, stop please")
+FILLER = r"(?:ok(?:ay)?|please|saira|sara|sarah|hey|now|then|so|well|thanks|thank you|alright|ji)"
+LEADING_FILLER = re.compile(rf"^(?:{FILLER}\b ?)+")
+TRAILING_FILLER = re.compile(rf"(?: ?\b{FILLER})+$")
+
+def normalize(text: str) -> str:
+    """Lowercase, straight apostrophes, no punctuation, single spaces"""
+    text = text.lower().replace("’", "'")
+    text = re.sub(r"[^\w\s']+", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+def strip_filler(norm: str) -> str:
+    """The request without politeness and addressing around it"""
+    norm = LEADING_FILLER.sub("", norm)
+    return TRAILING_FILLER.sub("", norm).strip()
+
+# ============================================================================
+# INTENT MATCHING
+# ============================================================================
+
+@dataclass
+class Intent:
+    """A recognized local intent"""
+    name: str
+    reply: Optional[str] = None  # None when the caller acts on it (switch_model)
+    slots: Dict[str, str] = field(default_factory=dict)
+
+class IntentMatcher:
+    """Recognizes fixed intents with one compiled regex, before any LLM call.
+
+    All patterns are alternatives of a single regex that has to match the
+    whole utterance (fillers aside), so an intent phrase inside a longer
+    question never fires. match() returns an Intent with a reply rendered
+    from its templates, or None so the question goes to the normal answer
+    path.
+    """
+
+    def __init__(self, templates: Optional[Dict[str, List[str]]] = None,
+                 clock: Callable[[], time.struct_time] = time.localtime):
+        self.templates = {**DEFAULT_TEMPLATES, **(templates or {})}
+        self.clock = clock
+        self.names = [name for name, _ in INTENT_PATTERNS]
+        self.pattern = re.compile("|".join(f"(?P<{name}>{pattern})"
+                                           for name, pattern in INTENT_PATTERNS))
+        self.counts: Counter = Counter()
+        self.missed = 0  # utterances that went on to the LLM
+
+    def match(self, text: str) -> Optional[Intent]:
+        """Intent of the utterance, or None"""
+        request = strip_filler(normalize(text))
+        m = self.pattern.fullmatch(request) if request else None
+        if m is None:
+            self.missed += 1
+            return None
+        name = next(n for n in self.names if m.group(n) is not None)
+        self.counts[name] += 1
+        slots = {"target": m.group("target")} if name == "switch_model" else {}
+        return Intent(name, self.reply(name), slots)
+
+    def reply(self, name: str) -> Optional[str]:
+        """Rendered template for an intent"""
+        options = self.templates.get(name)
+        if not options:
+            return None
+        now = self.clock()
+        hour = now.tm_hour % 12 or 12
+        return random.choice(options).format(
+            time=f"{hour}:{now.tm_min:02d} {'AM' if now.tm_hour < 12 else 'PM'}",
+            date=f"{time.strftime('%A', now)}, {now.tm_mday} {time.strftime('%B', now)}",
+        )
+
+    def fixed_replies(self) -> List[str]:
+        """Replies that never change, for prefetching their speech"""
+        return [t for options in self.templates.values() for t in options if "{" not in t]
+
+    def stats(self) -> dict:
+        return {"matched": dict(self.counts), "missed": self.missed}
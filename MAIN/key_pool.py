@@ -0,0 +1,132 @@
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+# ============================================================================
+# API KEY POOL
+# ============================================================================
+
+@dataclass
+class KeyHealth:
+    """Live state of one API key"""
+    key: str
+    index: int
+    calls: int = 0
+    errors: int = 0
+    rate_limited: int = 0
+    consecutive_errors: int = 0
+    latency: float = 0.0  # moving average in seconds, 0 until the first success
+    cooldown_until: float = 0.0
+    sent: deque = field(default_factory=deque)  # request times in the last minute
+
+    @property
+    def label(self) -> str:
+        return f"#{self.index + 1}"
+
+def parse_retry_delay(headers, body: str = "") -> Optional[float]:
+    """Seconds until a rate limit resets, from Retry-After or Gemini's RetryInfo"""
+    value = headers.get("Retry-After") if headers else None
+    if value:
+        try:
+            return float(value)
+        except ValueError:
+            pass
+    match = re.search(r'"retryDelay"\s*:\s*"(\d+(?:\.\d+)?)s"', body or "")
+    return float(match.group(1)) if match else None
+
+class KeyPool:
+    """Picks the healthiest API key for each request.
+
+    Keys over their per-minute budget (`rpm`) or cooling down after a
+    rate limit, auth error or repeated failures are skipped without
+    waiting. Among the rest, the key with the lowest recent latency wins
+    (unused keys first, so every key gets measured).
+    """
+
+    def __init__(self, keys: List[str], rpm: int = 15, cooldown: float = 60.0,
+                 auth_cooldown: float = 3600.0, error_cooldown: float = 10.0,
+                 alpha: float = 0.3):
+        self.keys = [KeyHealth(k, i) for i, k in enumerate(keys) if k]
+        self.rpm = rpm
+        self.cooldown = cooldown
+        self.auth_cooldown = auth_cooldown
+        self.error_cooldown = error_cooldown
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self.exhausted = 0  # requests that found no usable key
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _ready(self, health: KeyHealth, now: float) -> bool:
+        """Not cooling down and under the per-minute budget (caller holds the lock)"""
+        while health.sent and now - health.sent[0] > 60.0:
+            health.sent.popleft()
+        return now >= health.cooldown_until and (not self.rpm or len(health.sent) < self.rpm)
+
+    def acquire(self, exclude: Iterable[KeyHealth] = ()) -> Optional[KeyHealth]:
+        """Healthiest usable key, or None if every key is cooling down"""
+        skip = {id(h) for h in exclude}
+        now = time.monotonic()
+        with self._lock:
+            ready = [h for h in self.keys if id(h) not in skip and self._ready(h, now)]
+            if not ready:
+                self.exhausted += 1
+                return None
+            best = min(ready, key=lambda h: (h.latency * (1 + h.consecutive_errors), len(h.sent)))
+            best.sent.append(now)
+            best.calls += 1
+            return best
+
+    def success(self, health: KeyHealth, latency: float):
+        """Request went through"""
+        with self._lock:
+            health.consecutive_errors = 0
+            health.latency = latency if health.latency == 0.0 else (
+                health.latency + (latency - health.latency) * self.alpha)
+
+    def failure(self, health: KeyHealth, status: Optional[int] = None,
+                retry_after: Optional[float] = None):
+        """Request failed; status is the HTTP code (None for network errors)"""
+        with self._lock:
+            health.errors += 1
+            health.consecutive_errors += 1
+            now = time.monotonic()
+            if status == 429:
+                health.rate_limited += 1
+                health.cooldown_until = now + (retry_after or self.cooldown)
+            elif status in (401, 403):
+                health.cooldown_until = now + self.auth_cooldown
+            elif health.consecutive_errors >= 2:
+                health.cooldown_until = now + self.error_cooldown * health.consecutive_errors
+
+    def next_ready_in(self) -> float:
+        """Seconds until some key can be used again"""
+        now = time.monotonic()
+        with self._lock:
+            waits = []
+            for h in self.keys:
+                if self._ready(h, now):
+                    return 0.0
+                wait = h.cooldown_until - now
+                if self.rpm and len(h.sent) >= self.rpm:
+                    wait = max(wait, 60.0 - (now - h.sent[0]))
+                waits.append(wait)
+        return max(0.0, min(waits)) if waits else 0.0
+
+    def stats(self) -> Dict[str, dict]:
+        """Per-key counters (keys are shown by position only)"""
+        now = time.monotonic()
+        return {
+            h.label: {
+                "calls": h.calls,
+                "errors": h.errors,
+                "rate_limited": h.rate_limited,
+                "latency_ms": round(h.latency * 1000) if h.latency else None,
+                "cooldown_s": round(max(0.0, h.cooldown_until - now)),
+            }
+            for h in self.keys
+        }
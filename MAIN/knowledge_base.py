@@ -0,0 +1,137 @@
+import difflib
+import json
+import os
+import re
+import threading
+from typing import List, Optional, Tuple
+
+# ============================================================================
+# LOCAL KNOWLEDGE BASE (qa_blocks.txt)
+# ============================================================================
+
+def normalize_question(text: str) -> str:
+    """Lowercase words only, as saira0.2 compares them"""
+    return re.sub(r'\W+', ' ', text.lower()).strip()
+
+# Words that say nothing about the topic ("what is ...", "tell me about ...")
+STOPWORDS = frozenset("""
+a about an and any are as at be can could current did do does for from give
+have how i in is it its know me much my of on or please say should tell than
+that the their them then there these they this to was we were what when where
+which who whom why will with would you your yours
+""".split())
+
+def content_words(text: str) -> set:
+    """Topic words of a question, without stopwords or a plural s"""
+    words = normalize_question(text).split()
+    return {w[:-1] if len(w) > 3 and w.endswith("s") else w
+            for w in words if w not in STOPWORDS}
+
+def load_blocks(path: str) -> List[dict]:
+    """Load blocks from qa_blocks.txt using the ---BLOCK--- format"""
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    blocks = []
+    for part in text.split('---BLOCK---'):
+        part = part.strip()
+        if not part:
+            continue
+        lines = [l.rstrip() for l in part.splitlines() if l.strip()]
+        block = {"id": None, "q": "", "answers": []}
+        for ln in lines:
+            if ln.lower().startswith("id:"):
+                block["id"] = ln.split(":", 1)[1].strip()
+            elif ln.lower().startswith("q:"):
+                block["q"] = ln.split(":", 1)[1].strip()
+            elif re.match(r'^a\d+\s*:', ln, flags=re.I):
+                block["answers"].append(ln.split(":", 1)[1].strip())
+            elif not block["q"]:
+                block["q"] = ln
+            else:
+                block["answers"].append(ln)
+        if block["q"] and block["answers"]:
+            blocks.append(block)
+    return blocks
+
+class KnowledgeBase:
+    """Question/answer blocks matched by text similarity.
+
+    Matching is the difflib ratio on normalized text, in percent, with
+    the answer rotation stored in qa_meta.json; saira.py and saira0.2 both
+    use this class, so they share one database and one matcher. Questions are normalized once at load
+    and candidates whose quick upper bound can't beat the best score so
+    far are skipped. The rotation is kept in memory and written by save(),
+    not after every answer.
+    """
+
+    def __init__(self, qa_file: str, meta_file: Optional[str] = None):
+        self.qa_file = qa_file
+        self.meta_file = meta_file
+        self.blocks: List[dict] = []
+        self.meta: dict = {}
+        self.dirty = False  # rotation changed since the last save
+        self._questions: List[str] = []
+        self._lock = threading.Lock()
+
+    def load(self) -> int:
+        """(Re)load blocks and rotation state; returns the block count"""
+        self.blocks = load_blocks(self.qa_file)
+        self._questions = [normalize_question(b["q"]) for b in self.blocks]
+        self.meta = {}
+        self.dirty = False
+        if self.meta_file and os.path.exists(self.meta_file):
+            try:
+                with open(self.meta_file, "r", encoding="utf-8") as f:
+                    self.meta = json.load(f)
+            except Exception as e:
+                print(f"⚠️ Could not load QA meta: {e}")
+        return len(self.blocks)
+
+    def match(self, text: str) -> Tuple[Optional[dict], float]:
+        """Best block and its similarity in percent"""
+        query = normalize_question(text)
+        if not query:
+            return None, 0.0
+        matcher = difflib.SequenceMatcher(None)
+        best, best_ratio = None, 0.0
+        for block, question in zip(self.blocks, self._questions):
+            if not question:
+                continue
+            matcher.set_seqs(query, question)
+            if matcher.real_quick_ratio() <= best_ratio or matcher.quick_ratio() <= best_ratio:
+                continue
+            ratio = matcher.ratio()
+            if ratio > best_ratio:
+                best, best_ratio = block, ratio
+        return best, round(best_ratio * 100, 2)
+
+    def related(self, text: str, block: dict) -> bool:
+        """Whether the question shares a topic word with the block's question.
+
+        Character similarity alone pairs "what is photosynthesis" with
+        "What is Physics?" (76%), so weak matches are checked with this.
+        """
+        return bool(content_words(text) & content_words(block["q"]))
+
+    def answer(self, block: dict) -> str:
+        """Next answer of the block, rotating through its variants"""
+        bid = str(block.get("id") or block["q"])
+        with self._lock:
+            index = (self.meta.get(bid, -1) + 1) % len(block["answers"])
+            self.meta[bid] = index
+            self.dirty = True
+        return block["answers"][index]
+
+    def save(self):
+        """Persist the answer rotation if it changed"""
+        with self._lock:
+            if not self.meta_file or not self.dirty:
+                return
+            try:
+                with open(self.meta_file, "w", encoding="utf-8") as f:
+                    json.dump(self.meta, f, indent=2, ensure_ascii=False)
+                self.dirty = False
+            except Exception as e:
+                print(f"⚠️ Could not save QA meta: {e}")
@@ -0,0 +1,389 @@
+import json
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from llm_client import LLMClient, LLMClientError
+from llm_stream import SentenceSplitter
+from text_sanitizer import TextSanitizer
+
+# ============================================================================
+# BACKEND INTERFACE
+# ============================================================================
+
+class LLMBackend:
+    """Chat model.
+
+    chat() returns (success, reply). With on_sentence the reply is
+    streamed and every complete sentence is handed over as soon as it is
+    ready. Generation settings come from named option profiles, so a
+    profile can be switched without touching the backend.
+    """
+
+    name = "base"
+    needs_network = False
+
+    def __init__(self, profiles: Optional[Dict[str, dict]] = None, profile: Optional[str] = None):
+        self.profiles = profiles or {}
+        self.profile = profile if profile in self.profiles else next(iter(self.profiles), "")
+        self.started = False
+
+    def available(self) -> bool:
+        """Whether the backend can answer right now"""
+        return True
+
+    def start(self):
+        """Connect or load the model ahead of the first turn"""
+        self.started = True
+
+    def stop(self):
+        """Release connections"""
+
+    def options(self) -> dict:
+        """Settings of the current profile"""
+        return dict(self.profiles.get(self.profile, {}))
+
+    def set_profile(self, name: str) -> bool:
+        if name not in self.profiles:
+            return False
+        self.profile = name
+        return True
+
+    def chat(self, user_message: str, on_sentence: Optional[Callable[[str], None]] = None
+             ) -> Tuple[bool, str]:
+        raise NotImplementedError
+
+# ============================================================================
+# GEMINI (ONLINE)
+# ============================================================================
+
+class GeminiBackend(LLMBackend):
+    """Gemini REST calls; key rotation, caching and retries stay with the caller.
+
+    `call_fn(text, generation_config)` and `stream_fn(text, on_sentence,
+    generation_config)` both return (success, reply). Profiles are
+    Gemini generationConfig dicts.
+    """
+
+    name = "gemini"
+    needs_network = True
+
+    def __init__(self, call_fn: Callable, stream_fn: Callable,
+                 profiles: Optional[Dict[str, dict]] = None, profile: Optional[str] = None):
+        super().__init__(profiles, profile)
+        self.call_fn = call_fn
+        self.stream_fn = stream_fn
+
+    def chat(self, user_message, on_sentence=None):
+        if on_sentence is not None:
+            return self.stream_fn(user_message, on_sentence, self.options())
+        return self.call_fn(user_message, self.options())
+
+# ============================================================================
+# OLLAMA (ON-DEVICE)
+# ============================================================================
+
+class OllamaBackend(LLMBackend):
+    """Local model served by Ollama's /api/chat, always streamed.
+
+    start() preloads the model with the system prompt, so the first
+    reply neither waits for the weights to load nor for the system
+    prompt to be evaluated: Ollama keeps the model for `keep_alive` after
+    every request and reuses the evaluated prompt prefix while it stays
+    loaded. Profiles are Ollama options; load-time options (num_ctx,
+    num_thread, num_gpu) should match across profiles, or switching
+    reloads the model.
+    """
+
+    name = "ollama"
+
+    def __init__(self, client: LLMClient, model: str = "gemma3:1b",
+                 host: str = "http://localhost:11434", system: str = "",
+                 history: Optional[Callable[[], List[dict]]] = None,
+                 sanitizer: Optional[TextSanitizer] = None, keep_alive: str = "30m",
+                 profiles: Optional[Dict[str, dict]] = None, profile: Optional[str] = None):
+        super().__init__(profiles, profile)
+        self.client = client
+        self.model = model
+        self.host = host.rstrip("/")
+        self.system = system
+        self.history = history or (lambda: [])
+        self.sanitizer = sanitizer
+        self.keep_alive = keep_alive
+        self.ready = True  # cleared when the server or model is missing
+        self.retry_every = 60.0
+        self._failed_at = 0.0
+        self._settled = threading.Event()  # set once the last preload has finished
+        self._preloading = threading.Lock()
+
+        self.load_time = 0.0
+        self.cold_loads = 0
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+        self.generate_time = 0.0
+
+    def available(self) -> bool:
+        # After a failure, offered again every `retry_every` seconds
+        return self.ready or time.monotonic() - self._failed_at > self.retry_every
+
+    def start(self):
+        """Connect to the server and preload the model in the background"""
+        if self.started:
+            return
+        self.started = True
+        self.client.start(warm_url=self.host)
+        self.retry()
+
+    def retry(self):
+        """Preload on a background thread, unless one is already running"""
+        if not self._preloading.acquire(blocking=False):
+            return
+        self._settled.clear()
+
+        def run():
+            try:
+                self.preload()
+            finally:
+                self._settled.set()
+                self._preloading.release()
+        threading.Thread(target=run, daemon=True).start()
+
+    def wait_ready(self, timeout: float) -> Optional[bool]:
+        """True once loaded, False if the server or model is missing, None if still loading"""
+        if not self.ready:
+            self.retry()
+        if not self._settled.wait(timeout):
+            return None
+        return self.ready
+
+    def stop(self):
+        if self.started:
+            self.client.stop()
+            self.started = False
+
+    def messages(self, user_message: Optional[str] = None) -> List[dict]:
+        """System prompt, conversation history and the new message"""
+        messages = [{"role": "system", "content": self.system}] if self.system else []
+        messages += [{"role": m["role"], "content": m["content"]} for m in self.history()]
+        if user_message is not None:
+            messages.append({"role": "user", "content": user_message})
+        return messages
+
+    def preload(self):
+        """Load the weights and evaluate the system prompt once"""
+        body = {
+            "model": self.model,
+            "messages": [{"role": "system", "content": self.system}] if self.system else [],
+            "stream": False,
+            "keep_alive": self.keep_alive,
+            "options": {**self.options(), "num_predict": 1},
+        }
+        start = time.perf_counter()
+        try:
+            response = self.client.post(f"{self.host}/api/chat", data=json.dumps(body),
+                                        headers={"Content-Type": "application/json"})
+        except LLMClientError as e:
+            self._failed()
+            print(f"⚠️ Ollama not reachable at {self.host}: {e}")
+            return
+        if response.status_code != 200:
+            self._failed()
+            print(f"⚠️ Ollama could not load {self.model} ({response.status_code}); "
+                  f"try 'ollama pull {self.model}'")
+            return
+        self.ready = True
+        print(f"✅ Local model {self.model} loaded in {time.perf_counter() - start:.1f}s")
+
+    def _failed(self):
+        self.ready = False
+        self._failed_at = time.monotonic()
+
+    def chat(self, user_message, on_sentence=None):
+        if not self.ready:
+            # Check the server again in the background; this question goes elsewhere
+            if self.available():
+                self.retry()
+            return False, ""
+        splitter = SentenceSplitter(on_sentence or (lambda sentence: None),
+                                    sanitizer=self.sanitizer.stream() if self.sanitizer else None)
+        body = {
+            "model": self.model,
+            "messages": self.messages(user_message),
+            "stream": True,
+            "keep_alive": self.keep_alive,
+            "options": self.options(),
+        }
+        try:
+            response = self.client.stream(f"{self.host}/api/chat", data=json.dumps(body),
+                                          headers={"Content-Type": "application/json"})
+            with response:
+                if response.status_code != 200:
+                    print(f"❌ Ollama returned {response.status_code}")
+                    return False, ""
+                for line in response.iter_lines():
+                    if isinstance(line, bytes):
+                        line = line.decode("utf-8", errors="replace")
+                    if not line.strip():
+                        continue
+                    event = json.loads(line)
+                    if event.get("error"):
+                        raise ValueError(event["error"])
+                    chunk = event.get("message", {}).get("content", "")
+                    if chunk:
+                        splitter.feed(chunk)
+                    if event.get("done"):
+                        self._record(event)
+                splitter.flush()
+        except (LLMClientError, ValueError) as e:
+            if not splitter.sentences:
+                print(f"❌ Local model error: {e}")
+                return False, ""
+            print(f"⚠️ Local reply cut off: {e}")
+        reply = splitter.text()
+        return bool(reply), reply
+
+    def _record(self, event: dict):
+        """Timing counters from the final stream event (durations in ns)"""
+        load = event.get("load_duration", 0) / 1e9
+        if load > 1.0:
+            self.cold_loads += 1  # unloaded since the last turn (keep_alive too short?)
+        self.load_time += load
+        self.prompt_tokens += event.get("prompt_eval_count", 0)
+        self.output_tokens += event.get("eval_count", 0)
+        self.generate_time += event.get("eval_duration", 0) / 1e9
+
+    def stats(self) -> dict:
+        return {
+            "model": self.model,
+            "profile": self.profile,
+            "cold_loads": self.cold_loads,
+            "load_s": round(self.load_time, 1),
+            "prompt_tokens": self.prompt_tokens,
+            "tokens_per_s": (round(self.output_tokens / self.generate_time, 1)
+                             if self.generate_time else None),
+        }
+
+# ============================================================================
+# BACKEND SELECTION
+# ============================================================================
+
+@dataclass
+class BackendStats:
+    """Per-backend latency counters (moving averages in seconds)"""
+    calls: int = 0
+    errors: int = 0
+    first_sentence: float = 0.0
+    latency: float = 0.0
+    streamed: int = 0
+
+class LLMRouter:
+    """Sends each question to the selected chat backend.
+
+    `mode` is a backend name or "auto": the first available backend,
+    with the next one tried when it fails before saying anything. use()
+    switches the backend (or mode) at runtime.
+    """
+
+    def __init__(self, backends: List[LLMBackend], mode: str = "auto", alpha: float = 0.3):
+        self.backends = backends
+        self.mode = mode if mode == "auto" or self.get(mode) else "auto"
+        self.alpha = alpha
+        self.stats_by_backend: Dict[str, BackendStats] = {b.name: BackendStats() for b in backends}
+
+    def get(self, name: str) -> Optional[LLMBackend]:
+        """Backend by name"""
+        return next((b for b in self.backends if b.name == name), None)
+
+    def candidates(self) -> List[LLMBackend]:
+        """Backends to try for the next question, in order"""
+        if self.mode != "auto":
+            return [self.get(self.mode)]
+        return [b for b in self.backends if b.available()]
+
+    def works_offline(self) -> bool:
+        """Whether a backend that needs no network can take the next question"""
+        return any(not b.needs_network and b.available()
+                   for b in self.candidates())
+
+    def start(self):
+        """Start the backends the current mode can use"""
+        for backend in (self.backends if self.mode == "auto" else self.candidates()):
+            backend.start()
+
+    def stop(self):
+        for backend in self.backends:
+            backend.stop()
+
+    def use(self, mode: str) -> bool:
+        """Switch backend ("auto" or a backend name)"""
+        if mode != "auto" and self.get(mode) is None:
+            return False
+        self.mode = mode
+        self.start()
+        return True
+
+    def set_profile(self, name: str) -> List[str]:
+        """Switch every backend that has the profile; returns their names"""
+        return [b.name for b in self.backends if b.set_profile(name)]
+
+    def _average(self, old: float, new: float, n: int) -> float:
+        return new if n == 1 else old + (new - old) * self.alpha
+
+    def _run(self, backend: LLMBackend, user_message: str, on_sentence) -> Tuple[bool, str, bool]:
+        """Ask one backend and update its counters; returns (success, reply, spoke)"""
+        stats = self.stats_by_backend[backend.name]
+        stats.calls += 1
+        start = time.perf_counter()
+        first = []
+
+        def timed(sentence: str):
+            if not first:
+                first.append(time.perf_counter() - start)
+            on_sentence(sentence)
+
+        try:
+            success, reply = backend.chat(user_message, timed if on_sentence else None)
+        except Exception as e:
+            print(f"❌ {backend.name} error: {e}")
+            success, reply = False, ""
+        if not success:
+            stats.errors += 1
+            return False, reply, bool(first)
+        answered = stats.calls - stats.errors
+        stats.latency = self._average(stats.latency, time.perf_counter() - start, answered)
+        if first:
+            stats.streamed += 1
+            stats.first_sentence = self._average(stats.first_sentence, first[0], stats.streamed)
+        return True, reply, bool(first)
+
+    def chat(self, user_message: str, on_sentence: Optional[Callable[[str], None]] = None
+             ) -> Tuple[bool, str]:
+        """Answer with the selected backend, falling back in auto mode"""
+        result = (False, "")
+        for backend in self.candidates():
+            success, reply, spoke = self._run(backend, user_message, on_sentence)
+            result = (success, reply)
+            if success or spoke:
+                break
+            if self.mode == "auto":
+                print(f"⚠️ {backend.name} failed, trying the next model")
+        return result
+
+    def stats(self) -> dict:
+        """Per-backend latency (ms) and error rate"""
+        report = {"mode": self.mode}
+        for backend in self.backends:
+            st = self.stats_by_backend[backend.name]
+            if not st.calls:
+                continue
+            entry = {
+                "calls": st.calls,
+                "error_rate": round(st.errors / st.calls, 2),
+                "latency_ms": round(st.latency * 1000) if st.calls > st.errors else None,
+                "first_sentence_ms": round(st.first_sentence * 1000) if st.streamed else None,
+            }
+            if hasattr(backend, "stats"):
+                entry.update(backend.stats())
+            report[backend.name] = entry
+        return report
@@ -0,0 +1,340 @@
+import asyncio
+import concurrent.futures
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterator, Optional
+
+import requests
+
+from async_loop import BackgroundLoop
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+try:
+    import h2  # noqa: F401  (lets httpx negotiate HTTP/2)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# ============================================================================
+# LLM HTTP CLIENT
+# ============================================================================
+
+class LLMClientError(Exception):
+    """Connection failure or timeout talking to the model endpoint"""
+
+@dataclass
+class Timeouts:
+    """Per-phase limits in seconds"""
+    connect: float = 3.0
+    first_byte: float = 8.0  # request sent -> response headers (streaming requests)
+    total: float = 15.0      # whole exchange, streamed body included
+
+_END = object()
+
+class StreamResponse:
+    """Streaming response handed from the event loop to a blocking caller.
+
+    Has the parts of requests.Response the callers use: status_code,
+    headers, text (error bodies only) and iter_lines(); use it as a
+    context manager so an abandoned stream is cancelled.
+    """
+
+    def __init__(self, status_code: int, headers, text: str,
+                 lines: "queue.Queue", cancel: Optional[Callable[[], None]] = None):
+        self.status_code = status_code
+        self.headers = headers
+        self.text = text
+        self._lines = lines
+        self._cancel = cancel
+
+    def iter_lines(self) -> Iterator[str]:
+        while True:
+            item = self._lines.get()
+            if item is _END:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    def close(self):
+        if self._cancel is not None:
+            self._cancel()
+            self._cancel = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class LLMClient:
+    """Pooled keep-alive HTTP client for the model API.
+
+    With httpx installed, requests run on a shared background event loop
+    over an AsyncClient (HTTP/2 when the h2 package is there); otherwise a
+    requests.Session is used. The connection is opened at startup and
+    re-opened after `idle_rewarm` seconds without traffic, so the TLS
+    handshake is not paid after the user stops talking. Callers stay
+    synchronous: post() returns a response, stream() a StreamResponse.
+    """
+
+    def __init__(self, timeouts: Optional[Timeouts] = None, loop: Optional[BackgroundLoop] = None,
+                 idle_rewarm: float = 45.0, use_httpx: bool = True):
+        self.timeouts = timeouts or Timeouts()
+        self.loop = loop or BackgroundLoop("saira-http")
+        self.idle_rewarm = idle_rewarm
+        self.use_httpx = use_httpx and HTTPX_AVAILABLE
+        self.warm_url: Optional[str] = None
+        self.last_used = 0.0
+        self.http_version = None
+        self._client = None
+        self._session: Optional[requests.Session] = None
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._keepalive: Optional[threading.Thread] = None
+        self._running = False
+
+        self.requests = 0
+        self.warmups = 0
+        self.errors = 0
+
+    @property
+    def transport(self) -> str:
+        return "httpx" if self.use_httpx else "requests"
+
+    def start(self, warm_url: Optional[str] = None):
+        """Create the client and open a connection in the background"""
+        self.warm_url = warm_url
+        if self.use_httpx:
+            self.loop.start()
+            self.loop.run(self._create_client())
+        else:
+            self._session = requests.Session()
+            self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=4,
+                                                                   thread_name_prefix="saira-http")
+        self._running = True
+        self._keepalive = threading.Thread(target=self._keepalive_loop, daemon=True)
+        self._keepalive.start()
+        self.warm(wait=False)
+
+    async def _create_client(self):
+        # Plain POSTs only get headers once the whole reply is generated, so
+        # they may read for the total time; streams use first_byte (below)
+        timeout = httpx.Timeout(self.timeouts.total, connect=self.timeouts.connect)
+        limits = httpx.Limits(max_connections=8, max_keepalive_connections=4,
+                              keepalive_expiry=self.idle_rewarm * 2)
+        self._client = httpx.AsyncClient(http2=HTTP2_AVAILABLE, timeout=timeout, limits=limits)
+
+    def stop(self):
+        """Close pooled connections"""
+        self._running = False
+        if self._client is not None:
+            try:
+                self.loop.run(self._client.aclose(), timeout=2)
+            except Exception:
+                pass
+            self._client = None
+            self.loop.stop()
+        if self._session is not None:
+            self._executor.shutdown(wait=False)
+            self._session.close()
+            self._session = None
+
+    # ------------------------------------------------------------------
+    # Warm-up
+    # ------------------------------------------------------------------
+
+    def warm(self, wait: bool = False):
+        """Open (or refresh) a pooled connection to the API host"""
+        if not self.warm_url:
+            return
+        self.last_used = time.monotonic()
+        if self.use_httpx:
+            future = self.loop.submit(self._warm_async())
+            if wait:
+                future.result(self.timeouts.total)
+        elif wait:
+            self._warm_sync()
+        else:
+            threading.Thread(target=self._warm_sync, daemon=True).start()
+
+    async def _warm_async(self):
+        try:
+            response = await self._client.head(self.warm_url)
+            self.http_version = response.http_version
+            self.warmups += 1
+        except Exception as e:
+            print(f"⚠️ Connection warm-up failed: {e}")
+
+    def _warm_sync(self):
+        try:
+            self._session.head(self.warm_url, timeout=(self.timeouts.connect, self.timeouts.first_byte))
+            self.warmups += 1
+        except Exception as e:
+            print(f"⚠️ Connection warm-up failed: {e}")
+
+    def _keepalive_loop(self):
+        """Re-warm after idle periods so the next turn finds an open connection"""
+        while self._running:
+            time.sleep(min(5.0, self.idle_rewarm / 2))
+            if self._running and time.monotonic() - self.last_used > self.idle_rewarm:
+                self.warm(wait=False)
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+
+    def post(self, url: str, data: str, headers: Optional[dict] = None):
+        """POST and read the whole response"""
+        return self._result(self.submit_post(url, data, headers), self.timeouts.total + 1)
+
+    def stream(self, url: str, data: str, headers: Optional[dict] = None) -> StreamResponse:
+        """POST and return a StreamResponse once the headers arrived"""
+        return self._result(self.submit_stream(url, data, headers), self.timeouts.first_byte + 1)
+
+    def submit_post(self, url: str, data: str, headers: Optional[dict] = None) -> concurrent.futures.Future:
+        """Start a POST; cancelling the future aborts the request (httpx)"""
+        self.requests += 1
+        self.last_used = time.monotonic()
+        if self.use_httpx:
+            return self._adapt(self.loop.submit(self._post_async(url, data, headers)))
+        return self._adapt(self._executor.submit(
+            self._session.post, url, data=data, headers=headers,
+            timeout=(self.timeouts.connect, self.timeouts.total)))
+
+    def submit_stream(self, url: str, data: str, headers: Optional[dict] = None) -> concurrent.futures.Future:
+        """Start a streaming POST; the future resolves to a StreamResponse at first byte"""
+        self.requests += 1
+        self.last_used = time.monotonic()
+        if self.use_httpx:
+            return self._adapt(self.loop.submit(self._stream_async(url, data, headers)))
+        return self._adapt(self._executor.submit(self._stream_requests, url, data, headers))
+
+    def _result(self, future: concurrent.futures.Future, timeout: float):
+        """Wait for a submitted request"""
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            self.errors += 1
+            raise LLMClientError("request timed out")
+
+    def _adapt(self, inner: concurrent.futures.Future) -> concurrent.futures.Future:
+        """Future that raises LLMClientError and passes cancel() through.
+
+        A stream that arrives after its future was cancelled (e.g. the
+        losing side of a hedged request) is closed right away.
+        """
+        outer: concurrent.futures.Future = concurrent.futures.Future()
+
+        def forward(done: concurrent.futures.Future):
+            if done.cancelled():
+                outer.cancel()
+                return
+            error = done.exception()
+            if outer.cancelled():
+                if error is None and isinstance(done.result(), StreamResponse):
+                    done.result().close()
+                return
+            if error is not None:
+                self.errors += 1
+                if not isinstance(error, LLMClientError):
+                    error = LLMClientError(str(error) or type(error).__name__)
+                outer.set_exception(error)
+            else:
+                outer.set_result(done.result())
+
+        outer.add_done_callback(lambda f: f.cancelled() and inner.cancel())
+        inner.add_done_callback(forward)
+        return outer
+
+    async def _post_async(self, url: str, data: str, headers: Optional[dict]):
+        response = await asyncio.wait_for(
+            self._client.post(url, content=data, headers=headers), self.timeouts.total)
+        self.http_version = response.http_version
+        return response
+
+    async def _stream_async(self, url, data, headers) -> StreamResponse:
+        deadline = time.monotonic() + self.timeouts.total
+        timeout = httpx.Timeout(self.timeouts.total, connect=self.timeouts.connect,
+                                read=self.timeouts.first_byte)
+        request = self._client.build_request("POST", url, content=data, headers=headers,
+                                             timeout=timeout)
+        response = await asyncio.wait_for(self._client.send(request, stream=True),
+                                          self.timeouts.first_byte)
+        self.http_version = response.http_version
+        lines: "queue.Queue" = queue.Queue()
+        if response.status_code != 200:
+            await response.aread()
+            await response.aclose()
+            lines.put(_END)
+            return StreamResponse(response.status_code, response.headers, response.text, lines)
+
+        async def pump():
+            try:
+                async for line in response.aiter_lines():
+                    if time.monotonic() > deadline:
+                        raise LLMClientError("response took longer than the total timeout")
+                    lines.put(line)
+            except asyncio.CancelledError:
+                pass
+            except Exception as e:
+                self.errors += 1
+                lines.put(e if isinstance(e, LLMClientError) else LLMClientError(str(e)))
+            finally:
+                await response.aclose()
+                lines.put(_END)
+
+        task = asyncio.ensure_future(pump())
+        loop = asyncio.get_running_loop()
+        # close() runs on the caller's thread
+        return StreamResponse(response.status_code, response.headers, "", lines,
+                              lambda: loop.call_soon_threadsafe(task.cancel))
+
+    def _stream_requests(self, url: str, data: str, headers: Optional[dict]) -> StreamResponse:
+        response = self._session.post(url, data=data, headers=headers, stream=True,
+                                      timeout=(self.timeouts.connect, self.timeouts.first_byte))
+        lines: "queue.Queue" = queue.Queue()
+        if response.status_code != 200:
+            lines.put(_END)
+            text = response.text
+            response.close()
+            return StreamResponse(response.status_code, response.headers, text, lines)
+
+        deadline = time.monotonic() + self.timeouts.total
+        cancelled = threading.Event()
+
+        def pump():
+            try:
+                # chunk_size=None hands over data as it arrives instead of 512-byte blocks
+                for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+                    if cancelled.is_set():
+                        break
+                    if time.monotonic() > deadline:
+                        raise LLMClientError("response took longer than the total timeout")
+                    lines.put(line)
+            except Exception as e:
+                self.errors += 1
+                lines.put(e if isinstance(e, LLMClientError) else LLMClientError(str(e)))
+            finally:
+                response.close()
+                lines.put(_END)
+
+        threading.Thread(target=pump, daemon=True).start()
+        return StreamResponse(response.status_code, response.headers, "", lines, cancelled.set)
+
+    def stats(self) -> dict:
+        """Transport and connection counters"""
+        return {
+            "transport": self.transport,
+            "http_version": self.http_version,
+            "requests": self.requests,
+            "errors": self.errors,
+            "warmups": self.warmups,
+        }
@@ -0,0 +1,88 @@
+import json
+import re
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from text_sanitizer import StreamSanitizer
+
+# ============================================================================
+# SERVER-SENT EVENTS
+# ============================================================================
+
+def iter_sse_json(lines: Iterable) -> Iterator[dict]:
+    """JSON payloads of `data:` lines from an SSE response (alt=sse)"""
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8", errors="replace")
+        line = line.strip()
+        if not line.startswith("data:"):
+            continue
+        payload = line[5:].strip()
+        if not payload or payload == "[DONE]":
+            continue
+        yield json.loads(payload)
+
+def gemini_chunk_text(event: dict) -> str:
+    """Text carried by one streamGenerateContent event"""
+    try:
+        parts = event["candidates"][0]["content"]["parts"]
+    except (KeyError, IndexError):
+        return ""
+    return "".join(p.get("text", "") for p in parts)
+
+# ============================================================================
+# SENTENCE SPLITTING
+# ============================================================================
+
+# End of a sentence: punctuation followed by whitespace, or a line break
+SENTENCE_END = re.compile(r'(?<=[.!?…])\s+|\n+')
+
+class SentenceSplitter:
+    """Turns streamed text chunks into complete sentences.
+
+    Each finished sentence is cleaned with `clean` and passed to
+    `on_sentence` as soon as its end is seen; the unfinished tail is kept
+    until more text arrives or flush() is called. Fragments shorter than
+    `min_chars` are merged into the next sentence so speech is not chopped
+    into single words. With a `sanitizer`, chunks are cleaned as they
+    arrive instead of once per sentence.
+    """
+
+    def __init__(self, on_sentence: Callable[[str], None],
+                 clean: Optional[Callable[[str], str]] = None, min_chars: int = 12,
+                 sanitizer: Optional[StreamSanitizer] = None):
+        self.on_sentence = on_sentence
+        self.clean = clean or (lambda text: text.strip())
+        self.min_chars = min_chars
+        self.sanitizer = sanitizer
+        self.buffer = ""
+        self.sentences: List[str] = []
+
+    def feed(self, chunk: str):
+        """Add streamed text and emit every sentence it completes"""
+        if self.sanitizer is not None:
+            chunk = self.sanitizer.feed(chunk)
+        self.buffer += chunk
+        start = 0
+        for match in SENTENCE_END.finditer(self.buffer):
+            if match.start() - start < self.min_chars:
+                continue
+            self._emit(self.buffer[start:match.start()])
+            start = match.end()
+        self.buffer = self.buffer[start:]
+
+    def flush(self):
+        """Emit whatever is left at the end of the stream"""
+        if self.sanitizer is not None:
+            self.buffer += self.sanitizer.flush()
+        self._emit(self.buffer)
+        self.buffer = ""
+
+    def _emit(self, text: str):
+        sentence = self.clean(text)
+        if sentence:
+            self.sentences.append(sentence)
+            self.on_sentence(sentence)
+
+    def text(self) -> str:
+        """Everything emitted so far"""
+        return " ".join(self.sentences)
@@ -0,0 +1,157 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+import speech_recognition as sr
+
+# ============================================================================
+# PERSISTENT MICROPHONE
+# ============================================================================
+
+class MicStream:
+    """Microphone opened once for the whole session.
+
+    Ambient-noise calibration runs on a background thread while Saira is
+    quiet and nobody is being listened to, and the resulting energy
+    threshold is saved to disk so the next start skips calibration too.
+    """
+
+    def __init__(self, recognizer: sr.Recognizer, sample_rate: int = 16000,
+                 chunk_size: int = 1024, device_index: Optional[int] = None,
+                 calibration_file: str = "mic_calibration.json",
+                 calibration_duration: float = 0.5, recalibrate_every: float = 120.0,
+                 is_quiet: Optional[Callable[[], bool]] = None):
+        self.recognizer = recognizer
+        self.sample_rate = sample_rate
+        self.chunk_size = chunk_size
+        self.device_index = device_index
+        self.calibration_file = calibration_file
+        self.calibration_duration = calibration_duration
+        self.recalibrate_every = recalibrate_every
+        self.is_quiet = is_quiet or (lambda: True)
+
+        self.lock = threading.RLock()
+        self.source: Optional[sr.Microphone] = None
+        self.calibrated_at = 0.0
+        self.running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def open(self, background_calibration: bool = True):
+        """Open the device and restore (or run) the noise calibration.
+
+        Pass background_calibration=False when another reader (continuous
+        capture) owns the stream and reports the ambient level itself.
+        """
+        if self.source is not None:
+            return
+        mic = sr.Microphone(device_index=self.device_index,
+                            sample_rate=self.sample_rate, chunk_size=self.chunk_size)
+        self.source = mic.__enter__()
+
+        if not self._load_calibration():
+            self.calibrate()
+
+        if background_calibration:
+            self.running = True
+            self._thread = threading.Thread(target=self._calibration_loop, daemon=True)
+            self._thread.start()
+
+    def close(self):
+        """Stop calibration and release the device"""
+        self.running = False
+        with self.lock:
+            if self.source is not None:
+                self._save_calibration()
+                self.source.__exit__(None, None, None)
+                self.source = None
+
+    @contextmanager
+    def session(self):
+        """Exclusive access to the open source for reading audio"""
+        with self.lock:
+            if self.source is None:
+                self.open()
+            yield self.source
+
+    def drain(self):
+        """Drop audio buffered while nobody was reading (e.g. Saira's own voice)"""
+        stream = getattr(self.source.stream, "pyaudio_stream", None)
+        if stream is None:
+            return
+        try:
+            available = stream.get_read_available()
+            while available >= self.source.CHUNK:
+                self.source.stream.read(self.source.CHUNK)
+                available -= self.source.CHUNK
+        except Exception:
+            pass
+
+    def listen(self, timeout=None, phrase_time_limit=None) -> sr.AudioData:
+        """recognizer.listen on the already-open stream"""
+        with self.session() as source:
+            self.drain()
+            return self.recognizer.listen(source, timeout=timeout,
+                                          phrase_time_limit=phrase_time_limit)
+
+    def calibrate(self):
+        """Measure ambient noise now and persist the threshold"""
+        with self.session() as source:
+            self.drain()
+            self.recognizer.adjust_for_ambient_noise(source, duration=self.calibration_duration)
+            self.calibrated_at = time.time()
+            self._save_calibration()
+        print(f"🎚️ Mic calibrated: energy threshold {self.recognizer.energy_threshold:.0f}")
+
+    def update_ambient(self, energy: float):
+        """Calibration measured by an external reader of the stream"""
+        ratio = getattr(self.recognizer, "dynamic_energy_ratio", 1.5)
+        self.recognizer.energy_threshold = max(energy * ratio, 50.0)
+        self.calibrated_at = time.time()
+        self._save_calibration()
+
+    def _calibration_loop(self):
+        """Recalibrate periodically when the mic is idle and Saira is quiet"""
+        while self.running:
+            time.sleep(1.0)
+            if time.time() - self.calibrated_at < self.recalibrate_every:
+                continue
+            if not self.is_quiet():
+                continue
+            if not self.lock.acquire(blocking=False):
+                continue  # a turn is listening right now
+            try:
+                if self.running and self.source is not None:
+                    self.calibrate()
+            except Exception as e:
+                print(f"⚠️ Mic calibration failed: {e}")
+            finally:
+                self.lock.release()
+
+    def _load_calibration(self) -> bool:
+        """Restore a saved threshold; True if one was found"""
+        if not os.path.exists(self.calibration_file):
+            return False
+        try:
+            with open(self.calibration_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.recognizer.energy_threshold = float(data["energy_threshold"])
+            self.calibrated_at = float(data.get("calibrated_at", 0.0))
+            print(f"🎚️ Mic calibration restored: energy threshold {self.recognizer.energy_threshold:.0f}")
+            return True
+        except Exception as e:
+            print(f"⚠️ Could not load mic calibration: {e}")
+            return False
+
+    def _save_calibration(self):
+        """Persist the current threshold (dynamic adjustment included)"""
+        try:
+            with open(self.calibration_file, "w", encoding="utf-8") as f:
+                json.dump({
+                    "energy_threshold": self.recognizer.energy_threshold,
+                    "calibrated_at": self.calibrated_at,
+                }, f, indent=2)
+        except Exception as e:
+            print(f"⚠️ Could not save mic calibration: {e}")
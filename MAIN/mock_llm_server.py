@@ -0,0 +1,539 @@
+"""Local stand-in for the Gemini and Ollama chat APIs.
+
+Speaks the request and response shapes Saira uses (generateContent,
+streamGenerateContent with alt=sse, countTokens, cachedContents, Ollama
+/api/chat and /api/generate) with configurable latency, token rate, chunk timing,
+injected errors (429 with RetryInfo, 403, 5xx) and cut-off streams, so
+key failover, hedging, prompt caching and streaming can be exercised
+offline without spending quota.
+
+Run it next to Saira:
+
+    python mock_llm_server.py --port 8765 --latency 0.4 --tps 40 --error-rate 0.1
+    SAIRA_GEMINI_BASE=http://127.0.0.1:8765/v1beta SAIRA_OLLAMA_HOST=http://127.0.0.1:8765 python saira.py
+
+Settings can be changed while it runs with POST /mock/settings (JSON)
+and counters read with GET /mock/stats.
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+DEFAULT_REPLY = ("This is a reply from the local mock server. It streams a few sentences "
+                 "so speech can start early. Nothing here came from a real model.")
+
+# ============================================================================
+# SETTINGS
+# ============================================================================
+
+@dataclass
+class MockSettings:
+    """Behaviour of the mock server (times in seconds)"""
+    latency: float = 0.3            # request -> first byte
+    jitter: float = 0.0             # random extra latency, up to this much
+    tokens_per_second: float = 50.0
+    chunk_tokens: int = 4           # tokens per streamed chunk; 0 = one chunk per sentence
+    chunk_delay: Optional[float] = None  # fixed gap between chunks instead of the token rate
+    reply: str = DEFAULT_REPLY
+    error_rate: float = 0.0         # share of requests answered with error_code
+    error_code: int = 429
+    retry_delay: float = 5.0        # RetryInfo sent with 429s
+    key_errors: Dict[str, int] = field(default_factory=dict)  # API key -> status, always
+    drop_rate: float = 0.0          # share of streams cut off halfway
+    cache_min_tokens: int = 0       # cachedContents smaller than this are refused
+    load_time: float = 2.0          # Ollama model load after keep_alive expired
+    seed: Optional[int] = None
+
+def tokenize(text: str) -> List[str]:
+    """Rough tokens: words with their trailing space"""
+    return re.findall(r"\S+\s*", text) or [text]
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+def parse_keep_alive(value) -> float:
+    """Ollama keep_alive ("30m", "10s", 300, -1) in seconds; inf for negative"""
+    if value is None:
+        return 300.0
+    if isinstance(value, (int, float)):
+        return float("inf") if value < 0 else float(value)
+    match = re.fullmatch(r"\s*(-?\d+(?:\.\d+)?)\s*([smh]?)\s*", str(value))
+    if not match:
+        return 300.0
+    seconds = float(match.group(1)) * {"": 1, "s": 1, "m": 60, "h": 3600}[match.group(2)]
+    return float("inf") if seconds < 0 else seconds
+
+# ============================================================================
+# MOCK SERVER
+# ============================================================================
+
+class MockLLMServer:
+    """Threaded HTTP server answering like Gemini (/v1beta/...) and Ollama (/api/...)"""
+
+    def __init__(self, settings: Optional[MockSettings] = None, host: str = "127.0.0.1",
+                 port: int = 0):
+        self.settings = settings or MockSettings()
+        self.host = host
+        self.port = port
+        self.server: Optional[ThreadingHTTPServer] = None
+        self.random = random.Random(self.settings.seed)
+        self._lock = threading.Lock()
+        self.caches: Dict[str, dict] = {}
+        self.loaded_until: Dict[str, float] = {}  # Ollama model -> unload time
+
+        self.requests: Dict[str, int] = {}
+        self.errors = 0
+        self.dropped = 0
+        self.cancelled = 0
+        self.active = 0
+        self.max_active = 0
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def base_url(self) -> str:
+        """Gemini API base (SAIRA_GEMINI_BASE)"""
+        return f"{self.url}/v1beta"
+
+    @property
+    def ollama_host(self) -> str:
+        """Ollama host (SAIRA_OLLAMA_HOST)"""
+        return self.url
+
+    def start(self) -> str:
+        """Serve in the background; returns the Gemini API base URL"""
+        self.server = ThreadingHTTPServer((self.host, self.port), self._handler())
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self.base_url
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def update(self, **changes):
+        """Change settings while running"""
+        with self._lock:
+            for name, value in changes.items():
+                if hasattr(self.settings, name):
+                    setattr(self.settings, name, value)
+            if "seed" in changes:
+                self.random.seed(changes["seed"])
+
+    def stats(self) -> dict:
+        return {
+            "requests": dict(self.requests),
+            "errors": self.errors,
+            "dropped": self.dropped,
+            "cancelled": self.cancelled,
+            "max_concurrent": self.max_active,
+        }
+
+    # ------------------------------------------------------------------
+    # Behaviour
+    # ------------------------------------------------------------------
+
+    def _count(self, route: str):
+        with self._lock:
+            self.requests[route] = self.requests.get(route, 0) + 1
+
+    def _chance(self, rate: float) -> bool:
+        with self._lock:
+            return rate > 0 and self.random.random() < rate
+
+    def _wait_first_byte(self):
+        s = self.settings
+        extra = self.random.uniform(0, s.jitter) if s.jitter else 0.0
+        time.sleep(s.latency + extra)
+
+    def _injected_error(self, key: Optional[str]) -> Optional[int]:
+        """Status to fail this request with, if any"""
+        s = self.settings
+        status = s.key_errors.get(key) if key else None
+        if status is None and self._chance(s.error_rate):
+            status = s.error_code
+        if status is not None:
+            with self._lock:
+                self.errors += 1
+        return status
+
+    def _chunks(self, text: str) -> List[str]:
+        s = self.settings
+        if s.chunk_tokens <= 0:
+            return re.findall(r"[^.!?]+[.!?]*\s*", text) or [text]
+        tokens = tokenize(text)
+        return ["".join(tokens[i:i + s.chunk_tokens]) for i in range(0, len(tokens), s.chunk_tokens)]
+
+    def _chunk_gap(self, chunk: str) -> float:
+        s = self.settings
+        if s.chunk_delay is not None:
+            return s.chunk_delay
+        return len(tokenize(chunk)) / s.tokens_per_second if s.tokens_per_second > 0 else 0.0
+
+    def _load_model(self, model: str, keep_alive) -> float:
+        """Simulated Ollama load; returns the load time paid"""
+        now = time.monotonic()
+        with self._lock:
+            cold = self.loaded_until.get(model, 0.0) < now
+        load = self.settings.load_time if cold else 0.0
+        if load:
+            time.sleep(load)
+        with self._lock:
+            self.loaded_until[model] = time.monotonic() + parse_keep_alive(keep_alive)
+        return load
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive and chunked streaming, like the real endpoints
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            # ----------------------------------------------------------
+            # Plumbing
+            # ----------------------------------------------------------
+
+            def _send_json(self, status: int, payload, headers: Optional[dict] = None):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _start_chunked(self, content_type: str):
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+
+            def _write_chunk(self, data: bytes):
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+            def _end_chunked(self):
+                self.wfile.write(b"0\r\n\r\n")
+                self.wfile.flush()
+
+            def _read_json(self) -> dict:
+                length = int(self.headers.get("Content-Length", 0))
+                raw = self.rfile.read(length) if length else b""
+                try:
+                    return json.loads(raw) if raw else {}
+                except ValueError:
+                    return {}
+
+            def _gemini_error(self, status: int, message: str):
+                names = {400: "INVALID_ARGUMENT", 403: "PERMISSION_DENIED", 404: "NOT_FOUND",
+                         429: "RESOURCE_EXHAUSTED", 500: "INTERNAL", 503: "UNAVAILABLE"}
+                error = {"code": status, "message": message, "status": names.get(status, "UNKNOWN")}
+                if status == 429:
+                    error["details"] = [{"@type": "type.googleapis.com/google.rpc.RetryInfo",
+                                         "retryDelay": f"{mock.settings.retry_delay:g}s"}]
+                self._send_json(status, {"error": error})
+
+            def _serve(self, method: str):
+                mock._count(f"{method} {urlsplit(self.path).path}")
+                with mock._lock:
+                    mock.active += 1
+                    mock.max_active = max(mock.max_active, mock.active)
+                try:
+                    getattr(self, f"_{method.lower()}")()
+                except (BrokenPipeError, ConnectionResetError):
+                    with mock._lock:
+                        mock.cancelled += 1  # client gave up (timeout, hedge loser)
+                finally:
+                    with mock._lock:
+                        mock.active -= 1
+
+            def do_HEAD(self):
+                mock._count("HEAD")
+                self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_GET(self):
+                self._serve("GET")
+
+            def do_POST(self):
+                self._serve("POST")
+
+            def do_PATCH(self):
+                self._serve("PATCH")
+
+            def do_DELETE(self):
+                self._serve("DELETE")
+
+            # ----------------------------------------------------------
+            # Routing
+            # ----------------------------------------------------------
+
+            def _get(self):
+                path = urlsplit(self.path).path.rstrip("/")
+                if path == "/mock/stats":
+                    self._send_json(200, mock.stats())
+                elif path == "/v1beta/models":
+                    self._send_json(200, {"models": [{"name": "models/mock"}]})
+                elif path == "/api/tags":
+                    self._send_json(200, {"models": [{"name": m, "model": m} for m in mock.loaded_until]})
+                elif path == "":
+                    self._send_json(200, "Ollama is running")
+                else:
+                    self._send_json(404, {"error": "not found"})
+
+            def _post(self):
+                parts = urlsplit(self.path)
+                path = parts.path.rstrip("/")
+                body = self._read_json()
+                if self.headers.get("X-HTTP-Method-Override", "").upper() == "PATCH":
+                    self._patch_cache(path, body)
+                elif path == "/mock/settings":
+                    mock.update(**body)
+                    self._send_json(200, asdict(mock.settings))
+                elif path == "/v1beta/cachedContents":
+                    self._create_cache(parts, body)
+                elif path.startswith("/v1beta/models/") and ":" in path:
+                    self._generate(parts, body, path.rsplit(":", 1)[1])
+                elif path == "/api/chat":
+                    self._ollama(body, chat=True)
+                elif path == "/api/generate":
+                    self._ollama(body, chat=False)
+                else:
+                    self._send_json(404, {"error": "not found"})
+
+            def _patch(self):
+                self._patch_cache(urlsplit(self.path).path.rstrip("/"), self._read_json())
+
+            def _delete(self):
+                name = urlsplit(self.path).path.rstrip("/")[len("/v1beta/"):]
+                with mock._lock:
+                    found = mock.caches.pop(name, None)
+                self._send_json(200 if found else 404, {})
+
+            # ----------------------------------------------------------
+            # Gemini
+            # ----------------------------------------------------------
+
+            def _api_key(self, parts) -> Optional[str]:
+                return (parse_qs(parts.query).get("key", [None])[0]
+                        or self.headers.get("x-goog-api-key"))
+
+            def _create_cache(self, parts, body: dict):
+                status = mock._injected_error(self._api_key(parts))
+                if status is not None:
+                    self._gemini_error(status, "Injected error")
+                    return
+                tokens = estimate_tokens(json.dumps(body.get("systemInstruction", {}))
+                                         + json.dumps(body.get("contents", [])))
+                if tokens < mock.settings.cache_min_tokens:
+                    self._gemini_error(400, f"Cached content is too small. total_token_count={tokens}, "
+                                            f"min_total_token_count={mock.settings.cache_min_tokens}")
+                    return
+                with mock._lock:
+                    name = f"cachedContents/mock{len(mock.caches) + 1}"
+                    mock.caches[name] = {"tokens": tokens, "ttl": body.get("ttl")}
+                self._send_json(200, {"name": name, "model": body.get("model"),
+                                      "usageMetadata": {"totalTokenCount": tokens}})
+
+            def _patch_cache(self, path: str, body: dict):
+                name = path[len("/v1beta/"):]
+                with mock._lock:
+                    entry = mock.caches.get(name)
+                    if entry is not None:
+                        entry["ttl"] = body.get("ttl", entry["ttl"])
+                if entry is None:
+                    self._gemini_error(404, f"CachedContent not found: {name}")
+                else:
+                    self._send_json(200, {"name": name})
+
+            def _generate(self, parts, body: dict, method: str):
+                mock._wait_first_byte()
+                status = mock._injected_error(self._api_key(parts))
+                if status is not None:
+                    self._gemini_error(status, "Injected error")
+                    return
+                if method == "countTokens":
+                    self._send_json(200, {"totalTokens": estimate_tokens(json.dumps(body))})
+                    return
+                cached = 0
+                name = body.get("cachedContent")
+                if name:
+                    with mock._lock:
+                        entry = mock.caches.get(name)
+                    if entry is None:
+                        self._gemini_error(403, f"CachedContent not found (or permission denied): {name}")
+                        return
+                    cached = entry["tokens"]
+                reply = mock.settings.reply
+                usage = {
+                    "promptTokenCount": estimate_tokens(json.dumps(body.get("contents", []))) + cached,
+                    "candidatesTokenCount": len(tokenize(reply)),
+                }
+                if cached:
+                    usage["cachedContentTokenCount"] = cached
+                usage["totalTokenCount"] = usage["promptTokenCount"] + usage["candidatesTokenCount"]
+
+                if method == "streamGenerateContent":
+                    self._stream_gemini(reply, usage)
+                    return
+                time.sleep(sum(mock._chunk_gap(c) for c in mock._chunks(reply)[1:]))
+                self._send_json(200, {
+                    "candidates": [{"content": {"role": "model", "parts": [{"text": reply}]},
+                                    "finishReason": "STOP"}],
+                    "usageMetadata": usage,
+                })
+
+            def _stream_gemini(self, reply: str, usage: dict):
+                self._start_chunked("text/event-stream")
+                chunks = mock._chunks(reply)
+                cut = len(chunks) // 2 if len(chunks) > 1 and mock._chance(mock.settings.drop_rate) else None
+                for i, chunk in enumerate(chunks):
+                    if i == cut:
+                        with mock._lock:
+                            mock.dropped += 1
+                        self.close_connection = True
+                        return  # no terminating chunk: the client sees a broken stream
+                    if i:
+                        time.sleep(mock._chunk_gap(chunk))
+                    event = {"candidates": [{"content": {"role": "model", "parts": [{"text": chunk}]}}]}
+                    if i == len(chunks) - 1:
+                        event["candidates"][0]["finishReason"] = "STOP"
+                        event["usageMetadata"] = usage
+                    self._write_chunk(f"data: {json.dumps(event)}\r\n\r\n".encode())
+                self._end_chunked()
+
+            # ----------------------------------------------------------
+            # Ollama
+            # ----------------------------------------------------------
+
+            def _ollama(self, body: dict, chat: bool):
+                model = body.get("model", "mock")
+                load = mock._load_model(model, body.get("keep_alive"))
+                if chat:
+                    messages = body.get("messages", [])
+                    prompt = json.dumps(messages)
+                    empty = not messages
+                else:
+                    prompt = body.get("prompt", "")
+                    empty = not prompt
+                done = {"model": model, "done": True, "load_duration": int(load * 1e9),
+                        "prompt_eval_count": estimate_tokens(prompt)}
+                if empty:
+                    # Load request (preload / keep_alive only)
+                    done["done_reason"] = "load"
+                    self._send_json(200, {**done, **({"message": {"role": "assistant", "content": ""}}
+                                                     if chat else {"response": ""})})
+                    return
+                mock._wait_first_byte()
+                status = mock._injected_error(None)
+                if status is not None:
+                    self._send_json(status, {"error": f"injected error {status}"})
+                    return
+                reply = mock.settings.reply
+                limit = (body.get("options") or {}).get("num_predict")
+                if limit and limit > 0:
+                    reply = "".join(tokenize(reply)[:limit])
+                chunks = mock._chunks(reply)
+                generate = sum(mock._chunk_gap(c) for c in chunks[1:])
+                done.update(done_reason="stop", eval_count=len(tokenize(reply)),
+                            eval_duration=int(generate * 1e9))
+
+                def event(text: str) -> dict:
+                    if chat:
+                        return {"model": model, "message": {"role": "assistant", "content": text},
+                                "done": False}
+                    return {"model": model, "response": text, "done": False}
+
+                if not body.get("stream", True):
+                    time.sleep(generate)
+                    final = event(reply)
+                    final.update(done)
+                    self._send_json(200, final)
+                    return
+                self._start_chunked("application/x-ndjson")
+                cut = len(chunks) // 2 if len(chunks) > 1 and mock._chance(mock.settings.drop_rate) else None
+                for i, chunk in enumerate(chunks):
+                    if i == cut:
+                        with mock._lock:
+                            mock.dropped += 1
+                        self.close_connection = True
+                        return
+                    if i:
+                        time.sleep(mock._chunk_gap(chunk))
+                    self._write_chunk((json.dumps(event(chunk)) + "\n").encode())
+                final = event("")
+                final.update(done)
+                self._write_chunk((json.dumps(final) + "\n").encode())
+                self._end_chunked()
+
+        return Handler
+
+# ============================================================================
+# COMMAND LINE
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock of the Gemini and Ollama chat APIs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.3, help="seconds to the first byte")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random extra latency (seconds)")
+    parser.add_argument("--tps", type=float, default=50.0, help="streamed tokens per second")
+    parser.add_argument("--chunk-tokens", type=int, default=4,
+                        help="tokens per streamed chunk (0 = one chunk per sentence)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests that fail")
+    parser.add_argument("--error-code", type=int, default=429, help="status of injected failures")
+    parser.add_argument("--retry-delay", type=float, default=5.0, help="RetryInfo delay on 429s")
+    parser.add_argument("--bad-key", action="append", default=[], metavar="KEY=STATUS",
+                        help="always fail this API key (e.g. AIza...=403); repeatable")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="share of streams cut off")
+    parser.add_argument("--cache-min-tokens", type=int, default=0,
+                        help="refuse smaller cachedContents, like Gemini's minimum")
+    parser.add_argument("--load-time", type=float, default=2.0, help="Ollama cold model load (seconds)")
+    parser.add_argument("--reply", default=DEFAULT_REPLY)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    key_errors = {}
+    for item in args.bad_key:
+        key, _, status = item.rpartition("=")
+        key_errors[key] = int(status)
+    settings = MockSettings(latency=args.latency, jitter=args.jitter, tokens_per_second=args.tps,
+                            chunk_tokens=args.chunk_tokens, reply=args.reply,
+                            error_rate=args.error_rate, error_code=args.error_code,
+                            retry_delay=args.retry_delay, key_errors=key_errors,
+                            drop_rate=args.drop_rate, cache_min_tokens=args.cache_min_tokens,
+                            load_time=args.load_time, seed=args.seed)
+    mock = MockLLMServer(settings, args.host, args.port)
+    mock.start()
+    print("🧪 Mock LLM server running")
+    print(f"   SAIRA_GEMINI_BASE={mock.base_url}")
+    print(f"   SAIRA_OLLAMA_HOST={mock.ollama_host}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        mock.stop()
+        print(f"📊 Mock server: {mock.stats()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import socket
+import threading
+import time
+
+# ============================================================================
+# NETWORK HEALTH
+# ============================================================================
+
+class NetworkProbe:
+    """Cached TCP reachability check, refreshed in the background"""
+
+    def __init__(self, host: str = "speech.platform.bing.com", port: int = 443,
+                 timeout: float = 1.0, interval: float = 30.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.interval = interval
+        self.online = True
+        self.checked_at = 0.0
+        self._checking = threading.Lock()
+
+    def check(self) -> bool:
+        """Probe now (blocking)"""
+        try:
+            socket.create_connection((self.host, self.port), timeout=self.timeout).close()
+            self.online = True
+        except OSError:
+            self.online = False
+        self.checked_at = time.monotonic()
+        return self.online
+
+    def is_online(self) -> bool:
+        """Last known state; starts a refresh when it is stale"""
+        if time.monotonic() - self.checked_at > self.interval and self._checking.acquire(blocking=False):
+            def refresh():
+                try:
+                    self.check()
+                finally:
+                    self._checking.release()
+            threading.Thread(target=refresh, daemon=True).start()
+        return self.online
+
+    def mark_offline(self):
+        """Record a network failure seen by a backend"""
+        self.online = False
+        self.checked_at = time.monotonic()
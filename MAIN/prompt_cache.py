@@ -0,0 +1,189 @@
+import json
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+from llm_client import LLMClient, LLMClientError
+
+# ============================================================================
+# SERVER-SIDE PROMPT CACHE (GEMINI cachedContents)
+# ============================================================================
+
+@dataclass
+class CachedPrompt:
+    """One cachedContents entry (they belong to the key's project)"""
+    name: str
+    expires: float  # time.monotonic()
+    last_used: float = 0.0
+
+class PromptCache:
+    """Uploads the fixed system instruction once and references it by name.
+
+    Entries are created in the background the first time a key is used,
+    so no turn waits for them; until one exists the instruction is sent
+    inline as before. Entries used within the last `ttl` are renewed
+    `renew_margin` seconds before they expire, idle ones are left to
+    lapse. An instruction estimated below `min_tokens` (the model's
+    minimum cacheable size) is never uploaded. If the API refuses to
+    create one (too small after all, or caching is not offered for the
+    key) caching switches itself off and requests stay inline; after any
+    other failure that key is not tried again for `retry_after` seconds.
+    """
+
+    def __init__(self, client: LLMClient, base_url: Callable[[], str], model: str,
+                 system_instruction: str, ttl: int = 3600, renew_margin: int = 300,
+                 min_tokens: int = 1024, retry_after: float = 300.0):
+        self.client = client
+        self.base_url = base_url
+        self.model = model
+        self.system_instruction = system_instruction
+        self.ttl = ttl
+        self.renew_margin = renew_margin
+        self.retry_after = retry_after
+        self.entries: Dict[str, CachedPrompt] = {}
+        self.disabled_reason: Optional[str] = None
+        tokens = len(system_instruction) // 4  # rough estimate, ~4 characters per token
+        if tokens < min_tokens:
+            self.disabled_reason = f"instruction is ~{tokens} tokens, minimum is {min_tokens}"
+        self._pending = set()
+        self._failed_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+        self.created = 0
+        self.renewed = 0
+        self.invalidated = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+
+    def start(self):
+        """Background renewal"""
+        if self.disabled_reason:
+            print(f"ℹ️ Prompt caching off, sending the instruction inline ({self.disabled_reason})")
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._renew_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+
+    def name_for(self, api_key: str) -> Optional[str]:
+        """Cache to reference with this key, or None (creation starts in the background)"""
+        if self.disabled_reason:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self.entries.get(api_key)
+            if entry is not None and entry.expires - now > 5:
+                entry.last_used = now
+                return entry.name
+            if api_key in self._pending:
+                return None
+            if now - self._failed_at.get(api_key, now - self.retry_after) < self.retry_after:
+                return None  # failed recently, keep sending the instruction inline
+            self._pending.add(api_key)
+        threading.Thread(target=self._create, args=(api_key,), daemon=True).start()
+        return None
+
+    def apply(self, body: dict, api_key: str) -> dict:
+        """Request body referencing the cache instead of the inline instruction"""
+        name = self.name_for(api_key)
+        if name is None:
+            return body
+        body = dict(body)
+        body.pop("system_instruction", None)
+        body["cachedContent"] = name
+        return body
+
+    def invalidate(self, api_key: str):
+        """The server no longer knows the cache (expired or deleted)"""
+        with self._lock:
+            if self.entries.pop(api_key, None) is not None:
+                self.invalidated += 1
+
+    def record_usage(self, usage: Optional[dict]):
+        """Token counts from a response's usageMetadata"""
+        if not usage:
+            return
+        self.prompt_tokens += usage.get("promptTokenCount", 0)
+        self.cached_tokens += usage.get("cachedContentTokenCount", 0)
+
+    def _url(self, path: str, api_key: str) -> str:
+        return f"{self.base_url()}/{path}?key={api_key}"
+
+    def _create(self, api_key: str):
+        """Upload the instruction for one key"""
+        body = {
+            "model": f"models/{self.model}",
+            "systemInstruction": {"parts": [{"text": self.system_instruction}]},
+            "ttl": f"{self.ttl}s",
+        }
+        try:
+            response = self.client.post(self._url("cachedContents", api_key), data=json.dumps(body),
+                                        headers={"Content-Type": "application/json"})
+            name = response.json().get("name") if response.status_code == 200 else None
+            if name:
+                with self._lock:
+                    self.entries[api_key] = CachedPrompt(name, time.monotonic() + self.ttl,
+                                                         time.monotonic())
+                self.created += 1
+                return
+            if response.status_code in (200, 400, 404):
+                # Too few tokens to cache, model without caching, or no such endpoint
+                self.disabled_reason = f"{response.status_code}: {response.text[:120]}"
+                print(f"ℹ️ Prompt caching not available, sending the instruction inline "
+                      f"({self.disabled_reason})")
+                return
+            print(f"⚠️ Prompt cache creation failed: {response.status_code}")
+            self._failed_at[api_key] = time.monotonic()
+        except (LLMClientError, ValueError) as e:
+            print(f"⚠️ Prompt cache creation failed: {e}")
+            self._failed_at[api_key] = time.monotonic()
+        finally:
+            with self._lock:
+                self._pending.discard(api_key)
+
+    def _renew(self, api_key: str, entry: CachedPrompt) -> bool:
+        """Extend the TTL of an entry in use"""
+        try:
+            # Google APIs accept PATCH as a POST with a method override
+            response = self.client.post(
+                self._url(entry.name, api_key) + "&updateMask=ttl", data=json.dumps({"ttl": f"{self.ttl}s"}),
+                headers={"Content-Type": "application/json", "X-HTTP-Method-Override": "PATCH"})
+        except LLMClientError:
+            return False
+        if response.status_code != 200:
+            return False
+        entry.expires = time.monotonic() + self.ttl
+        self.renewed += 1
+        return True
+
+    def _renew_loop(self):
+        while self._running:
+            time.sleep(30)
+            now = time.monotonic()
+            with self._lock:
+                due = [(k, e) for k, e in self.entries.items()
+                       if e.expires - now < self.renew_margin]
+            for api_key, entry in due:
+                if now - entry.last_used < self.ttl and self._renew(api_key, entry):
+                    continue
+                if entry.expires <= time.monotonic():
+                    with self._lock:
+                        self.entries.pop(api_key, None)
+
+    def stats(self) -> dict:
+        """Caches made and prompt tokens served from them"""
+        return {
+            "enabled": self.disabled_reason is None,
+            "caches": len(self.entries),
+            "created": self.created,
+            "renewed": self.renewed,
+            "invalidated": self.invalidated,
+            "prompt_tokens": self.prompt_tokens,
+            "cached_tokens": self.cached_tokens,
+            "cached_share": round(self.cached_tokens / self.prompt_tokens, 2) if self.prompt_tokens else 0.0,
+        }
@@ -0,0 +1,237 @@
+"""Replay recorded utterances through the conversation loop.
+
+Used by `saira.py --replay` and `saira0.2.py --replay` to run whole
+conversations on a headless box: audio comes from WAV files instead of
+the microphone, speech goes to SDL's dummy (null) audio driver, and the
+network services can be replaced by local stand-ins. Every turn is timed
+and a report is printed (and optionally saved as JSON) at the end.
+
+Input is either a directory of WAV files (played in name order, with an
+optional `<name>.txt` transcript next to each) or a JSON / JSON-lines
+manifest of {"wav": "...", "text": "..."} entries.
+"""
+import concurrent.futures
+import io
+import json
+import os
+import statistics
+import time
+import wave
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import speech_recognition as sr
+
+from mock_llm_server import MockLLMServer, MockSettings
+from stt import STTBackend
+from tts import TTSBackend
+
+# ============================================================================
+# REPLAY INPUT
+# ============================================================================
+
+class ReplayFinished(Exception):
+    """Raised by the replay source when every recording was used"""
+
+@dataclass
+class ReplayTurn:
+    """One recorded utterance"""
+    wav: str
+    text: Optional[str] = None  # known transcript, used by the STT stand-in
+
+def load_turns(path: str) -> List[ReplayTurn]:
+    """Read a WAV directory or a JSON / JSON-lines manifest"""
+    if os.path.isdir(path):
+        turns = []
+        for name in sorted(os.listdir(path)):
+            if not name.lower().endswith(".wav"):
+                continue
+            wav = os.path.join(path, name)
+            sidecar = os.path.splitext(wav)[0] + ".txt"
+            text = None
+            if os.path.exists(sidecar):
+                with open(sidecar, "r", encoding="utf-8") as f:
+                    text = f.read().strip()
+            turns.append(ReplayTurn(wav, text))
+        return turns
+
+    base = os.path.dirname(os.path.abspath(path))
+    with open(path, "r", encoding="utf-8") as f:
+        raw = f.read().strip()
+    if raw.startswith("["):
+        entries = json.loads(raw)
+    else:
+        entries = [json.loads(line) for line in raw.splitlines() if line.strip()]
+    return [ReplayTurn(os.path.join(base, e["wav"]), e.get("text")) for e in entries]
+
+def use_null_audio():
+    """Send pygame output to SDL's dummy driver (call before mixer init)"""
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+class ReplaySource:
+    """Hands out recorded utterances in order, in place of the microphone"""
+
+    def __init__(self, turns: List[ReplayTurn]):
+        self.turns = turns
+        self.index = 0
+        self.current: Optional[ReplayTurn] = None
+
+    def next_audio(self) -> sr.AudioData:
+        """Audio of the next recording"""
+        if self.index >= len(self.turns):
+            raise ReplayFinished()
+        self.current = self.turns[self.index]
+        self.index += 1
+        with sr.AudioFile(self.current.wav) as source:
+            return sr.Recognizer().record(source)
+
+    def label(self) -> str:
+        """Name of the current recording"""
+        return os.path.basename(self.current.wav) if self.current else ""
+
+# ============================================================================
+# LOCAL STAND-INS
+# ============================================================================
+
+class TranscriptSTT(STTBackend):
+    """Returns the known transcript of the current recording (no network)"""
+
+    name = "replay"
+
+    def __init__(self, source: ReplaySource, delay: float = 0.0):
+        self.source = source
+        self.delay = delay
+
+    def recognize(self, audio: sr.AudioData) -> str:
+        if self.delay:
+            time.sleep(self.delay)
+        text = self.source.current.text if self.source.current else None
+        if text is None:
+            raise RuntimeError("no transcript for this recording")
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+class SilentTTS(TTSBackend):
+    """Silent WAV about as long as the spoken text would be"""
+
+    name = "silent"
+
+    def __init__(self, chars_per_second: float = 14.0, sample_rate: int = 16000):
+        self.chars_per_second = chars_per_second
+        self.sample_rate = sample_rate
+
+    def synthesize(self, text: str, voice: Optional[str] = None) -> concurrent.futures.Future:
+        frames = int(len(text) / self.chars_per_second * self.sample_rate)
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(self.sample_rate)
+            w.writeframes(b"\x00\x00" * frames)
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        future.set_result(buffer.getvalue())
+        return future
+
+class GeminiStub(MockLLMServer):
+    """Local stand-in for the Gemini generateContent endpoints.
+
+    `delay` is the time to the (first) response; streamGenerateContent
+    sends the reply sentence by sentence, `chunk_delay` apart, as SSE.
+    See mock_llm_server for error injection and token-rate settings.
+    """
+
+    def __init__(self, delay: float = 0.3, reply: str = "This is a replay answer.",
+                 chunk_delay: float = 0.1):
+        super().__init__(MockSettings(latency=delay, reply=reply, chunk_tokens=0,
+                                      chunk_delay=chunk_delay))
+
+# ============================================================================
+# TURN TIMING
+# ============================================================================
+
+@dataclass
+class TurnTiming:
+    """Durations (phases) and offsets from turn start (stamps), in seconds"""
+    label: str
+    started: float
+    phases: Dict[str, float] = field(default_factory=dict)
+    stamps: Dict[str, float] = field(default_factory=dict)
+    total: float = 0.0
+
+class TurnTimer:
+    """Collects per-turn timings; calls outside an open turn are ignored"""
+
+    def __init__(self):
+        self.turns: List[TurnTiming] = []
+        self._current: Optional[TurnTiming] = None
+
+    def begin(self, label: str):
+        """Open a turn (closing any previous one)"""
+        self.end()
+        self._current = TurnTiming(label, time.perf_counter())
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a block and add it to the current turn"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self._current is not None:
+                self._current.phases[name] = (self._current.phases.get(name, 0.0)
+                                              + time.perf_counter() - start)
+
+    def stamp(self, name: str):
+        """Record the first time `name` happens in the current turn"""
+        if self._current is not None and name not in self._current.stamps:
+            self._current.stamps[name] = time.perf_counter() - self._current.started
+
+    def end(self):
+        """Close the current turn"""
+        if self._current is not None:
+            self._current.total = time.perf_counter() - self._current.started
+            self.turns.append(self._current)
+            self._current = None
+
+    def report(self, path: Optional[str] = None):
+        """Print a per-turn table and a summary; optionally save JSON"""
+        self.end()
+        if not self.turns:
+            print("No turns recorded")
+            return
+        names = sorted({n for t in self.turns for n in t.phases})
+        stamps = sorted({n for t in self.turns for n in t.stamps})
+        columns = names + stamps + ["total"]
+
+        print("\n" + "=" * 70)
+        print("⏱️  TURN TIMING (ms)")
+        print("=" * 70)
+        print(f"{'turn':<24}" + "".join(f"{c:>12}" for c in columns))
+        for t in self.turns:
+            values = ([t.phases.get(n) for n in names] + [t.stamps.get(n) for n in stamps]
+                      + [t.total])
+            print(f"{t.label[:23]:<24}" + "".join(
+                f"{v * 1000:12.0f}" if v is not None else f"{'-':>12}" for v in values))
+
+        summary = {}
+        for c in columns:
+            samples = [t.total if c == "total" else t.phases.get(c, t.stamps.get(c))
+                       for t in self.turns]
+            samples = [s for s in samples if s is not None]
+            if samples:
+                summary[c] = {"mean_ms": round(statistics.mean(samples) * 1000, 1),
+                              "max_ms": round(max(samples) * 1000, 1)}
+        print("-" * 70)
+        print(f"{'mean':<24}" + "".join(
+            f"{summary[c]['mean_ms']:12.0f}" if c in summary else f"{'-':>12}" for c in columns))
+
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "turns": [{"label": t.label, "phases": t.phases, "stamps": t.stamps,
+                               "total": t.total} for t in self.turns],
+                    "summary": summary,
+                }, f, indent=2)
+            print(f"📝 Report saved to {path}")
@@ -0,0 +1,138 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+from speculative import normalize_utterance
+
+# ============================================================================
+# RESPONSE CACHE
+# ============================================================================
+
+# Words that don't change the question ("hey saira, what is AI please")
+FILLER_WORDS = {"hey", "hi", "hello", "ok", "okay", "so", "um", "uh", "please",
+                "saira", "sara", "sarah", "tell", "me", "can", "you"}
+
+# Words that make a question depend on the conversation so far
+CONTEXT_WORDS = {"it", "its", "that", "this", "those", "these", "he", "she", "him",
+                 "her", "they", "them", "their", "more", "again", "why", "else"}
+
+class ResponseCache:
+    """Replies to repeated questions, keyed by the normalized utterance.
+
+    Entries expire after `ttl` seconds and the least recently used ones
+    are evicted beyond `max_entries`. With `use_context`, the key also
+    includes a hash of the recent conversation; without it, follow-up
+    questions ("why is that?") are never cached since their answer
+    depends on what came before. The cache is saved to `path` as JSON
+    every `save_every` new entries and on save().
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: float = 24 * 3600,
+                 max_entries: int = 500, use_context: bool = False, save_every: int = 5):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.use_context = use_context
+        self.save_every = save_every
+        self._items: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._unsaved = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+        self.expired = 0
+        self.load()
+
+    def key(self, text: str, context: Optional[List[dict]] = None) -> Optional[str]:
+        """Cache key, or None if the utterance shouldn't be cached"""
+        words = [w for w in normalize_utterance(text).split() if w not in FILLER_WORDS]
+        if not words:
+            return None
+        key = " ".join(words)
+        if self.use_context:
+            if context:
+                raw = json.dumps(context, sort_keys=True).encode("utf-8")
+                key += "|" + hashlib.sha1(raw).hexdigest()[:12]
+        elif CONTEXT_WORDS.intersection(words):
+            return None
+        return key
+
+    def get(self, text: str, context: Optional[List[dict]] = None) -> Optional[str]:
+        """Cached reply or None"""
+        key = self.key(text, context)
+        if key is None:
+            self.skipped += 1
+            return None
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is not None and time.time() - entry["created"] > self.ttl:
+                del self._items[key]
+                self.expired += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return entry["reply"]
+
+    def put(self, text: str, reply: str, context: Optional[List[dict]] = None):
+        """Store a reply, evicting the least recently used entries"""
+        key = self.key(text, context)
+        if key is None or not reply:
+            return
+        with self._lock:
+            self._items.pop(key, None)
+            self._items[key] = {"reply": reply, "created": time.time()}
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+            self._unsaved += 1
+            due = self._unsaved >= self.save_every
+        if due:
+            self.save()
+
+    def load(self):
+        """Restore unexpired entries from disk"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            now = time.time()
+            with self._lock:
+                for key, entry in data.items():
+                    if now - entry["created"] <= self.ttl:
+                        self._items[key] = entry
+            print(f"💾 Response cache restored: {len(self._items)} answer(s)")
+        except Exception as e:
+            print(f"⚠️ Could not load response cache: {e}")
+
+    def save(self):
+        """Write the cache to disk"""
+        if not self.path:
+            return
+        with self._lock:
+            data = dict(self._items)
+            self._unsaved = 0
+        try:
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+        except Exception as e:
+            print(f"⚠️ Could not save response cache: {e}")
+
+    def stats(self) -> dict:
+        """Hit rate and size"""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._items),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 2) if total else 0.0,
+            "expired": self.expired,
+            "not_cacheable": self.skipped,
+        }
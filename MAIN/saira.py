@@ -1,15 +1,36 @@
-import requests
 import speech_recognition as sr
-import edge_tts
-import asyncio
-import pygame
+import argparse
 import os
 import time
-import re
 import json
 import random
-from threading import Thread, Lock
+from threading import Thread
 import socket
+from audio_engine import AudioEngine, AudioClip, PCMCache
+from tts import TTSRouter, EdgeTTS, EspeakTTS
+from barge_in import BargeInMonitor
+from mic_stream import MicStream
+from capture import ContinuousCapture
+from stt import STTRouter, GoogleSTT, VoskSTT
+from streaming_stt import StreamingTranscriber
+from speculative import SpeculativeAnswerer
+from endpointing import AdaptiveEndpointer
+from wakeword import WakeWordGate
+from response_cache import ResponseCache
+from key_pool import KeyPool, parse_retry_delay
+from llm_client import LLMClient, LLMClientError, Timeouts
+from circuit_breaker import CircuitBreaker
+from hedging import Hedger
+from conversation_memory import ConversationMemory
+from prompt_cache import PromptCache
+from knowledge_base import KnowledgeBase
+from answer_router import AnswerRouter
+from intents import IntentMatcher
+from llm_backends import LLMRouter, GeminiBackend, OllamaBackend
+from llm_stream import SentenceSplitter, iter_sse_json, gemini_chunk_text
+from text_sanitizer import TextSanitizer, strip_unspeakable
+from replay import (ReplaySource, ReplayFinished, TranscriptSTT, SilentTTS,
+                    GeminiStub, TurnTimer, load_turns, use_null_audio)
 
 # ============================================================================
 # FACE COMMUNICATION
@@ -17,6 +38,8 @@ import socket
 
 def send_face_command(cmd: dict, timeout: float = 0.3):
     """Send command to face display"""
+    if not FACE_ENABLED:
+        return False
     try:
         s = socket.create_connection(("127.0.0.1", 5002), timeout=timeout)
         s.sendall((json.dumps(cmd) + "\n").encode())
@@ -37,8 +60,72 @@ API_KEYS = [
 ]
 
 GEMINI_MODEL = "gemini-2.5-flash"
+GEMINI_API_BASE = os.environ.get("SAIRA_GEMINI_BASE", "https://generativelanguage.googleapis.com/v1beta")
+FACE_ENABLED = True
+TTS_VOICE = "en-IN-NeerjaNeural"  # Indian female voice
+TTS_TIMEOUT = 20  # seconds to wait for synthesized audio
+TTS_BACKEND = "auto"  # "auto", "edge" (online) or "espeak" (offline)
+TTS_LATENCY_BUDGET = 1.5  # seconds; slower online TTS switches to local
+SPEECH_CACHE_MB = 64  # decoded PCM kept for repeated phrases
 MAX_KEY_RETRIES = 3
+GEMINI_KEY_RPM = 15  # requests per minute allowed per key (free tier)
+LLM_CONNECT_TIMEOUT = 3  # seconds to open the connection
+LLM_FIRST_BYTE_TIMEOUT = 8  # seconds from request to response headers
+LLM_TOTAL_TIMEOUT = 15  # seconds for the whole reply
+LLM_REWARM_AFTER = 45  # seconds idle before the connection is refreshed
+LLM_BREAKER_FAILURES = 3  # failed or slow Gemini calls in a row before answering offline
+LLM_SLOW_CALL = 6  # seconds; a slower Gemini response counts as a failure
+LLM_PROBE_EVERY = 10  # seconds between background checks while offline
+MEMORY_TOKEN_BUDGET = 400  # tokens of verbatim history sent with each request
+MEMORY_SUMMARY_TOKENS = 120  # older turns are folded into a summary of about this size
+PROMPT_CACHE_ENABLED = False  # Upload SYSTEM_INSTRUCTION once as Gemini cached content
+PROMPT_CACHE_MIN_TOKENS = 1024  # Gemini refuses to cache smaller prompts (ours is ~400 tokens)
+PROMPT_CACHE_TTL = 3600  # seconds; renewed automatically while in use
+HEDGE_REQUESTS = False  # Fire a backup request on another key when Gemini is unusually slow
+HEDGE_PERCENTILE = 95  # hedge after this percentile of recent response times
 SPEECH_CHAR_LIMIT = 500  # Increased for better responses
+BARGE_IN_ENABLED = False  # Let the user interrupt Saira mid-sentence
+CONTINUOUS_CAPTURE = True  # Background capture with VAD segmentation and pre-roll
+MIC_SAMPLE_RATE = 16000
+STT_BACKEND = "auto"  # "auto", "google" (online) or "vosk" (on-device)
+STT_LATENCY_BUDGET = 2.0  # seconds; slower online recognition switches to local
+ADAPTIVE_ENDPOINTING = True  # End capture sooner on short, complete phrases
+STREAMING_STT = True  # On-device partial transcripts while the user talks (needs Vosk + capture)
+WAKE_WORD_ENABLED = False  # Only recognize speech that starts with a wake word (needs Vosk + capture)
+WAKE_WORDS = ["saira", "sara", "sarah"]
+WAKE_FOLLOW_UP = 8  # seconds after Saira spoke during which no wake word is needed
+STREAMING_LLM = True  # Speak Gemini's reply sentence by sentence as it streams in
+SPECULATIVE_LLM = False  # Also start the Gemini request on a stable partial transcript
+LLM_BACKEND = "gemini"  # "gemini", "ollama" (local model) or "auto" (Gemini, local model when it fails)
+LLM_PROFILE = "balanced"  # generation profile, same name in every backend
+GEMINI_PROFILES = {
+    "fast": {"temperature": 0.9, "maxOutputTokens": 200, "topP": 0.95},
+    "balanced": {"temperature": 0.9, "maxOutputTokens": 500, "topP": 0.95},
+}
+OLLAMA_MODEL = "gemma3:1b"
+OLLAMA_HOST = os.environ.get("SAIRA_OLLAMA_HOST", "http://localhost:11434")
+OLLAMA_KEEP_ALIVE = "30m"  # keep the local model loaded this long after each reply
+OLLAMA_SWITCH_WAIT = 3.0  # seconds a voice switch waits to hear whether the local model loads
+OLLAMA_PROFILES = {
+    # num_thread / num_ctx are load-time options: keep them equal or a switch reloads the model
+    "fast": {"num_thread": 8, "num_ctx": 2048, "num_predict": 96, "temperature": 0.7, "top_p": 0.9},
+    "balanced": {"num_thread": 8, "num_ctx": 2048, "num_predict": 256, "temperature": 0.7,
+                 "top_p": 0.9, "repeat_penalty": 1.05},
+}
+KNOWLEDGE_BASE_ENABLED = True  # Answer from saira0.2's qa_blocks.txt before asking Gemini
+KB_CONFIDENCE = 90.0  # match percent needed to answer locally
+KB_FALLBACK_CONFIDENCE = 50.0  # weaker matches are only used when Gemini fails
+KB_OFFLINE_CONFIDENCE = 70.0  # answer without trying while Gemini is down and no local model runs
+KB_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "saira0.2v", "qa_blocks.txt")
+KB_META_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "saira0.2v", "qa_meta.json")
+RESPONSE_CACHE_ENABLED = True  # Answer repeated questions without calling Gemini
+RESPONSE_CACHE_TTL = 24 * 3600  # seconds
+RESPONSE_CACHE_SIZE = 500  # answers
+RESPONSE_CACHE_CONTEXT = False  # Key on recent conversation too (caches follow-ups per context)
+RESPONSE_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "response_cache.json")
+VOSK_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models", "vosk-model-small-en-in-0.4")
+MIC_RECALIBRATE_EVERY = 120  # seconds between background noise calibrations
+MIC_CALIBRATION_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mic_calibration.json")
 
 OFFLINE_REPLIES = [
     "Sorry, I'm having network issues right now.",
@@ -60,23 +147,25 @@ except:
 
 listening_enabled = True
 is_speaking = False
-api_key_index = 0
-api_lock = Lock()
-session = requests.Session()
-
-# Regex patterns
-emoji_pattern = re.compile("["
-    u"\U0001F600-\U0001F64F"
-    u"\U0001F300-\U0001F5FF"
-    u"\U0001F680-\U0001F6FF"
-    u"\U0001F1E0-\U0001F1FF"
-    u"\U00002702-\U000027B0"
-    u"\U000024C2-\U0001F251"
-    u"\U00002500-\U00002BEF"
-    u"\U00010000-\U0010ffff"
-    "]", flags=re.UNICODE)
-
-devanagari_pattern = re.compile(r'[\u0900-\u097F]+')
+key_pool = KeyPool(API_KEYS, rpm=GEMINI_KEY_RPM)
+# Pooled keep-alive connection to Gemini, warmed at startup (httpx if installed)
+llm_client = LLMClient(Timeouts(LLM_CONNECT_TIMEOUT, LLM_FIRST_BYTE_TIMEOUT, LLM_TOTAL_TIMEOUT),
+                       idle_rewarm=LLM_REWARM_AFTER)
+post_hedger = Hedger(pct=HEDGE_PERCENTILE)
+stream_hedger = Hedger(pct=HEDGE_PERCENTILE)
+replay_source = None  # set by --replay: recordings instead of the microphone
+replay_report = None  # JSON path for the replay timing report
+turn_timer = TurnTimer()
+audio_engine = AudioEngine()
+speech_cache = PCMCache(SPEECH_CACHE_MB * 1024 * 1024)
+tts_engine = TTSRouter([EdgeTTS(), EspeakTTS()], mode=TTS_BACKEND,
+                       latency_budget=TTS_LATENCY_BUDGET)
+response_cache = ResponseCache(RESPONSE_CACHE_FILE, ttl=RESPONSE_CACHE_TTL,
+                               max_entries=RESPONSE_CACHE_SIZE,
+                               use_context=RESPONSE_CACHE_CONTEXT) if RESPONSE_CACHE_ENABLED else None
+
+# Model output never mentions Google; markdown, emoji and Devanagari are stripped
+reply_sanitizer = TextSanitizer({"google": "my creators"})
 
 # Enhanced system instruction
 SYSTEM_INSTRUCTION = """You are Saira — a friendly female AI robot assistant created as a school project.
@@ -117,46 +206,75 @@ BEHAVIOR RULES:
 - Avoid unnecessary extra info unless asked.
 """
 
-# Chat history
-chat_history = []
+# Chat history: recent turns verbatim, older ones as a running summary
+memory = ConversationMemory(budget=MEMORY_TOKEN_BUDGET, summary_budget=MEMORY_SUMMARY_TOKENS)
+
+# The fixed instruction is uploaded once per key and referenced by name
+prompt_cache = (PromptCache(llm_client, lambda: GEMINI_API_BASE, GEMINI_MODEL, SYSTEM_INSTRUCTION,
+                            ttl=PROMPT_CACHE_TTL, min_tokens=PROMPT_CACHE_MIN_TOKENS)
+                if PROMPT_CACHE_ENABLED else None)
 
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
 
-def remove_emojis(text: str) -> str:
-    """Remove emojis and markdown"""
-    text = emoji_pattern.sub('', text)
-    text = re.sub(r'[*_~`#\[\](){}]', '', text)
-    return text.strip()
-
-def remove_devanagari(text: str) -> str:
-    """Remove Hindi/Devanagari characters"""
-    return devanagari_pattern.sub('', text)
-
 def clean_text_for_speech(text: str) -> str:
     """Clean text for TTS"""
-    text = remove_emojis(text)
-    text = remove_devanagari(text)
-    return text.strip()
+    return strip_unspeakable(text).strip()
+
+def sanitize_reply(text: str) -> str:
+    """Clean model output and replace any Google mentions"""
+    return reply_sanitizer.clean(text)
 
 # ============================================================================
 # TEXT-TO-SPEECH
 # ============================================================================
 
-async def _edge_save_tts(text: str, voice: str, out_file: str = "temp_audio.mp3"):
-    """Generate TTS audio file"""
-    communicate = edge_tts.Communicate(text, voice, rate="+10%")
-    await communicate.save(out_file)
+def _on_speech_done(clip: AudioClip):
+    """Playback callback: reset face once the queue runs dry"""
+    global is_speaking
+    if not audio_engine.is_busy():
+        send_face_command({"cmd": "talk", "state": False})
+        is_speaking = False
+        if wake_gate is not None:
+            wake_gate.keep_awake()
+
+def synthesize_pcm(text: str, track: bool = False) -> bytes:
+    """Decoded speech for text, from the cache or freshly synthesized"""
+    pcm = speech_cache.get((TTS_VOICE, text))
+    if pcm is None:
+        future = tts_engine.synthesize(text, TTS_VOICE)
+        if track and BARGE_IN_ENABLED:
+            barge_in.track(future)
+        # Decode once here; replays come straight from the cache
+        pcm = audio_engine.decode(future.result(TTS_TIMEOUT))
+        speech_cache.put((TTS_VOICE, text), pcm)
+    return pcm
+
+def prefetch_speech(phrases: list):
+    """Warm the speech cache with fixed phrases in the background"""
+    def run():
+        for phrase in phrases:
+            try:
+                synthesize_pcm(clean_text_for_speech(phrase))
+            except Exception as e:
+                print(f"⚠️ Speech prefetch failed: {e}")
+                return
+    Thread(target=run, daemon=True).start()
+
+def speak(text: str, wait: bool = True) -> AudioClip:
+    """Speak text using the selected TTS backend and display on face.
 
-def speak(text: str):
-    """Speak text using edge-tts and display on face"""
+    Audio is handed to the audio engine; with wait=False this returns as
+    soon as the clip is queued and the face is reset from the callback.
+    Returns the queued clip (None if nothing was played).
+    """
     global is_speaking
     
     # Clean text
     full_text = clean_text_for_speech(text)
     if not full_text:
-        return
+        return None
     
     # Truncate for speech if too long
     spoken_part = full_text if len(full_text) <= SPEECH_CHAR_LIMIT else (full_text[:SPEECH_CHAR_LIMIT] + "...")
@@ -174,71 +292,59 @@ def speak(text: str):
         })
         
         # Generate TTS
-        voice = "en-IN-NeerjaNeural"  # Indian female voice
-        asyncio.run(_edge_save_tts(spoken_part, voice))
-        
-        # Play audio
-        pygame.mixer.init()
-        pygame.mixer.music.load("temp_audio.mp3")
-        pygame.mixer.music.play()
+        with turn_timer.phase("tts"):
+            pcm = synthesize_pcm(spoken_part, track=True)
         
-        while pygame.mixer.music.get_busy():
-            time.sleep(0.05)
-        
-        pygame.mixer.music.unload()
+        # Queue audio; the engine reports completion through the callback
+        clip = audio_engine.enqueue(AudioClip(
+            pcm=pcm, text=spoken_part, on_done=_on_speech_done,
+            on_start=lambda c: turn_timer.stamp("first_audio")
+        ))
+        if BARGE_IN_ENABLED and not capture.running:
+            barge_in.watch()
         
     except Exception as e:
         print(f"❌ Speech error: {e}")
-    finally:
-        # Tell face to stop talking
-        send_face_command({"cmd": "talk", "state": False})
-        
-        # Cleanup
-        try:
-            if os.path.exists("temp_audio.mp3"):
-                os.remove("temp_audio.mp3")
-        except:
-            pass
-        
-        is_speaking = False
+        if not audio_engine.is_busy():
+            send_face_command({"cmd": "talk", "state": False})
+            is_speaking = False
+        return None
+    
+    if wait:
+        clip.wait()
+        turn_timer.stamp("spoken")
+    return clip
 
 # ============================================================================
 # API KEY MANAGEMENT
 # ============================================================================
 
-def get_current_api_key() -> str:
-    """Get current API key"""
-    global api_key_index
-    with api_lock:
-        if not API_KEYS:
-            return ""
-        return API_KEYS[api_key_index % len(API_KEYS)]
-
-def switch_api_key():
-    """Rotate to next API key"""
-    global api_key_index
-    with api_lock:
-        api_key_index = (api_key_index + 1) % max(1, len(API_KEYS))
-        print(f"🔄 Switched to API key #{api_key_index + 1}")
+def acquire_api_key(tried: list):
+    """Healthiest key not tried yet this turn (None when all are cooling down)"""
+    key = key_pool.acquire(exclude=tried)
+    if key is None:
+        print(f"⚠️ No API key available, next one free in {key_pool.next_ready_in():.0f}s")
+        return None
+    tried.append(key)
+    return key
+
+def report_key_error(key, response):
+    """Put a rate-limited or rejected key on cooldown"""
+    retry_after = parse_retry_delay(response.headers, response.text) if response.status_code == 429 else None
+    key_pool.failure(key, response.status_code, retry_after)
+    print(f"⚠️ API error {response.status_code} on key {key.label}, trying another key...")
 
 # ============================================================================
 # GEMINI API
 # ============================================================================
 
-def call_gemini(user_message: str) -> tuple[bool, str]:
-    """
-    Call Gemini API with conversation history
-    Returns: (success, response_text)
-    """
-    if not API_KEYS:
-        return False, random.choice(OFFLINE_REPLIES)
-    
+def build_gemini_request(user_message: str, generation_config: dict = None) -> dict:
+    """Request body with system instruction and recent history"""
     # Build conversation for API
     contents = []
     
-    # Add recent history (last 6 messages)
-    recent_history = chat_history[-6:] if len(chat_history) > 6 else chat_history
-    for msg in recent_history:
+    # Summary of older turns plus the recent ones that fit the token budget
+    for msg in memory.context():
         contents.append({
             "role": "user" if msg["role"] == "user" else "model",
             "parts": [{"text": msg["content"]}]
@@ -250,85 +356,372 @@ def call_gemini(user_message: str) -> tuple[bool, str]:
         "parts": [{"text": user_message}]
     })
     
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/{GEMINI_MODEL}:generateContent?key={get_current_api_key()}"
-    
-    data = {
+    return {
         "system_instruction": {
             "parts": [{"text": SYSTEM_INSTRUCTION}]
         },
         "contents": contents,
-        "generationConfig": {
-            "temperature": 0.9,
-            "maxOutputTokens": 500,
-            "topP": 0.95
-        }
+        "generationConfig": generation_config or GEMINI_PROFILES["balanced"]
+    }
+
+def send_gemini(method: str, body: dict, key, tried: list):
+    """
+    POST a request body to a Gemini method with `key`. Network errors,
+    server errors and slow responses count against the circuit breaker.
+    Returns: (response, key that answered)
+    """
+    start = time.perf_counter()
+    try:
+        response, key = _post_gemini(method, body, key, tried)
+    except LLMClientError as e:
+        llm_breaker.failure(str(e))
+        raise
+    if response.status_code >= 500:
+        llm_breaker.failure(f"HTTP {response.status_code}")
+    else:
+        llm_breaker.success(time.perf_counter() - start)
+    return response, key
+
+def _post_gemini(method: str, body: dict, key, tried: list):
+    """
+    The system instruction is referenced from the prompt cache when one
+    exists for the key. With hedging, a request that is slower than usual
+    is repeated on another key and the first answer wins.
+    """
+    stream = method == "streamGenerateContent"
+    headers = {"Content-Type": "application/json"}
+    query = "alt=sse&" if stream else ""
+    
+    def url(k) -> str:
+        return f"{GEMINI_API_BASE}/models/{GEMINI_MODEL}:{method}?{query}key={k.key}"
+    
+    def payload(k) -> str:
+        return json.dumps(prompt_cache.apply(body, k.key) if prompt_cache else body)
+    
+    send = llm_client.stream if stream else llm_client.post
+    if not HEDGE_REQUESTS or len(key_pool) < 2:
+        response = send(url(key), data=payload(key), headers=headers)
+    else:
+        submit = llm_client.submit_stream if stream else llm_client.submit_post
+        backup_key = []
+        
+        def backup():
+            other = key_pool.acquire(exclude=tried)
+            if other is None:
+                return None
+            tried.append(other)
+            backup_key.append(other)
+            print(f"⏩ Gemini is slow, also asking with key {other.label}")
+            return submit(url(other), data=payload(other), headers=headers)
+        
+        primary_key = key
+        
+        def settle(was_backup: bool, latency: float, loser):
+            # The losing request used its key too: its outcome counts for that key
+            loser_key = backup_key[0] if was_backup else primary_key
+            if loser is None:
+                key_pool.failure(loser_key)
+            elif loser.status_code == 200:
+                key_pool.success(loser_key, latency)
+            else:
+                retry_after = parse_retry_delay(loser.headers) if loser.status_code == 429 else None
+                key_pool.failure(loser_key, loser.status_code, retry_after)
+        
+        hedger = stream_hedger if stream else post_hedger
+        response, from_backup = hedger.run(
+            lambda: submit(url(key), data=payload(key), headers=headers), backup,
+            ok=lambda r: r.status_code == 200,
+            discard=(lambda r: r.close()) if stream else (lambda r: None),
+            on_loser=settle)
+        if from_backup:
+            key = backup_key[0]
+    
+    if (prompt_cache and response.status_code in (400, 403, 404)
+            and "cachedcontent" in response.text.lower()):
+        # Cache expired or was deleted on the server: send the instruction inline
+        prompt_cache.invalidate(key.key)
+        if stream:
+            response.close()
+        response = send(url(key), data=json.dumps(body), headers=headers)
+    return response, key
+
+def probe_gemini() -> bool:
+    """Background reachability check while the breaker is open (countTokens, no generation quota)"""
+    if not key_pool:
+        return False
+    url = f"{GEMINI_API_BASE}/models/{GEMINI_MODEL}:countTokens?key={key_pool.keys[0].key}"
+    data = {"contents": [{"role": "user", "parts": [{"text": "ping"}]}]}
+    try:
+        response = llm_client.post(url, headers={"Content-Type": "application/json"},
+                                   data=json.dumps(data))
+    except LLMClientError:
+        return False
+    return response.status_code < 500
+
+# Stops waiting on Gemini timeouts while the network is down
+llm_breaker = CircuitBreaker(probe_gemini, failure_threshold=LLM_BREAKER_FAILURES,
+                             slow_call=LLM_SLOW_CALL, probe_every=LLM_PROBE_EVERY, name="Gemini")
+
+def summarize_conversation(previous: str, messages: list) -> str:
+    """Fold older turns into the running summary (small background request)"""
+    if llm_breaker.is_open:
+        return ""  # before acquire(), so no key is taken for a call that is not made
+    key = key_pool.acquire()
+    if key is None:
+        return ""
+    transcript = "\n".join(f"{'User' if m['role'] == 'user' else 'Saira'}: {m['content']}"
+                           for m in messages)
+    prompt = (f"Summary so far: {previous or '(none)'}\n\nNew part of the conversation:\n{transcript}\n\n"
+              f"Update the summary of this conversation between a user and Saira in at most "
+              f"{MEMORY_SUMMARY_TOKENS // 2} words. Keep names, facts and open questions. "
+              "Reply with the summary only.")
+    data = {
+        "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+        "generationConfig": {"temperature": 0.2, "maxOutputTokens": MEMORY_SUMMARY_TOKENS}
     }
+    url = f"{GEMINI_API_BASE}/models/{GEMINI_MODEL}:generateContent?key={key.key}"
+    start = time.perf_counter()
+    try:
+        response = llm_client.post(url, headers={"Content-Type": "application/json"},
+                                   data=json.dumps(data))
+    except LLMClientError:
+        key_pool.failure(key)
+        raise
+    if response.status_code != 200:
+        key_pool.failure(key, response.status_code)
+        return ""
+    key_pool.success(key, time.perf_counter() - start)
+    return response.json()["candidates"][0]["content"]["parts"][0]["text"].strip()
+
+memory.summarize = summarize_conversation
+
+def call_gemini(user_message: str, generation_config: dict = None) -> tuple[bool, str]:
+    """
+    Call Gemini API with conversation history
+    Returns: (success, response_text)
+    """
+    if not key_pool or not llm_breaker.allow():
+        return False, random.choice(OFFLINE_REPLIES)
     
-    # Retry logic
+    data = build_gemini_request(user_message, generation_config)
+    
+    # Retry logic: every attempt uses the healthiest key not tried yet
+    tried = []
     for attempt in range(MAX_KEY_RETRIES):
+        if attempt and llm_breaker.is_open:
+            break
+        key = acquire_api_key(tried)
+        if key is None:
+            break
+        start = time.perf_counter()
         try:
             # Show thinking state
             send_face_command({"cmd": "think"})
             
-            response = session.post(
-                url,
-                headers={"Content-Type": "application/json"},
-                data=json.dumps(data),
-                timeout=15
-            )
+            response, key = send_gemini("generateContent", data, key, tried)
             
             if response.status_code == 200:
+                key_pool.success(key, time.perf_counter() - start)
                 try:
                     result = response.json()
                     reply = result["candidates"][0]["content"]["parts"][0]["text"]
+                    if prompt_cache:
+                        prompt_cache.record_usage(result.get("usageMetadata"))
                     
-                    # Clean response
-                    reply = clean_text_for_speech(reply)
-                    
-                    # Safety: replace any Google mentions
-                    if "google" in reply.lower():
-                        reply = reply.replace("Google", "my creators")
-                        reply = reply.replace("google", "my creators")
-                    
-                    return True, reply
+                    # Clean response and replace any Google mentions
+                    return True, sanitize_reply(reply)
                     
                 except Exception as e:
                     print(f"❌ Parse error: {e}")
                     return False, random.choice(OFFLINE_REPLIES)
             
             elif response.status_code in [429, 403, 401]:
-                print(f"⚠️ API error {response.status_code}, switching key...")
-                switch_api_key()
-                time.sleep(0.5)
+                report_key_error(key, response)
                 continue
             
             else:
+                key_pool.failure(key, response.status_code)
                 print(f"❌ API returned {response.status_code}")
                 return False, random.choice(OFFLINE_REPLIES)
                 
-        except requests.RequestException as e:
+        except LLMClientError as e:
+            key_pool.failure(key)
             print(f"❌ Network error: {e}")
             return False, random.choice(OFFLINE_REPLIES)
     
     return False, random.choice(OFFLINE_REPLIES)
 
-def chat_with_model(user_input: str) -> str:
-    """Main chat function with history management"""
-    # Add to history
-    chat_history.append({"role": "user", "content": user_input})
+def stream_gemini(user_message: str, on_sentence, generation_config: dict = None) -> tuple[bool, str]:
+    """
+    Streaming Gemini call: every complete, cleaned sentence is passed to
+    on_sentence while the rest of the reply is still being generated.
+    Returns: (success, response_text)
+    """
+    if not key_pool or not llm_breaker.allow():
+        return False, random.choice(OFFLINE_REPLIES)
+    
+    data = build_gemini_request(user_message, generation_config)
+    
+    tried = []
+    for attempt in range(MAX_KEY_RETRIES):
+        if attempt and llm_breaker.is_open:
+            break
+        key = acquire_api_key(tried)
+        if key is None:
+            break
+        splitter = SentenceSplitter(on_sentence, sanitizer=reply_sanitizer.stream())
+        start = time.perf_counter()
+        try:
+            send_face_command({"cmd": "think"})
+            
+            response, key = send_gemini("streamGenerateContent", data, key, tried)
+            with response:
+                if response.status_code in [429, 403, 401]:
+                    report_key_error(key, response)
+                    continue
+                if response.status_code != 200:
+                    key_pool.failure(key, response.status_code)
+                    print(f"❌ API returned {response.status_code}")
+                    return False, random.choice(OFFLINE_REPLIES)
+                key_pool.success(key, time.perf_counter() - start)
+                
+                usage = None
+                for event in iter_sse_json(response.iter_lines()):
+                    usage = event.get("usageMetadata") or usage
+                    chunk = gemini_chunk_text(event)
+                    if chunk:
+                        turn_timer.stamp("first_token")
+                        splitter.feed(chunk)
+                splitter.flush()
+                if prompt_cache:
+                    prompt_cache.record_usage(usage)
+                
+        except (LLMClientError, ValueError) as e:
+            if not splitter.sentences:
+                key_pool.failure(key)
+                print(f"❌ Network error: {e}")
+                return False, random.choice(OFFLINE_REPLIES)
+            # Keep what was already spoken
+            print(f"⚠️ Stream cut off: {e}")
+        
+        reply = splitter.text()
+        if not reply:
+            return False, random.choice(OFFLINE_REPLIES)
+        return True, reply
+    
+    return False, random.choice(OFFLINE_REPLIES)
+
+# Chat models: Gemini online, an Ollama model on this machine (switchable at runtime)
+ollama_client = LLMClient(Timeouts(connect=2, first_byte=60, total=120), idle_rewarm=300)
+llm_router = LLMRouter([
+    GeminiBackend(call_gemini, stream_gemini, GEMINI_PROFILES, LLM_PROFILE),
+    OllamaBackend(ollama_client, OLLAMA_MODEL, OLLAMA_HOST, system=SYSTEM_INSTRUCTION,
+                  history=memory.context, sanitizer=reply_sanitizer, keep_alive=OLLAMA_KEEP_ALIVE,
+                  profiles=OLLAMA_PROFILES, profile=LLM_PROFILE),
+], mode=LLM_BACKEND)
+
+def switch_llm(target: str):
+    """Voice command to change the chat model ("switch to the local model")"""
+    name = "gemini" if target in ("online", "gemini") else "ollama"
+    previous = llm_router.mode
+    llm_router.use(name)
+    if name == "gemini":
+        print("🔀 Chat model: gemini")
+        speak("Okay, using my online brain now.")
+        return
+    loaded = llm_router.get("ollama").wait_ready(OLLAMA_SWITCH_WAIT)
+    if loaded is False:
+        if previous != "ollama":
+            llm_router.use(previous)
+        print(f"⚠️ Local model not reachable, chat model stays {llm_router.mode}")
+        speak("Sorry, I can't reach my local brain right now.")
+        return
+    print("🔀 Chat model: ollama")
+    speak("Okay, using my local brain now." if loaded else
+          "Okay, switching to my local brain. It needs a moment to load.")
+
+def ask_llm(user_input: str, on_sentence=None) -> tuple[bool, str]:
+    """Model tier: streamed or plain call"""
+    with turn_timer.phase("llm"):
+        success, reply = llm_router.chat(user_input, on_sentence if STREAMING_LLM else None)
+    if not success and not reply:
+        reply = random.choice(OFFLINE_REPLIES)
+    return success, reply
+
+def speculative_answer(text: str) -> dict:
+    """Speculation target: knowledge-base lookup, and the model call with SPECULATIVE_LLM"""
+    return answer_router.prepare(text, llm_router.chat if SPECULATIVE_LLM else None)
+
+# Name, creator, time and control commands never reach the LLM
+intents = IntentMatcher()
+knowledge_base = KnowledgeBase(KB_FILE, KB_META_FILE)
+answer_router = AnswerRouter(knowledge_base if KNOWLEDGE_BASE_ENABLED else None, ask_llm,
+                             confidence=KB_CONFIDENCE, fallback_confidence=KB_FALLBACK_CONFIDENCE,
+                             offline_confidence=KB_OFFLINE_CONFIDENCE, breaker=llm_breaker,
+                             local_llm=llm_router.works_offline)
+
+def chat_with_model(user_input: str, on_sentence=None) -> str:
+    """Main chat function with history management.
+
+    With on_sentence (and STREAMING_LLM) the reply is streamed and each
+    sentence is handed over as soon as it is complete.
+    """
+    context = memory.recent(4)
+    
+    cached = response_cache.get(user_input, context) if response_cache else None
+    if cached is not None:
+        speculator.discard()
+        print("⚡ Answered from the response cache")
+        memory.add_exchange(user_input, cached)
+        return cached
     
-    # Keep history manageable (max 20 messages)
-    if len(chat_history) > 20:
-        chat_history[:] = chat_history[-20:]
+    # Knowledge base first, Gemini only for weak matches; reuse the lookups
+    # started on a stable partial transcript if it matches
+    prepared = speculator.resolve(user_input)
+    tier, success, reply = answer_router.answer(user_input, on_sentence, prepared)
     
-    # Get response
-    success, reply = call_gemini(user_input)
+    if success and tier == "llm" and response_cache:
+        response_cache.put(user_input, reply, context)
     
-    # Add to history
-    chat_history.append({"role": "assistant", "content": reply})
+    # Add to history (older turns are summarized in the background)
+    memory.add_exchange(user_input, reply)
     
     return reply
 
+def respond(user_input: str):
+    """Get the reply and speak it, sentence by sentence when streaming"""
+    clips = []
+    budget = [SPEECH_CHAR_LIMIT]
+    
+    def on_sentence(sentence: str):
+        # Skip the rest once the user interrupted or the speech limit is used up
+        if BARGE_IN_ENABLED and barge_in.interrupted.is_set():
+            return
+        if budget[0] <= 0:
+            return
+        budget[0] -= len(sentence)
+        turn_timer.stamp("first_sentence")
+        clips.append(speak(sentence, wait=False))
+    
+    reply = chat_with_model(user_input, on_sentence=on_sentence)
+    clips = [c for c in clips if c is not None]
+    if not clips:
+        # Nothing was streamed (speculative answer, error reply)
+        speak(reply)
+        return
+    clips[-1].wait()
+    turn_timer.stamp("spoken")
+
+def handle_intent(user_input: str, intent):
+    """Act on a locally recognized intent (no LLM call)"""
+    speculator.discard()
+    if intent.name == "switch_model":
+        switch_llm(intent.slots["target"])
+        return
+    print(f"⚡ Answered locally ({intent.name})")
+    memory.add_exchange(user_input, intent.reply)
+    speak(intent.reply)
+
 # ============================================================================
 # SPEECH RECOGNITION
 # ============================================================================
@@ -340,43 +733,122 @@ recognizer.pause_threshold = 1.0
 recognizer.phrase_threshold = 0.3
 recognizer.non_speaking_duration = 0.8
 
-def listen_from_mic(timeout=8, phrase_time_limit=15) -> str:
-    """Listen from microphone and return text"""
-    with sr.Microphone() as source:
-        print("\n🎤 Listening...")
+stt_engine = STTRouter([GoogleSTT(recognizer, language="en-IN"), VoskSTT(VOSK_MODEL_PATH)],
+                       mode=STT_BACKEND, latency_budget=STT_LATENCY_BUDGET)
+
+# Opened once in robot_loop; calibration runs in the background while Saira is quiet
+mic_stream = MicStream(recognizer, sample_rate=MIC_SAMPLE_RATE,
+                       calibration_file=MIC_CALIBRATION_FILE,
+                       recalibrate_every=MIC_RECALIBRATE_EVERY,
+                       is_quiet=lambda: not is_speaking)
+barge_in = BargeInMonitor(audio_engine, mic=mic_stream, sample_rate=MIC_SAMPLE_RATE)
+speculator = SpeculativeAnswerer(answer_fn=speculative_answer)
+# The fixed pause_threshold becomes the upper bound of the adaptive silence window
+endpointer = AdaptiveEndpointer(max_silence=recognizer.pause_threshold)
+capture = ContinuousCapture(mic_stream, end_silence=recognizer.pause_threshold,
+                            min_utterance=recognizer.phrase_threshold,
+                            max_utterance=15, is_playing=audio_engine.is_busy,
+                            barge_in=barge_in if BARGE_IN_ENABLED else None,
+                            endpointer=endpointer if ADAPTIVE_ENDPOINTING else None)
+
+wake_gate = None  # WakeWordGate, created when Vosk and capture are available
+
+def _on_partial_transcript(text: str):
+    """Partial hypothesis from the streaming recognizer"""
+    speculator.on_partial(text)
+    endpointer.set_hypothesis(text)
+
+def recognize_audio(audio: sr.AudioData, backend=None) -> str:
+    """Recognize captured audio and return text"""
+    print("🔄 Processing...")
+    try:
+        with turn_timer.phase("stt"):
+            text = stt_engine.recognize(audio, backend)
+        print(f"✅ You said: {text}")
+        return text.lower()
         
-        # Show listening state on face
-        send_face_command({"cmd": "listen"})
+    except sr.UnknownValueError:
+        print("❌ Could not understand")
+        return None
         
-        # Adjust for ambient noise
-        recognizer.adjust_for_ambient_noise(source, duration=0.5)
+    except Exception as e:
+        print(f"❌ Recognition error: {e}")
+        return None
         
-        try:
-            audio = recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
-            print("🔄 Processing...")
-            
-            text = recognizer.recognize_google(audio, language="en-IN", show_all=False)
-            print(f"✅ You said: {text}")
-            
-            # Return to idle
-            send_face_command({"cmd": "idle"})
-            
-            return text.lower()
-            
-        except sr.WaitTimeoutError:
-            print("⏰ No speech detected")
-            send_face_command({"cmd": "idle"})
-            return None
-            
-        except sr.UnknownValueError:
-            print("❌ Could not understand")
-            send_face_command({"cmd": "idle"})
-            return None
-            
-        except Exception as e:
-            print(f"❌ Mic error: {e}")
+    finally:
+        # Return to idle
+        send_face_command({"cmd": "idle"})
+
+def listen_from_mic(timeout=8, phrase_time_limit=15) -> str:
+    """Listen from microphone and return text"""
+    print("\n🎤 Listening...")
+    
+    # Show listening state on face
+    send_face_command({"cmd": "listen"})
+    
+    if replay_source is not None:
+        # Recorded utterance instead of the microphone (raises ReplayFinished at the end)
+        audio = replay_source.next_audio()
+        turn_timer.begin(replay_source.label())
+        return recognize_audio(audio)
+    
+    if capture.running:
+        # Speech captured in the background since the last turn is used first
+        deadline = time.monotonic() + timeout
+        while True:
+            utterance = capture.get(timeout=max(0.0, deadline - time.monotonic()))
+            if utterance is None:
+                print("⏰ No speech detected")
+                send_face_command({"cmd": "idle"})
+                return None
+            if wake_gate is None or wake_gate.allow(utterance):
+                break
+            print("💤 No wake word, ignoring sound")
+        turn_timer.begin(f"turn {len(turn_timer.turns) + 1}")
+        if utterance.tail_saved:
+            print(f"⏱️ End of speech detected {utterance.tail_saved * 1000:.0f}ms sooner")
+        backend = stt_engine.choose()
+        if utterance.text and backend.name == "vosk":
+            # Streaming recognizer already produced the final transcript
+            print(f"✅ You said: {utterance.text}")
             send_face_command({"cmd": "idle"})
+            return utterance.text.lower()
+        # Online recognition chosen: the partials only served endpointing and speculation
+        return recognize_audio(utterance.audio, backend)
+    
+    # Stream is already open and calibrated, so capture starts immediately
+    try:
+        audio = mic_stream.listen(timeout=timeout, phrase_time_limit=phrase_time_limit)
+        
+    except sr.WaitTimeoutError:
+        print("⏰ No speech detected")
+        send_face_command({"cmd": "idle"})
+        return None
+        
+    except Exception as e:
+        print(f"❌ Mic error: {e}")
+        send_face_command({"cmd": "idle"})
+        return None
+    
+    turn_timer.begin(f"turn {len(turn_timer.turns) + 1}")
+    return recognize_audio(audio)
+
+def take_barge_in() -> str:
+    """Recognize the sentence that interrupted Saira, if any"""
+    if not BARGE_IN_ENABLED:
+        return None
+    if capture.running:
+        if not barge_in.interrupted.is_set():
             return None
+        barge_in.interrupted.clear()
+        utterance = capture.get(timeout=capture.max_utterance)
+        audio = utterance.audio if utterance else None
+    else:
+        audio = barge_in.consume()
+    if audio is None:
+        return None
+    send_face_command({"cmd": "listen"})
+    return recognize_audio(audio)
 
 # ============================================================================
 # TOGGLE CONTROL
@@ -416,7 +888,7 @@ def toggle_listen_key():
 
 def robot_loop():
     """Main robot interaction loop"""
-    global listening_enabled, is_speaking
+    global listening_enabled, is_speaking, wake_gate
     
     print("\n" + "="*70)
     print("🤖 SAIRA COMPLETE SYSTEM V1.0")
@@ -424,7 +896,7 @@ def robot_loop():
     print("✅ Face display integration active")
     print("✅ Voice recognition ready")
     print("✅ AI brain connected")
-    print(f"✅ {len(API_KEYS)} API key(s) loaded")
+    print(f"✅ {len(key_pool)} API key(s) loaded")
     print("\n💡 Say 'exit', 'bye', 'quit', or 'stop' to exit")
     print("="*70 + "\n")
     
@@ -434,55 +906,213 @@ def robot_loop():
     else:
         print("⚠️ Face display not responding (run saira_face_v9.py first)\n")
     
-    # Start toggle thread
-    Thread(target=toggle_listen_key, daemon=True).start()
+    # Start toggle thread (not in replay mode: there is nobody at the keyboard)
+    if replay_source is None:
+        Thread(target=toggle_listen_key, daemon=True).start()
+    
+    # Mixer and TTS event loop are started once and kept for the whole session
+    audio_engine.start()
+    tts_engine.start()
+    llm_client.start(warm_url=f"{GEMINI_API_BASE}/models")
+    if prompt_cache:
+        prompt_cache.start()
+        if key_pool:
+            # Upload for the first key now; the others on first use
+            prompt_cache.name_for(key_pool.keys[0].key)
+    print(f"✅ LLM connection: {llm_client.transport}")
+    llm_router.start()
+    print(f"✅ Chat model: {llm_router.mode} ({', '.join(b.name for b in llm_router.backends)} available)")
+    stt_engine.start()
+    print(f"✅ Speech recognition: {', '.join(b.name for b in stt_engine.backends)}")
+    if KNOWLEDGE_BASE_ENABLED:
+        print(f"✅ Knowledge base: {knowledge_base.load()} Q&A blocks")
+    
+    if replay_source is not None:
+        print(f"✅ Replaying {len(replay_source.turns)} recorded utterance(s)")
+    else:
+        try:
+            mic_stream.open(background_calibration=not CONTINUOUS_CAPTURE)
+            print("✅ Microphone stream open")
+            if CONTINUOUS_CAPTURE:
+                vosk_backend = stt_engine.get("vosk")
+                vosk_ready = vosk_backend and MIC_SAMPLE_RATE == vosk_backend.sample_rate
+                transcriber = None
+                if STREAMING_STT and vosk_ready:
+                    transcriber = StreamingTranscriber(vosk_backend, on_partial=_on_partial_transcript)
+                    print("✅ Streaming recognition with partial transcripts")
+                if WAKE_WORD_ENABLED and vosk_ready:
+                    # The gate decides which segments reach the streaming recognizer
+                    wake_gate = WakeWordGate(vosk_backend, WAKE_WORDS, follow_up=WAKE_FOLLOW_UP,
+                                             transcriber=transcriber)
+                    capture.add_listener(wake_gate)
+                    print(f"✅ Wake word gating: {', '.join(WAKE_WORDS)}")
+                else:
+                    if WAKE_WORD_ENABLED:
+                        print("⚠️ Wake word needs the Vosk model, recognizing every utterance")
+                    if transcriber is not None:
+                        capture.add_listener(transcriber)
+                capture.start()
+                print("✅ Continuous capture running")
+        except Exception as e:
+            print(f"⚠️ Microphone not available: {e}")
+    
+    if BARGE_IN_ENABLED:
+        if not capture.running:
+            barge_in.start()
+        print("✅ Barge-in enabled: speak any time to interrupt")
+    
+    # Fallback lines and goodbye are decoded ahead of time
+    prefetch_speech(OFFLINE_REPLIES + intents.fixed_replies())
     
     # Initial greeting
     speak("Hi! I'm Saira. How can I help you today?")
     
+    # Text from a barge-in is handled on the next pass without reopening the mic
+    pending_input = take_barge_in()
+    
     try:
         while True:
-            # Don't listen while speaking or if disabled
-            if is_speaking or not listening_enabled:
-                time.sleep(0.15)
-                continue
-            
-            # Listen for input
-            user_input = listen_from_mic()
+            if pending_input:
+                user_input, pending_input = pending_input, None
+            else:
+                # Don't listen while speaking or if disabled
+                if is_speaking or not listening_enabled:
+                    time.sleep(0.15)
+                    continue
+                
+                # Listen for input
+                user_input = listen_from_mic()
             
             if not user_input:
                 time.sleep(0.2)
                 continue
             
-            # Check for exit commands
-            if any(word in user_input for word in ["exit", "bye", "quit", "stop"]):
-                speak("Goodbye! Take care!")
+            # Exit, model switches and fixed questions are answered locally
+            intent = intents.match(user_input)
+            if intent is not None and intent.name == "exit":
+                speak(intent.reply)
+                turn_timer.end()
                 break
+            if intent is not None:
+                handle_intent(user_input, intent)
+                turn_timer.end()
+                continue
             
             # Get AI response
             print("🤔 Thinking...")
-            ai_reply = chat_with_model(user_input)
+            respond(user_input)
+            turn_timer.end()
             
-            # Speak response
-            speak(ai_reply)
-            
-            # Small pause
-            time.sleep(0.3)
+            pending_input = take_barge_in()
+            if not pending_input:
+                # Small pause
+                time.sleep(0.3)
     
     except KeyboardInterrupt:
         print("\n\n⛔ Stopped by user")
     
+    except ReplayFinished:
+        print("\n✅ Replay finished")
+    
     finally:
-        try:
-            pygame.mixer.quit()
-        except:
-            pass
+        barge_in.stop()
+        capture.stop()
+        mic_stream.close()
+        if barge_in.stop_latencies:
+            print(f"📊 Barge-in: {barge_in.stats()}")
+        audio_engine.shutdown()
+        tts_engine.stop()
+        llm_client.stop()
+        llm_router.stop()
+        llm_breaker.stop()
+        print(f"📊 TTS: {tts_engine.stats()}")
+        print(f"📊 Speech cache: {speech_cache.stats()}")
+        print(f"📊 STT: {stt_engine.stats()}")
+        print(f"📊 Answers: {answer_router.stats()}")
+        print(f"📊 API keys: {key_pool.stats()}")
+        print(f"📊 LLM connection: {llm_client.stats()}")
+        if llm_breaker.trips:
+            print(f"📊 Circuit breaker: {llm_breaker.stats()}")
+        print(f"📊 Chat models: {llm_router.stats()}")
+        print(f"📊 Memory: {memory.stats()}")
+        if prompt_cache:
+            prompt_cache.stop()
+            print(f"📊 Prompt cache: {prompt_cache.stats()}")
+        if HEDGE_REQUESTS:
+            print(f"📊 Hedging (generate): {post_hedger.stats()}")
+            print(f"📊 Hedging (stream): {stream_hedger.stats()}")
+        if response_cache:
+            response_cache.save()
+            print(f"📊 Response cache: {response_cache.stats()}")
+        if KNOWLEDGE_BASE_ENABLED:
+            knowledge_base.save()
+        if wake_gate is not None:
+            print(f"📊 Wake word: {wake_gate.stats()}")
+        if endpointer.saved:
+            print(f"📊 Endpointing: {endpointer.stats()}")
+        if speculator.started:
+            print(f"📊 Speculation: {speculator.stats()}")
+        print(f"📊 Intents: {intents.stats()}")
         send_face_command({"cmd": "idle"})
+        if replay_source is not None:
+            turn_timer.report(replay_report)
         print("\n👋 Saira signing off!")
 
+# ============================================================================
+# REPLAY MODE
+# ============================================================================
+
+def setup_replay(path: str, real_services: bool = False, llm_delay: float = 0.3):
+    """Swap microphone, speakers and network services for a replay run"""
+    global replay_source, stt_engine, tts_engine, response_cache, knowledge_base, GEMINI_API_BASE
+    global FACE_ENABLED, CONTINUOUS_CAPTURE, BARGE_IN_ENABLED
+    
+    use_null_audio()
+    replay_source = ReplaySource(load_turns(path))
+    FACE_ENABLED = False
+    CONTINUOUS_CAPTURE = False
+    BARGE_IN_ENABLED = False
+    if response_cache:
+        # Start empty and leave the saved answers alone
+        response_cache = ResponseCache(None, ttl=RESPONSE_CACHE_TTL, max_entries=RESPONSE_CACHE_SIZE,
+                                       use_context=RESPONSE_CACHE_CONTEXT)
+    # Same answers, but the rotation in qa_meta.json is left alone
+    knowledge_base = KnowledgeBase(KB_FILE, None)
+    if answer_router.kb is not None:
+        answer_router.kb = knowledge_base
+    
+    if not real_services:
+        # Known transcripts first, on-device Vosk for recordings without one
+        stt_engine = STTRouter([TranscriptSTT(replay_source), VoskSTT(VOSK_MODEL_PATH)])
+        tts_engine = TTSRouter([EspeakTTS(), SilentTTS()])
+        stub = GeminiStub(delay=llm_delay)
+        GEMINI_API_BASE = stub.start()
+        # The stand-in speaks Ollama's chat API too (for --llm ollama)
+        llm_router.get("ollama").host = stub.ollama_host
+        print(f"✅ Local Gemini stand-in at {GEMINI_API_BASE}")
+
 # ============================================================================
 # ENTRY POINT
 # ============================================================================
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Saira voice robot")
+    parser.add_argument("--replay", metavar="PATH",
+                        help="WAV directory or JSON manifest to use instead of the microphone")
+    parser.add_argument("--report", metavar="FILE", help="save the replay timing report as JSON")
+    parser.add_argument("--real-services", action="store_true",
+                        help="keep the real Gemini / TTS / STT services during replay")
+    parser.add_argument("--llm-delay", type=float, default=0.3,
+                        help="response delay of the local Gemini stand-in (seconds)")
+    parser.add_argument("--llm", choices=["gemini", "ollama", "auto"],
+                        help="chat model to start with (default: LLM_BACKEND)")
+    args = parser.parse_args()
+    
+    if args.llm:
+        llm_router.mode = args.llm
+    
+    if args.replay:
+        setup_replay(args.replay, args.real_services, args.llm_delay)
+        replay_report = args.report
+    
     robot_loop()
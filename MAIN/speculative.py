@@ -0,0 +1,106 @@
+import concurrent.futures
+import re
+import threading
+import time
+from typing import Any, Callable, Optional
+
+# ============================================================================
+# SPECULATIVE ANSWER LOOKUP
+# ============================================================================
+
+def normalize_utterance(text: str) -> str:
+    """Lowercase words only, for comparing transcripts"""
+    return re.sub(r"\W+", " ", text.lower()).strip()
+
+class SpeculativeAnswerer:
+    """Starts the answer lookup on a stable partial transcript.
+
+    A partial counts as stable once it has `min_words` words and has not
+    changed for `stable_time` seconds. When the final transcript arrives,
+    resolve() returns the speculative result if the texts match, or None
+    (and the speculation is discarded) so the caller does a normal lookup.
+    """
+
+    def __init__(self, answer_fn: Optional[Callable[[str], Any]] = None,
+                 stable_time: float = 0.3, min_words: int = 2):
+        self.answer_fn = answer_fn
+        self.stable_time = stable_time
+        self.min_words = min_words
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=2,
+                                                               thread_name_prefix="saira-spec")
+        self._lock = threading.Lock()
+        self._last_partial = ""
+        self._partial_since = 0.0
+        self._text = ""
+        self._future: Optional[concurrent.futures.Future] = None
+        self._started = 0.0
+
+        self.started = 0
+        self.confirmed = 0
+        self.discarded = 0
+        self.saved = 0.0  # seconds of lookup already done when the final arrived
+
+    def on_partial(self, text: str):
+        """Called for every hypothesis update (capture thread)"""
+        if self.answer_fn is None:
+            return
+        now = time.monotonic()
+        norm = normalize_utterance(text)
+        with self._lock:
+            if norm != self._last_partial:
+                self._last_partial = norm
+                self._partial_since = now
+                return
+            if (norm == self._text or len(norm.split()) < self.min_words
+                    or now - self._partial_since < self.stable_time):
+                return
+            if self._future is not None:
+                self._future.cancel()
+                self.discarded += 1
+            self._text = norm
+            self._started = now
+            self._future = self._executor.submit(self.answer_fn, text)
+            self.started += 1
+
+    def resolve(self, final_text: str, timeout: Optional[float] = None) -> Optional[Any]:
+        """Speculative result for the final transcript, or None"""
+        with self._lock:
+            future, text, started = self._future, self._text, self._started
+            self._future = None
+            self._text = ""
+            self._last_partial = ""
+        if future is None:
+            return None
+        if normalize_utterance(final_text) != text:
+            future.cancel()
+            self.discarded += 1
+            return None
+        now = time.monotonic()
+        try:
+            result = future.result(timeout)
+        except Exception as e:
+            print(f"⚠️ Speculative lookup failed: {e}")
+            self.discarded += 1
+            return None
+        self.confirmed += 1
+        self.saved += now - started
+        return result
+
+    def discard(self):
+        """Drop a pending speculation (the turn was answered another way)"""
+        with self._lock:
+            future, self._future = self._future, None
+            self._text = ""
+            self._last_partial = ""
+        if future is not None:
+            future.cancel()
+            self.discarded += 1
+
+    def stats(self) -> dict:
+        """Speculation counters"""
+        return {
+            "started": self.started,
+            "confirmed": self.confirmed,
+            "discarded": self.discarded,
+            "saved_s": round(self.saved, 2),
+        }
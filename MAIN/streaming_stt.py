@@ -0,0 +1,69 @@
+import json
+import time
+from typing import Callable, List, Optional
+
+from stt import VoskSTT
+
+# ============================================================================
+# STREAMING RECOGNITION
+# ============================================================================
+
+class StreamingTranscriber:
+    """Runs the on-device recognizer frame by frame while the user is talking.
+
+    Attached to ContinuousCapture as a listener, or driven by a
+    WakeWordGate that only hands it the segments it keeps: partial
+    hypotheses are passed to `on_partial` as they grow, and when the
+    segment closes the final transcript is stored on the utterance. When
+    Vosk is the recognizer the router picks, that transcript is used
+    as is, so no second pass is needed after the user stops.
+    """
+
+    def __init__(self, backend: VoskSTT, on_partial: Optional[Callable[[str], None]] = None):
+        self.backend = backend
+        self.on_partial = on_partial
+        self._rec = None
+        self._done: List[str] = []
+        self._partial = ""
+        self.partials = 0
+
+    def speech_start(self, frames: List[bytes]):
+        """New segment: fresh recognizer, fed with the pre-roll"""
+        self._rec = self.backend.recognizer()
+        self._done = []
+        self._partial = ""
+        for frame in frames:
+            self.speech_frame(frame)
+
+    def speech_frame(self, frame: bytes):
+        """Feed one frame and report the current hypothesis"""
+        if self._rec is None:
+            return
+        if self._rec.AcceptWaveform(frame):
+            text = json.loads(self._rec.Result()).get("text", "")
+            if text:
+                self._done.append(text)
+            self._partial = ""
+        else:
+            self._partial = json.loads(self._rec.PartialResult()).get("partial", "")
+        if self.on_partial:
+            hypothesis = self.hypothesis()
+            if hypothesis:
+                self.partials += 1
+                self.on_partial(hypothesis)
+
+    def hypothesis(self) -> str:
+        """Everything recognised so far"""
+        return " ".join(self._done + ([self._partial] if self._partial else []))
+
+    def speech_end(self, utterance):
+        """Segment closed: attach the final transcript (utterance may be None)"""
+        if self._rec is None:
+            return
+        text = json.loads(self._rec.FinalResult()).get("text", "")
+        if text:
+            self._done.append(text)
+        if utterance is not None:
+            utterance.text = " ".join(self._done)
+            utterance.transcribed_at = time.monotonic()
+        self._rec = None
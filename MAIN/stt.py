@@ -0,0 +1,211 @@
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import speech_recognition as sr
+
+from network import NetworkProbe
+
+try:
+    import vosk
+    vosk.SetLogLevel(-1)
+    VOSK_AVAILABLE = True
+except Exception:
+    VOSK_AVAILABLE = False
+
+# ============================================================================
+# BACKEND INTERFACE
+# ============================================================================
+
+class STTBackend:
+    """Speech recognizer.
+
+    recognize() returns the transcript, raises sr.UnknownValueError when
+    the audio held no words, and any other exception on failure.
+    """
+
+    name = "base"
+    needs_network = False
+
+    def available(self) -> bool:
+        """Whether the backend can be used on this machine"""
+        return True
+
+    def start(self):
+        """Load models ahead of the first turn"""
+
+    def recognize(self, audio: sr.AudioData) -> str:
+        raise NotImplementedError
+
+# ============================================================================
+# GOOGLE WEB SPEECH (ONLINE)
+# ============================================================================
+
+class GoogleSTT(STTBackend):
+    """speech_recognition's Google Web Speech API"""
+
+    name = "google"
+    needs_network = True
+
+    def __init__(self, recognizer: sr.Recognizer, language: str = "en-IN"):
+        self.recognizer = recognizer
+        self.language = language
+
+    def recognize(self, audio: sr.AudioData) -> str:
+        return self.recognizer.recognize_google(audio, language=self.language, show_all=False)
+
+# ============================================================================
+# VOSK (ON-DEVICE)
+# ============================================================================
+
+class VoskSTT(STTBackend):
+    """Offline Kaldi recognition with a local Vosk model"""
+
+    name = "vosk"
+    sample_rate = 16000
+
+    def __init__(self, model_path: str):
+        self.model_path = model_path
+        self.model = None
+
+    def available(self) -> bool:
+        return VOSK_AVAILABLE and os.path.isdir(self.model_path)
+
+    def start(self):
+        """Load the model once (takes a few seconds on small boards)"""
+        if self.model is None:
+            self.model = vosk.Model(self.model_path)
+
+    def recognizer(self, grammar: Optional[List[str]] = None):
+        """Fresh Kaldi recognizer, optionally limited to a word list"""
+        self.start()
+        if grammar:
+            return vosk.KaldiRecognizer(self.model, self.sample_rate, json.dumps(grammar))
+        return vosk.KaldiRecognizer(self.model, self.sample_rate)
+
+    def recognize(self, audio: sr.AudioData) -> str:
+        rec = self.recognizer()
+        rec.AcceptWaveform(audio.get_raw_data(convert_rate=self.sample_rate, convert_width=2))
+        text = json.loads(rec.FinalResult()).get("text", "")
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+# ============================================================================
+# BACKEND SELECTION
+# ============================================================================
+
+@dataclass
+class RecognizerStats:
+    """Per-backend counters"""
+    calls: int = 0
+    errors: int = 0
+    no_speech: int = 0
+    latency: float = 0.0  # moving average in seconds
+    total_latency: float = 0.0
+
+    def error_rate(self) -> float:
+        return self.errors / self.calls if self.calls else 0.0
+
+class STTRouter(STTBackend):
+    """Picks a recognizer per utterance from config, network health and latency.
+
+    mode "auto" uses the first (online) backend while the network is up
+    and its recent latency fits the budget, else the on-device engine. A
+    network failure retries the same audio on the on-device engine.
+    """
+
+    name = "router"
+
+    def __init__(self, backends: List[STTBackend], mode: str = "auto",
+                 latency_budget: float = 2.0, probe: Optional[NetworkProbe] = None,
+                 retry_every: int = 10, alpha: float = 0.3):
+        self.backends = [b for b in backends if b.available()]
+        if not self.backends:
+            raise RuntimeError("No speech recognition backend available")
+        self.mode = mode
+        self.latency_budget = latency_budget
+        self.probe = probe or NetworkProbe(host="www.google.com")
+        self.retry_every = retry_every
+        self.alpha = alpha
+        self.stats_by_backend: Dict[str, RecognizerStats] = {
+            b.name: RecognizerStats() for b in self.backends
+        }
+        self._skipped = 0
+
+    def start(self):
+        for backend in self.backends:
+            backend.start()
+        if any(b.needs_network for b in self.backends):
+            self.probe.check()
+
+    def get(self, name: str) -> Optional[STTBackend]:
+        """Backend by name"""
+        return next((b for b in self.backends if b.name == name), None)
+
+    def choose(self) -> STTBackend:
+        """Backend for the next utterance"""
+        if self.mode != "auto":
+            return self.get(self.mode) or self.backends[0]
+
+        local = [b for b in self.backends if not b.needs_network]
+        for backend in self.backends:
+            if not backend.needs_network or not local:
+                return backend
+            if not self.probe.is_online():
+                continue
+            if self.stats_by_backend[backend.name].latency <= self.latency_budget:
+                return backend
+            self._skipped += 1
+            if self._skipped >= self.retry_every:
+                self._skipped = 0
+                return backend
+        return local[0]
+
+    def _run(self, backend: STTBackend, audio: sr.AudioData) -> str:
+        """Recognize with one backend and update its counters"""
+        stats = self.stats_by_backend[backend.name]
+        stats.calls += 1
+        start = time.perf_counter()
+        try:
+            return backend.recognize(audio)
+        except sr.UnknownValueError:
+            stats.no_speech += 1
+            raise
+        except Exception:
+            stats.errors += 1
+            if backend.needs_network:
+                self.probe.mark_offline()
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            stats.total_latency += elapsed
+            stats.latency = elapsed if stats.calls == 1 else stats.latency + (elapsed - stats.latency) * self.alpha
+
+    def recognize(self, audio: sr.AudioData, backend: Optional[STTBackend] = None) -> str:
+        """Recognize with `backend` if the caller already chose one, else choose()"""
+        backend = backend or self.choose()
+        try:
+            return self._run(backend, audio)
+        except sr.UnknownValueError:
+            raise
+        except Exception as e:
+            fallback = next((b for b in self.backends if not b.needs_network and b is not backend), None)
+            if fallback is None or self.mode != "auto":
+                raise
+            print(f"⚠️ {backend.name} recognition failed ({e}), using {fallback.name}")
+            return self._run(fallback, audio)
+
+    def stats(self) -> dict:
+        """Per-backend latency (ms) and error rate"""
+        return {
+            name: {
+                "calls": st.calls,
+                "no_speech": st.no_speech,
+                "error_rate": round(st.error_rate(), 2),
+                "latency_ms": round(st.latency * 1000) if st.calls else None,
+            }
+            for name, st in self.stats_by_backend.items()
+        }
@@ -0,0 +1,59 @@
+import pytest
+
+from answer_router import AnswerRouter
+from knowledge_base import KnowledgeBase
+
+QA = """---BLOCK---
+id: 1
+q: What is Physics?
+a1: Physics is the science of matter and energy.
+---BLOCK---
+id: 2
+q: What is the capital of Rajasthan?
+a1: Jaipur is the capital of Rajasthan.
+a2: Rajasthan's capital is Jaipur.
+"""
+
+class Breaker:
+    is_open = True
+
+@pytest.fixture
+def kb(tmp_path):
+    path = tmp_path / "qa_blocks.txt"
+    path.write_text(QA, encoding="utf-8")
+    kb = KnowledgeBase(str(path))
+    kb.load()
+    return kb
+
+def failing_llm(text, on_sentence):
+    return False, ""
+
+def test_strong_match_skips_llm(kb):
+    router = AnswerRouter(kb, lambda t, s: pytest.fail("LLM called"))
+    assert router.answer("what is physics") == ("kb", True, "Physics is the science of matter and energy.")
+
+def test_rotation_stays_in_memory(kb):
+    router = AnswerRouter(kb, failing_llm)
+    replies = [router.answer("what is the capital of rajasthan")[2] for _ in range(3)]
+    assert replies[0] != replies[1] and replies[0] == replies[2]
+    assert kb.dirty
+
+def test_unrelated_weak_match_is_not_used(kb):
+    # ~76% similar by characters, but a different topic
+    router = AnswerRouter(kb, failing_llm, breaker=Breaker())
+    tier, success, _ = router.answer("what is photosynthesis")
+    assert (tier, success) == ("llm", False)
+
+def test_offline_answer_only_without_local_model(kb):
+    question = "tell me the capital of rajasthan"  # ~84%
+    offline = AnswerRouter(kb, lambda t, s: pytest.fail("LLM called"), breaker=Breaker())
+    assert offline.answer(question)[0] == "offline"
+    local = AnswerRouter(kb, lambda t, s: (True, "local reply"), breaker=Breaker(),
+                         local_llm=lambda: True)
+    assert local.answer(question) == ("llm", True, "local reply")
+
+def test_prepared_lookup_is_reused(kb):
+    router = AnswerRouter(kb, failing_llm)
+    prepared = router.prepare("what is physics")
+    kb.blocks = []  # a second match would now find nothing
+    assert router.answer("what is physics", prepared=prepared)[0] == "kb"
@@ -0,0 +1,40 @@
+import math
+from array import array
+
+import pytest
+
+pytest.importorskip("speech_recognition")
+pytest.importorskip("pygame")
+
+from barge_in import BargeInMonitor
+
+def tone(rms: float, samples: int = 480) -> bytes:
+    """30 ms of 16 kHz sine at the given RMS"""
+    amp = rms * math.sqrt(2)
+    return array("h", [int(amp * math.sin(2 * math.pi * 440 * i / 16000))
+                       for i in range(samples)]).tobytes()
+
+class SilentEngine:
+    def stop(self):
+        pass
+
+    def is_busy(self):
+        return True
+
+def triggered(monitor, frames):
+    return [i for i, frame in enumerate(frames) if monitor.playback_frame(frame, 0.03)]
+
+@pytest.mark.parametrize("echo", [200, 500, 1500])
+def test_echo_does_not_interrupt(echo):
+    monitor = BargeInMonitor(SilentEngine())
+    monitor.playback_started()
+    assert triggered(monitor, [tone(echo)] * 60) == []
+    assert not monitor.interrupted.is_set()
+
+def test_speech_over_echo_interrupts():
+    monitor = BargeInMonitor(SilentEngine())
+    monitor.playback_started()
+    frames = [tone(1500)] * 20 + [tone(8000)] * 10
+    hits = triggered(monitor, frames)
+    assert hits and hits[0] >= 20
+    assert monitor.interrupted.is_set()
@@ -0,0 +1,44 @@
+import math
+import types
+from array import array
+
+import pytest
+
+pytest.importorskip("speech_recognition")
+
+from capture import ContinuousCapture
+
+def tone(rms: float, samples: int = 480) -> bytes:
+    """30 ms of 16 kHz sine at the given RMS"""
+    amp = rms * math.sqrt(2)
+    return array("h", [int(amp * math.sin(2 * math.pi * 440 * i / 16000))
+                       for i in range(samples)]).tobytes()
+
+@pytest.fixture
+def capture():
+    recognizer = types.SimpleNamespace(energy_threshold=300, dynamic_energy_ratio=1.5)
+    mic = types.SimpleNamespace(sample_rate=16000, recognizer=recognizer, recalibrate_every=1e9,
+                                update_ambient=lambda floor: None)
+    capture = ContinuousCapture(mic)
+    capture.vad.reset(floor=200)
+    capture.now = 0.0
+    return capture
+
+def feed(capture, frame, seconds):
+    for _ in range(int(seconds / capture.frame_seconds)):
+        capture.ring.append(frame)
+        capture._process(frame, capture.now)
+        capture.now += capture.frame_seconds
+
+def test_constant_noise_raises_the_floor(capture):
+    feed(capture, tone(900), 60)
+    assert capture.utterances.qsize() == capture.max_capped
+    assert capture.recalibrated == 1
+    assert capture.vad.floor == pytest.approx(900, rel=0.05)
+
+def test_speech_over_noise_still_opens_a_segment(capture):
+    feed(capture, tone(900), 60)
+    queued = capture.utterances.qsize()
+    feed(capture, tone(6000), 2)
+    feed(capture, tone(900), 1.5)
+    assert capture.utterances.qsize() == queued + 1
@@ -0,0 +1,52 @@
+import threading
+import time
+
+from circuit_breaker import CircuitBreaker
+
+def test_trips_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, probe_every=60)
+    breaker.failure()
+    breaker.failure()
+    breaker.success(0.1)  # a success resets the streak
+    breaker.failure()
+    breaker.failure()
+    assert not breaker.is_open
+    breaker.failure()
+    assert breaker.is_open and breaker.trips == 1
+    assert not breaker.allow()
+    assert breaker.rejected == 1
+
+def test_slow_calls_count_as_failures():
+    breaker = CircuitBreaker(failure_threshold=2, slow_call=1.0, probe_every=60)
+    breaker.success(1.5)
+    breaker.success(2.0)
+    assert breaker.is_open
+
+def test_half_open_trial_without_probe():
+    breaker = CircuitBreaker(failure_threshold=1, probe_every=0.05)
+    breaker.failure()
+    assert not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.allow()  # one trial call
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+    breaker.failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.success(0.1)
+    assert not breaker.is_open
+
+def test_background_probe_closes_breaker():
+    back = threading.Event()
+    breaker = CircuitBreaker(probe=back.is_set, failure_threshold=1, probe_every=0.02)
+    breaker.failure()
+    time.sleep(0.1)
+    assert breaker.is_open and breaker.probes >= 2
+    assert not breaker.allow()  # with a probe, no trial calls
+    back.set()
+    deadline = time.monotonic() + 2
+    while breaker.is_open and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not breaker.is_open
+    breaker.stop()
@@ -0,0 +1,53 @@
+import concurrent.futures
+import threading
+import time
+
+import pytest
+
+from hedging import Hedger, percentile
+
+@pytest.fixture
+def executor():
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+        yield executor
+
+def request(executor, seconds, value):
+    return lambda: executor.submit(lambda: (time.sleep(seconds), value)[1])
+
+def test_percentile_nearest_rank():
+    samples = list(range(1, 101))
+    assert percentile(samples, 99) == 99
+    assert percentile(samples, 95) == 95
+    assert percentile(samples, 100) == 100
+    assert percentile([1, 2, 3, 4], 50) == 2
+    assert percentile([7], 99) == 7
+
+def test_fast_primary_is_not_hedged(executor):
+    hedger = Hedger(default_delay=0.5)
+    backup = lambda: pytest.fail("backup sent")
+    assert hedger.run(request(executor, 0.01, "primary"), backup) == ("primary", False)
+    assert hedger.hedged == 0
+
+def test_backup_wins_and_loser_is_measured(executor):
+    hedger = Hedger(default_delay=0.05)
+    losers = []
+    settled = threading.Event()
+
+    def on_loser(was_backup, latency, result):
+        losers.append((was_backup, latency, result))
+        settled.set()
+
+    result = hedger.run(request(executor, 0.4, "slow"), request(executor, 0.02, "fast"),
+                        on_loser=on_loser)
+    assert result == ("fast", True)
+    assert settled.wait(2)
+    was_backup, latency, loser = losers[0]
+    assert not was_backup and loser == "slow" and latency >= 0.35
+    # Saving is measured from the primary's real completion time
+    assert hedger.stats()["p99_saved_ms"] >= 250
+
+def test_unusable_result_falls_back_to_other_request(executor):
+    hedger = Hedger(default_delay=0.05)
+    result = hedger.run(request(executor, 0.1, 429), request(executor, 0.2, 200),
+                        ok=lambda status: status == 200)
+    assert result == (200, True)
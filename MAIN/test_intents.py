@@ -0,0 +1,59 @@
+import time
+
+import pytest
+
+from intents import IntentMatcher
+
+# Questions that only contain an intent phrase go to the LLM
+NOT_INTENTS = [
+    "where is the bus stop",
+    "how do i stop",
+    "why did you stop",
+    "can you stop",
+    "don't stop",
+    "what is the time complexity of quick sort",
+    "what is the date of diwali this year",
+    "who made you laugh today",
+    "who are you talking to",
+    "tell me about jaipur",
+    "okay",
+    "",
+]
+
+INTENTS = [
+    ("stop", "exit"),
+    ("Okay Saira, stop please.", "exit"),
+    ("okay bye", "exit"),
+    ("Goodbye!", "exit"),
+    ("whats your name", "name"),
+    ("What's your name?", "name"),
+    ("who are you", "name"),
+    ("who made you", "creator"),
+    ("Saira, who created you?", "creator"),
+    ("what time is it now", "time"),
+    ("what's the time", "time"),
+    ("kitne baje hain", "time"),
+    ("what is the date today", "date"),
+    ("what day is it", "date"),
+    ("switch to the local model", "switch_model"),
+]
+
+@pytest.fixture
+def matcher():
+    return IntentMatcher(clock=lambda: time.struct_time((2025, 3, 7, 14, 5, 0, 4, 66, 0)))
+
+@pytest.mark.parametrize("text", NOT_INTENTS)
+def test_not_an_intent(matcher, text):
+    assert matcher.match(text) is None
+
+@pytest.mark.parametrize("text,name", INTENTS)
+def test_intent(matcher, text, name):
+    intent = matcher.match(text)
+    assert intent is not None and intent.name == name
+
+def test_switch_target(matcher):
+    assert matcher.match("use gemini").slots == {"target": "gemini"}
+
+def test_replies(matcher):
+    assert matcher.match("what time is it").reply in ("It's 2:05 PM.", "Right now it's 2:05 PM.")
+    assert matcher.match("what is the date").reply == "Today is Friday, 7 March."
@@ -0,0 +1,65 @@
+import pytest
+
+import key_pool
+from key_pool import KeyPool, parse_retry_delay
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(key_pool.time, "monotonic", clock)
+    return clock
+
+def test_rpm_budget_spreads_and_exhausts(clock):
+    pool = KeyPool(["a", "b"], rpm=2)
+    used = [pool.acquire().key for _ in range(4)]
+    assert sorted(used) == ["a", "a", "b", "b"]
+    assert pool.acquire() is None
+    assert pool.exhausted == 1
+    assert pool.next_ready_in() == pytest.approx(60.0)
+    clock.now += 61
+    assert pool.acquire() is not None
+
+def test_rate_limit_cooldown_uses_retry_after(clock):
+    pool = KeyPool(["a", "b"], rpm=0)
+    a = pool.keys[0]
+    pool.failure(a, 429, retry_after=5)
+    assert all(pool.acquire() is not a for _ in range(3))
+    clock.now += 6
+    assert a in [pool.acquire(exclude=[pool.keys[1]])]
+
+def test_auth_error_benches_key(clock):
+    pool = KeyPool(["a", "b"], rpm=0, auth_cooldown=3600)
+    pool.failure(pool.keys[0], 403)
+    clock.now += 600
+    assert pool.acquire(exclude=[pool.keys[1]]) is None
+
+def test_repeated_errors_cool_down(clock):
+    pool = KeyPool(["a"], rpm=0, error_cooldown=10)
+    a = pool.keys[0]
+    pool.failure(a)
+    assert pool.acquire() is a  # one network error is not enough
+    pool.failure(a)
+    assert pool.acquire() is None
+    clock.now += 21
+    assert pool.acquire() is a
+
+def test_fastest_key_wins(clock):
+    pool = KeyPool(["a", "b"], rpm=0)
+    a, b = pool.keys
+    pool.success(a, 0.9)
+    pool.success(b, 0.5)
+    assert pool.acquire() is b
+    pool.failure(b)  # a recent error doubles its weight
+    assert pool.acquire() is a
+
+def test_parse_retry_delay():
+    assert parse_retry_delay({"Retry-After": "7"}) == 7.0
+    assert parse_retry_delay({}, '{"retryDelay": "12s"}') == 12.0
+    assert parse_retry_delay({}, "") is None
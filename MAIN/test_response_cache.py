@@ -0,0 +1,58 @@
+import pytest
+
+import response_cache
+from response_cache import ResponseCache
+
+class Clock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(response_cache.time, "time", clock)
+    return clock
+
+def test_filler_words_share_an_entry(clock):
+    cache = ResponseCache(ttl=60)
+    cache.put("What is AI?", "Artificial intelligence.")
+    assert cache.get("hey saira, what is ai please") == "Artificial intelligence."
+
+def test_entries_expire_after_ttl(clock):
+    cache = ResponseCache(ttl=60)
+    cache.put("what is ai", "Artificial intelligence.")
+    clock.now += 61
+    assert cache.get("what is ai") is None
+    assert cache.expired == 1
+
+def test_least_recently_used_is_evicted(clock):
+    cache = ResponseCache(max_entries=2)
+    cache.put("what is ai", "a")
+    cache.put("what is ml", "b")
+    cache.get("what is ai")  # now the most recent
+    cache.put("what is nlp", "c")
+    assert cache.get("what is ml") is None
+    assert cache.get("what is ai") == "a"
+
+def test_follow_ups_are_not_cached_without_context(clock):
+    cache = ResponseCache()
+    cache.put("why is that", "Because.")
+    assert cache.get("why is that") is None
+    assert cache.skipped == 1
+
+def test_context_is_part_of_the_key(clock):
+    cache = ResponseCache(use_context=True)
+    first = [{"role": "user", "content": "tell me about mars"}]
+    cache.put("why is that", "Iron oxide.", first)
+    assert cache.get("why is that", first) == "Iron oxide."
+    assert cache.get("why is that", [{"role": "user", "content": "tell me about venus"}]) is None
+
+def test_saved_entries_survive_a_restart(clock, tmp_path):
+    path = str(tmp_path / "cache.json")
+    cache = ResponseCache(path)
+    cache.put("what is ai", "Artificial intelligence.")
+    cache.save()
+    assert ResponseCache(path).get("what is ai") == "Artificial intelligence."
@@ -0,0 +1,29 @@
+from text_sanitizer import TextSanitizer, strip_unspeakable
+
+def stream(sanitizer, chunks):
+    s = sanitizer.stream()
+    return "".join(s.feed(chunk) for chunk in chunks) + s.flush()
+
+def test_strips_markdown_emoji_and_devanagari():
+    assert strip_unspeakable("**Hi** 😊 there") == "Hi  there"
+    assert strip_unspeakable("नमस्ते hello") == " hello"
+
+def test_replacement_is_case_insensitive():
+    assert TextSanitizer({"google": "my creators"}).clean("Made by GOOGLE.") == "Made by my creators."
+
+def test_word_split_across_chunks_is_held_back():
+    sanitizer = TextSanitizer({"google": "my creators"})
+    s = sanitizer.stream()
+    assert s.feed("I was made by Goo") == "I was made by "
+    assert s.feed("gle engineers") == "my creators engineers"
+    assert s.flush() == ""
+
+def test_tail_that_is_not_a_replaced_word_is_released():
+    sanitizer = TextSanitizer({"google": "my creators"})
+    assert stream(sanitizer, ["Good", " morning", " Go"]) == "Good morning Go"
+
+def test_stream_matches_whole_text_cleaning():
+    sanitizer = TextSanitizer({"google": "my creators"})
+    text = "Trained by **Google**, not by go-karts 🚀. Google!"
+    chunks = [text[i:i + 3] for i in range(0, len(text), 3)]
+    assert stream(sanitizer, chunks) == sanitizer.replace(strip_unspeakable(text))
@@ -0,0 +1,84 @@
+import re
+from typing import Dict, Optional
+
+# ============================================================================
+# CHARACTER STRIPPING
+# ============================================================================
+
+# Markdown symbols the voice would read out
+MARKDOWN_CHARS = "*_~`#[](){}"
+
+# Markdown, Devanagari and everything from U+24C2 up (enclosed letters,
+# box drawing, dingbats, emoji and the other planes), in one class
+UNSPEAKABLE = re.compile("[" + re.escape(MARKDOWN_CHARS) + "\u0900-\u097F\u24C2-\U0010FFFF]+")
+
+# Most replies are plain ASCII: one str.translate call, no regex
+ASCII_TABLE = str.maketrans("", "", MARKDOWN_CHARS)
+
+def strip_unspeakable(text: str) -> str:
+    """Drop markdown, emoji and Devanagari in a single pass"""
+    if text.isascii():
+        return text.translate(ASCII_TABLE)
+    return UNSPEAKABLE.sub("", text)
+
+# ============================================================================
+# REPLY SANITIZING
+# ============================================================================
+
+class TextSanitizer:
+    """Strips unspeakable characters and replaces words (case-insensitive).
+
+    clean() handles a whole reply; stream() returns a StreamSanitizer for
+    cleaning a reply chunk by chunk while it is generated.
+    """
+
+    def __init__(self, replacements: Optional[Dict[str, str]] = None):
+        self.replacements = {word.lower(): value for word, value in (replacements or {}).items()}
+        words = sorted(self.replacements, key=len, reverse=True)
+        self.pattern = (re.compile("|".join(map(re.escape, words)), re.IGNORECASE)
+                        if words else None)
+        # Chunk tails that may grow into a replaced word ("Goo" + "gle")
+        self.prefixes = {w[:i] for w in words for i in range(1, len(w))}
+        self.hold = max(map(len, words), default=1) - 1
+
+    def replace(self, text: str) -> str:
+        if self.pattern is None:
+            return text
+        return self.pattern.sub(lambda m: self.replacements[m.group(0).lower()], text)
+
+    def clean(self, text: str) -> str:
+        """Sanitize a complete text"""
+        return self.replace(strip_unspeakable(text)).strip()
+
+    def partial_tail(self, text: str) -> int:
+        """Length of the longest tail that is the start of a replaced word"""
+        for n in range(min(len(text), self.hold), 0, -1):
+            if text[-n:].lower() in self.prefixes:
+                return n
+        return 0
+
+    def stream(self) -> "StreamSanitizer":
+        return StreamSanitizer(self)
+
+class StreamSanitizer:
+    """Cleans a streamed reply chunk by chunk.
+
+    feed() returns the cleaned text that is safe to pass on. A chunk
+    ending in what could be the start of a replaced word keeps that tail
+    back until the next chunk shows whether it completes the word;
+    flush() releases it at the end of the stream.
+    """
+
+    def __init__(self, sanitizer: TextSanitizer):
+        self.sanitizer = sanitizer
+        self.pending = ""
+
+    def feed(self, chunk: str) -> str:
+        text = self.pending + strip_unspeakable(chunk)
+        keep = self.sanitizer.partial_tail(text)
+        self.pending = text[len(text) - keep:] if keep else ""
+        return self.sanitizer.replace(text[:len(text) - keep])
+
+    def flush(self) -> str:
+        text, self.pending = self.pending, ""
+        return self.sanitizer.replace(text)
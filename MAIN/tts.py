@@ -0,0 +1,230 @@
+import concurrent.futures
+import shutil
+import subprocess
+import time
+from typing import Dict, List, Optional
+
+import edge_tts
+
+from async_loop import BackgroundLoop
+from network import NetworkProbe
+
+# ============================================================================
+# BACKEND INTERFACE
+# ============================================================================
+
+class TTSBackend:
+    """Speech synthesizer; synthesize() returns a future of encoded audio bytes"""
+
+    name = "base"
+    needs_network = False
+
+    def start(self):
+        """Prepare the backend (threads, processes)"""
+
+    def stop(self):
+        """Release backend resources"""
+
+    def available(self) -> bool:
+        """Whether the backend can be used on this machine"""
+        return True
+
+    def synthesize(self, text: str, voice: Optional[str] = None) -> concurrent.futures.Future:
+        raise NotImplementedError
+
+# ============================================================================
+# EDGE-TTS (ONLINE)
+# ============================================================================
+
+class EdgeTTS(TTSBackend):
+    """edge-tts synthesis running on the shared background event loop"""
+
+    name = "edge"
+    needs_network = True
+
+    def __init__(self, voice: str = "en-IN-NeerjaNeural", rate: str = "+10%",
+                 loop: Optional[BackgroundLoop] = None):
+        self.voice = voice
+        self.rate = rate
+        self.loop = loop or BackgroundLoop("saira-tts")
+
+    def start(self):
+        """Start the event loop thread ahead of the first sentence"""
+        self.loop.start()
+
+    async def _synthesize(self, text: str, voice: str) -> bytes:
+        """Stream MP3 audio into memory"""
+        communicate = edge_tts.Communicate(text, voice, rate=self.rate)
+        audio = bytearray()
+        async for chunk in communicate.stream():
+            if chunk["type"] == "audio":
+                audio.extend(chunk["data"])
+        return bytes(audio)
+
+    def synthesize(self, text: str, voice: Optional[str] = None) -> concurrent.futures.Future:
+        """Thread-safe submit; the future resolves to MP3 bytes"""
+        return self.loop.submit(self._synthesize(text, voice or self.voice))
+
+    def stop(self):
+        """Stop the event loop thread"""
+        self.loop.stop()
+
+# ============================================================================
+# ESPEAK-NG (OFFLINE)
+# ============================================================================
+
+class EspeakTTS(TTSBackend):
+    """Local CPU synthesis with espeak-ng (or classic espeak), WAV output"""
+
+    name = "espeak"
+
+    def __init__(self, voice: str = "en+f3", speed: int = 165, binary: Optional[str] = None):
+        self.voice = voice
+        self.speed = speed
+        self.binary = binary or shutil.which("espeak-ng") or shutil.which("espeak")
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=1,
+                                                           thread_name_prefix="saira-espeak")
+
+    def available(self) -> bool:
+        return self.binary is not None
+
+    def _synthesize(self, text: str) -> bytes:
+        """Run espeak and capture the WAV it writes to stdout"""
+        result = subprocess.run(
+            [self.binary, "-v", self.voice, "-s", str(self.speed), "--stdout", text],
+            capture_output=True, timeout=30, check=True
+        )
+        return result.stdout
+
+    def synthesize(self, text: str, voice: Optional[str] = None) -> concurrent.futures.Future:
+        # Edge voice names mean nothing to espeak, so `voice` is ignored here
+        return self._pool.submit(self._synthesize, text)
+
+    def stop(self):
+        self._pool.shutdown(wait=False)
+
+# ============================================================================
+# BACKEND SELECTION
+# ============================================================================
+
+class TTSRouter(TTSBackend):
+    """Picks a TTS backend per sentence from network health and latency.
+
+    mode "auto" prefers the first backend (edge-tts) while the network is
+    up and its recent latency fits the budget, otherwise the local engine.
+    A slow online backend is retried every `retry_every` sentences so its
+    latency estimate can recover. Online failures fall back to the local
+    engine for the same sentence.
+    """
+
+    name = "router"
+
+    def __init__(self, backends: List[TTSBackend], mode: str = "auto",
+                 latency_budget: float = 1.5, probe: Optional[NetworkProbe] = None,
+                 retry_every: int = 10, alpha: float = 0.3):
+        self.backends = [b for b in backends if b.available()]
+        if not self.backends:
+            raise RuntimeError("No TTS backend available")
+        self.mode = mode
+        self.latency_budget = latency_budget
+        self.probe = probe or NetworkProbe()
+        self.retry_every = retry_every
+        self.alpha = alpha
+        self.latency: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {b.name: 0 for b in self.backends}
+        self.failures: Dict[str, int] = {b.name: 0 for b in self.backends}
+        self._skipped = 0
+
+    def start(self):
+        for backend in self.backends:
+            backend.start()
+        if any(b.needs_network for b in self.backends):
+            self.probe.check()
+
+    def stop(self):
+        for backend in self.backends:
+            backend.stop()
+
+    def get(self, name: str) -> Optional[TTSBackend]:
+        """Backend by name"""
+        return next((b for b in self.backends if b.name == name), None)
+
+    def choose(self) -> TTSBackend:
+        """Backend for the next sentence"""
+        if self.mode != "auto":
+            return self.get(self.mode) or self.backends[0]
+
+        local = [b for b in self.backends if not b.needs_network]
+        for backend in self.backends:
+            if not backend.needs_network:
+                return backend
+            if not local:
+                return backend
+            if not self.probe.is_online():
+                continue
+            if self.latency.get(backend.name, 0.0) <= self.latency_budget:
+                return backend
+            self._skipped += 1
+            if self._skipped >= self.retry_every:
+                self._skipped = 0
+                return backend
+        return local[0]
+
+    def _record(self, backend: TTSBackend, started: float, ok: bool):
+        """Update latency average and counters"""
+        if ok:
+            elapsed = time.perf_counter() - started
+            prev = self.latency.get(backend.name)
+            self.latency[backend.name] = elapsed if prev is None else prev + (elapsed - prev) * self.alpha
+            self.counts[backend.name] += 1
+        else:
+            self.failures[backend.name] += 1
+            if backend.needs_network:
+                self.probe.mark_offline()
+
+    def synthesize(self, text: str, voice: Optional[str] = None) -> concurrent.futures.Future:
+        """Synthesize with the chosen backend, falling back to the local engine"""
+        outer: concurrent.futures.Future = concurrent.futures.Future()
+        backend = self.choose()
+        fallback = next((b for b in self.backends if not b.needs_network and b is not backend), None)
+        self._submit(outer, backend, fallback, text, voice)
+        return outer
+
+    def _submit(self, outer, backend, fallback, text, voice):
+        """Chain one backend attempt into the outer future"""
+        started = time.perf_counter()
+        inner = backend.synthesize(text, voice)
+        # Cancelling the outer future (barge-in) cancels the running attempt
+        outer.add_done_callback(lambda f: f.cancelled() and inner.cancel())
+
+        def done(f):
+            if outer.done():
+                return
+            if f.cancelled():
+                outer.cancel()
+                return
+            error = f.exception()
+            self._record(backend, started, error is None)
+            try:
+                if error is None:
+                    outer.set_result(f.result())
+                elif fallback is not None:
+                    print(f"⚠️ {backend.name} TTS failed ({error}), using {fallback.name}")
+                    self._submit(outer, fallback, None, text, voice)
+                else:
+                    outer.set_exception(error)
+            except concurrent.futures.InvalidStateError:
+                pass  # cancelled meanwhile
+
+        inner.add_done_callback(done)
+
+    def stats(self) -> dict:
+        """Per-backend usage and average latency (ms)"""
+        return {
+            name: {
+                "used": self.counts[name],
+                "failed": self.failures[name],
+                "latency_ms": round(self.latency[name] * 1000) if name in self.latency else None,
+            }
+            for name in self.counts
+        }
@@ -0,0 +1,82 @@
+import math
+from array import array
+
+try:
+    import audioop
+except ImportError:  # removed from the stdlib in Python 3.13
+    audioop = None
+
+# ============================================================================
+# FRAME ENERGY
+# ============================================================================
+
+def frame_rms(frame: bytes, width: int = 2) -> float:
+    """RMS energy of a 16-bit PCM frame"""
+    if not frame:
+        return 0.0
+    if audioop is not None:
+        return audioop.rms(frame, width)
+    samples = array("h", frame[: len(frame) - len(frame) % 2])
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(s * s for s in samples) / len(samples))
+
+# ============================================================================
+# VOICE ACTIVITY DETECTOR
+# ============================================================================
+
+class EnergyVAD:
+    """Lightweight energy detector with an adaptive noise floor.
+
+    A frame counts as speech when its energy is `ratio` times above the
+    running floor (and above `min_energy`). Speech is only reported after
+    `trigger_frames` speech frames in a row, so clicks and single bursts
+    are ignored. Non-speech frames keep adapting the floor; calibrate()
+    raises it to frames known to be background, such as the speaker echo
+    at the start of playback, which can be louder than `min_energy`.
+    """
+
+    def __init__(self, ratio: float = 3.0, min_energy: float = 300,
+                 trigger_frames: int = 4, floor_alpha: float = 0.05):
+        self.ratio = ratio
+        self.min_energy = min_energy
+        self.trigger_frames = trigger_frames
+        self.floor_alpha = floor_alpha
+        self.floor = 0.0
+        self.run = 0
+        self.last_energy = 0.0
+
+    def reset(self, floor: float = 0.0):
+        """Forget the current speech run (optionally seed the floor)"""
+        self.floor = floor
+        self.run = 0
+
+    def threshold(self) -> float:
+        """Energy a frame must exceed to count as speech"""
+        return max(self.min_energy, self.floor * self.ratio)
+
+    def is_speech(self, frame: bytes) -> bool:
+        """Classify one frame and adapt the floor on silence"""
+        energy = frame_rms(frame)
+        self.last_energy = energy
+        if energy > self.threshold():
+            return True
+        if self.floor == 0.0:
+            self.floor = energy
+        else:
+            self.floor += (energy - self.floor) * self.floor_alpha
+        return False
+
+    def calibrate(self, frame: bytes):
+        """Count a frame as background (speaker echo): the floor rises to its energy"""
+        energy = frame_rms(frame)
+        self.last_energy = energy
+        self.floor = max(self.floor, energy)
+
+    def process(self, frame: bytes) -> bool:
+        """Feed one frame; True exactly when a speech run reaches the trigger length"""
+        if self.is_speech(frame):
+            self.run += 1
+            return self.run == self.trigger_frames
+        self.run = 0
+        return False
@@ -0,0 +1,121 @@
+import json
+import time
+from typing import List
+
+from stt import VoskSTT
+
+# ============================================================================
+# WAKE-WORD GATING
+# ============================================================================
+
+class WakeWordGate:
+    """On-device keyword spotter that decides which utterances get recognized.
+
+    Attached to ContinuousCapture as a listener, it feeds every segment to
+    a Vosk recognizer limited to the wake words (a tiny grammar, so it is
+    cheap and rarely mistakes hallway noise for speech). Utterances without
+    a wake word are dropped before any full recognition call, except
+    during the follow-up window after Saira spoke or after an accepted
+    turn, so a conversation does not need "Saira" in every sentence.
+
+    A streaming `transcriber` (another segment listener) is driven by the
+    gate instead of the capture: it only starts on a segment once the wake
+    word is heard or while the gate is awake, with the frames held back
+    until then, so ignored speech never reaches full recognition.
+    """
+
+    def __init__(self, backend: VoskSTT, words: List[str], follow_up: float = 8.0,
+                 transcriber=None):
+        self.backend = backend
+        self.words = [w.lower() for w in words]
+        self.follow_up = follow_up
+        self.transcriber = transcriber
+        self.awake_until = 0.0
+        self._rec = None
+        self._heard = False
+        self._pending: List[bytes] = []
+        self._forwarding = False
+
+        self.accepted = 0
+        self.follow_ups = 0
+        self.avoided = 0
+
+    def keep_awake(self):
+        """Open (or extend) the follow-up window"""
+        self.awake_until = time.monotonic() + self.follow_up
+
+    def awake(self) -> bool:
+        return time.monotonic() < self.awake_until
+
+    def speech_start(self, frames: List[bytes]):
+        """New segment: fresh grammar-limited recognizer"""
+        self._rec = self.backend.recognizer(grammar=self.words + ["[unk]"])
+        self._heard = False
+        self._pending = []
+        self._forwarding = False
+        for frame in frames:
+            self.speech_frame(frame)
+        if self.awake():
+            self._release()
+
+    def speech_frame(self, frame: bytes):
+        if self._forwarding:
+            self.transcriber.speech_frame(frame)
+        elif self.transcriber is not None:
+            self._pending.append(frame)
+        if self._rec is None or self._heard:
+            return  # already spotted, stop spending CPU on this segment
+        if self._rec.AcceptWaveform(frame):
+            self._heard = self._matches(json.loads(self._rec.Result()).get("text", ""))
+        else:
+            self._heard = self._matches(json.loads(self._rec.PartialResult()).get("partial", ""))
+        if self._heard:
+            self._release()
+
+    def _release(self):
+        """Start the transcriber with the frames held back so far"""
+        if self.transcriber is None or self._forwarding:
+            return
+        self._forwarding = True
+        frames, self._pending = self._pending, []
+        self.transcriber.speech_start(frames)
+
+    def speech_end(self, utterance):
+        """Segment closed: mark the utterance if a wake word was heard"""
+        if self._rec is None:
+            return
+        if not self._heard:
+            self._heard = self._matches(json.loads(self._rec.FinalResult()).get("text", ""))
+            if self._heard:
+                self._release()
+        if self._forwarding:
+            self.transcriber.speech_end(utterance)
+        if utterance is not None:
+            utterance.wake_word = self._heard
+        self._rec = None
+        self._pending = []
+        self._forwarding = False
+
+    def _matches(self, text: str) -> bool:
+        text = f" {text} "
+        return any(f" {w} " in text for w in self.words)
+
+    def allow(self, utterance) -> bool:
+        """Whether the utterance should go to full recognition"""
+        if getattr(utterance, "wake_word", False):
+            self.accepted += 1
+        elif self.awake():
+            self.follow_ups += 1
+        else:
+            self.avoided += 1
+            return False
+        self.keep_awake()
+        return True
+
+    def stats(self) -> dict:
+        """How many recognition calls were avoided"""
+        return {
+            "wake_word": self.accepted,
+            "follow_up": self.follow_ups,
+            "avoided": self.avoided,
+        }
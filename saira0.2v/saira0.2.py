@@ -5,14 +5,23 @@
 
 import os
 import re
+import sys
 import time
-import json
+import argparse
 import asyncio
-import difflib
 import edge_tts
 import speech_recognition as sr
 import pygame
 
+# Shared voice modules live in MAIN/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "MAIN"))
+from intents import IntentMatcher
+from knowledge_base import KnowledgeBase
+from stt import STTRouter, GoogleSTT, VoskSTT
+from tts import TTSRouter, EspeakTTS
+from replay import (ReplaySource, ReplayFinished, TranscriptSTT, SilentTTS,
+                    TurnTimer, load_turns, use_null_audio)
+
 # ------------------ Audio / recognizer init (from saira.py) ------------------
 # Recognizer setup (copied)
 recognizer = sr.Recognizer()
@@ -22,6 +31,20 @@ recognizer.pause_threshold = 1.2
 recognizer.phrase_threshold = 0.3
 recognizer.non_speaking_duration = 0.8
 
+# Speech recognition backend: on-device Vosk keeps this mode usable without internet
+STT_BACKEND = "auto"  # "auto", "google" or "vosk"
+VOSK_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "MAIN", "models", "vosk-model-small-en-in-0.4")
+stt_engine = STTRouter([GoogleSTT(recognizer, language="en-IN"), VoskSTT(VOSK_MODEL_PATH)],
+                       mode=STT_BACKEND)
+
+# Replay mode (--replay): recordings instead of the mic, local TTS, timing report
+replay_source = None
+replay_tts = None
+turn_timer = TurnTimer()
+
+# Exit and fixed questions (name, creator, time) are recognized locally
+intents = IntentMatcher()
+
 # Pygame for audio playback
 try:
     pygame.mixer.init()
@@ -58,20 +81,30 @@ def speak(text):
     print(f"\n💬 Saira: {clean_text}\n")
     try:
         voice = "en-IN-NeerjaNeural"  # same voice as in saira.py
-        asyncio.run(_speak_edge_save(clean_text, voice))
+        audio_file = "temp_audio.mp3"
+        with turn_timer.phase("tts"):
+            if replay_tts is not None:
+                # Local stand-in for edge-tts during replay runs
+                audio_file = "temp_audio.wav"
+                with open(audio_file, "wb") as f:
+                    f.write(replay_tts.synthesize(clean_text).result())
+            else:
+                asyncio.run(_speak_edge_save(clean_text, voice))
         # play
-        pygame.mixer.music.load("temp_audio.mp3")
+        pygame.mixer.music.load(audio_file)
         pygame.mixer.music.play()
+        turn_timer.stamp("first_audio")
         while pygame.mixer.music.get_busy():
             time.sleep(0.05)
+        turn_timer.stamp("spoken")
         try:
             pygame.mixer.music.unload()
         except Exception:
             pass
         time.sleep(0.1)
-        if os.path.exists("temp_audio.mp3"):
+        if os.path.exists(audio_file):
             try:
-                os.remove("temp_audio.mp3")
+                os.remove(audio_file)
             except:
                 pass
     except Exception as e:
@@ -80,13 +113,28 @@ def speak(text):
 def listen(timeout=8, phrase_time_limit=15):
     """Listen from mic and return recognized text (lowercased) or None.
        This function mirrors the flow from saira.py but without socketio emits."""
+    if replay_source is not None:
+        # Recorded utterance instead of the mic (raises ReplayFinished at the end)
+        audio = replay_source.next_audio()
+        turn_timer.begin(replay_source.label())
+        try:
+            with turn_timer.phase("stt"):
+                text = stt_engine.recognize(audio)
+            print(f"✅ You said: {text}")
+            return text.lower()
+        except sr.UnknownValueError:
+            print("❌ Could not understand")
+            return None
+        except Exception as e:
+            print(f"❌ Error: {e}")
+            return None
     with sr.Microphone() as source:
         print("\n🎤 Listening from microphone...")
         recognizer.adjust_for_ambient_noise(source, duration=0.5)
         try:
             audio = recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
             print("📄 Processing.")
-            text = recognizer.recognize_google(audio, language="en-IN", show_all=False)
+            text = stt_engine.recognize(audio)
             print(f"✅ You said: {text}")
             return text.lower()
         except sr.WaitTimeoutError:
@@ -99,112 +147,82 @@ def listen(timeout=8, phrase_time_limit=15):
             print(f"❌ Error: {e}")
             return None
 
-# ------------------ QA data loading/saving ------------------
+# ------------------ QA data ------------------
 QA_FILE = "qa_blocks.txt"
 META_FILE = "qa_meta.json"
 MIN_MATCH_PERCENT = 50.0  # accept only if similarity >= this
 
-def load_blocks(path=QA_FILE):
-    """Load blocks from qa_blocks.txt using the ---BLOCK--- format."""
-    if not os.path.exists(path):
-        return []
-    text = open(path, "r", encoding="utf-8").read()
-    parts = text.split('---BLOCK---')
-    blocks = []
-    for p in parts:
-        p = p.strip()
-        if not p:
-            continue
-        lines = [l.rstrip() for l in p.splitlines() if l.strip()]
-        block = {"id": None, "q": "", "answers": []}
-        for ln in lines:
-            if ln.lower().startswith("id:"):
-                block["id"] = ln.split(":", 1)[1].strip()
-            elif ln.lower().startswith("q:"):
-                block["q"] = ln.split(":", 1)[1].strip()
-            elif re.match(r'^a\d\s*:', ln, flags=re.I):
-                block["answers"].append(ln.split(":", 1)[1].strip())
-            else:
-                # fallback
-                if not block["q"]:
-                    block["q"] = ln
-                else:
-                    block["answers"].append(ln)
-        while len(block["answers"]) < 5:
-            block["answers"].append("I'm not sure about that.")
-        blocks.append(block)
-    return blocks
-
-def load_meta(path=META_FILE):
-    if not os.path.exists(path):
-        return {}
-    try:
-        return json.load(open(path, "r", encoding="utf-8"))
-    except:
-        return {}
-
-def save_meta(meta, path=META_FILE):
-    try:
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(meta, f, indent=2, ensure_ascii=False)
-    except Exception as e:
-        print("Could not save meta:", e)
-
-# ------------------ Matching logic ------------------
-def similarity_percent(a, b):
-    a = re.sub(r'\W+', ' ', a.lower()).strip()
-    b = re.sub(r'\W+', ' ', b.lower()).strip()
-    if not a or not b:
-        return 0.0
-    ratio = difflib.SequenceMatcher(None, a, b).ratio()
-    return round(ratio * 100, 2)
-
-def find_best_block(user_text, blocks):
-    best = None
-    best_score = 0.0
-    for block in blocks:
-        score = similarity_percent(user_text, block["q"])
-        if score > best_score:
-            best_score = score
-            best = block
-    return best, best_score
+# Same loader, matcher and answer rotation as MAIN's knowledge-base tier
+knowledge_base = KnowledgeBase(QA_FILE, META_FILE)
 
 # ------------------ Respond logic with rotation ------------------
-def respond_to_user(user_text, blocks, meta):
-    block, score = find_best_block(user_text, blocks)
+def respond_to_user(user_text):
+    with turn_timer.phase("match"):
+        block, score = knowledge_base.match(user_text)
     if not block or score < MIN_MATCH_PERCENT:
         reply = "I'm not sure about that."
         speak(reply)
         return
-    bid = str(block.get("id") or block["q"])
-    last_idx = meta.get(bid, -1)
-    next_idx = (last_idx + 1) % len(block["answers"])
-    reply = block["answers"][next_idx]
-    meta[bid] = next_idx
-    save_meta(meta)
-    print(f"[Matched block id={bid} score={score}% answer_index={next_idx}]")
+    reply = knowledge_base.answer(block)
+    print(f"[Matched block id={block.get('id') or block['q']} score={score}%]")
     speak(reply)
 
 # ------------------ Main loop ------------------
 def main_loop():
     print("Loading QA blocks...")
-    blocks = load_blocks()
-    if not blocks:
+    if not knowledge_base.load():
         print("No blocks found. Create qa_blocks.txt using the editor or manually. Exiting.")
         return
-    meta = load_meta()
+    stt_engine.start()
     print("Ready. Say 'exit' or 'bye' to stop.")
-    while True:
-        user_text = listen()
-        if not user_text:
+    try:
+        while True:
+            user_text = listen()
+            if not user_text:
+                time.sleep(0.2)
+                continue
+            print("You said:", user_text)
+            intent = intents.match(user_text)
+            if intent is not None and intent.name == "exit":
+                speak("Goodbye, take care")
+                break
+            if intent is not None and intent.reply:
+                # Name, creator and time questions need no Q&A lookup
+                speak(intent.reply)
+                turn_timer.end()
+                continue
+            respond_to_user(user_text)
+            turn_timer.end()
             time.sleep(0.2)
-            continue
-        print("You said:", user_text)
-        if any(w in user_text for w in ["exit", "bye", "quit", "stop"]):
-            speak("Goodbye, take care")
-            break
-        respond_to_user(user_text, blocks, meta)
-        time.sleep(0.2)
+    except ReplayFinished:
+        print("Replay finished.")
+    finally:
+        knowledge_base.save()
+    if replay_source is not None:
+        turn_timer.report(replay_report)
+
+# ------------------ Replay mode ------------------
+replay_report = None
+
+def setup_replay(path):
+    """Play recordings instead of the mic and speak into a null audio sink"""
+    global replay_source, replay_tts, stt_engine, knowledge_base
+    pygame.mixer.quit()
+    use_null_audio()
+    pygame.mixer.init()
+    replay_source = ReplaySource(load_turns(path))
+    stt_engine = STTRouter([TranscriptSTT(replay_source), VoskSTT(VOSK_MODEL_PATH)])
+    replay_tts = TTSRouter([EspeakTTS(), SilentTTS()])
+    # Benchmark runs leave the saved answer rotation alone
+    knowledge_base = KnowledgeBase(QA_FILE, None)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Saira offline voice Q&A")
+    parser.add_argument("--replay", metavar="PATH",
+                        help="WAV directory or JSON manifest to use instead of the microphone")
+    parser.add_argument("--report", metavar="FILE", help="save the replay timing report as JSON")
+    args = parser.parse_args()
+    if args.replay:
+        setup_replay(args.replay)
+        replay_report = args.report
     main_loop()